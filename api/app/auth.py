@@ -1,68 +1,60 @@
 from datetime import datetime, timedelta, timezone
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-from pydantic_settings import BaseSettings
+import base64
+import hashlib
+import hmac
 import json
 import os
+import time
+import uuid
+from collections import OrderedDict
 from threading import Lock
+from typing import Optional, Dict, Any, Tuple
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-class Settings(BaseSettings):
-    JWT_SECRET: str = "change-me"
-    ACCESS_TOKEN_MINUTES: int = 15
-    REFRESH_TOKEN_DAYS: int = 7
-
-    class Config:
-        env_file = ".env"
-
-settings = Settings()
+from .config import settings
+from .hashing import pwd_context, hash_password, verify_password
+from .metrics import timed
+from .user_store import SqliteUserStore
 
+# παλιό format {"email": {"password_hash": "..."}}: γίνεται migrate μία φορά στο SQLite
 USERS_FILE = os.path.join(os.path.dirname(__file__), "users.json")
-_users_lock = Lock()
-
-def _load_users() -> dict:
-    # users.json format: {"email": {"password_hash": "..."}}
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        except Exception:
-            return {}
-    return {}
-
-def _save_users(users: dict) -> None:
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(users, f, ensure_ascii=False, indent=2)
+USERS_DB = settings.USERS_DB_PATH or os.path.join(os.path.dirname(__file__), "users.sqlite3")
+
+user_store = SqliteUserStore(USERS_DB, legacy_json=USERS_FILE)
 
 # Seed: 1 “demo” user
-_users = _load_users()
-if "demo@demo.com" not in _users:
-    _users["demo@demo.com"] = {"password_hash": pwd_context.hash("demo1234")}
-    _save_users(_users)
-
-def register_user(email: str, password: str) -> None:
-    email = email.lower().strip()
-    with _users_lock:
-        users = _load_users()
-        if email in users:
-            raise ValueError("User already exists")
-        users[email] = {"password_hash": pwd_context.hash(password)}
-        _save_users(users)
-
-def verify_user(email: str, password: str) -> bool:
-    email = email.lower().strip()
-    with _users_lock:
-        users = _load_users()
-    user = users.get(email)
-    if not user:
+if user_store.get_password_hash("demo@demo.com") is None:
+    try:
+        user_store.create_user("demo@demo.com", pwd_context.hash("demo1234"))
+    except ValueError:
+        pass  # τον έβαλε ήδη άλλος worker
+
+def _normalize_email(email: str) -> str:
+    return email.lower().strip()
+
+async def register_user(email: str, password: str) -> None:
+    email = _normalize_email(email)
+    # γρήγορος έλεγχος πριν το (ακριβό) bcrypt· το insert παραμένει atomic.
+    # Το store είναι blocking SQLite (busy timeout 10s): πάντα σε thread, ποτέ στο loop
+    if await run_in_threadpool(user_store.get_password_hash, email) is not None:
+        raise ValueError("User already exists")
+    password_hash = await hash_password(password)
+    await run_in_threadpool(user_store.create_user, email, password_hash)
+
+async def verify_user(email: str, password: str) -> bool:
+    email = _normalize_email(email)
+    password_hash = await run_in_threadpool(user_store.get_password_hash, email)
+    if not password_hash:
         return False
-    return pwd_context.verify(password, user["password_hash"])
-
+    ok, new_hash = await verify_password(password, password_hash)
+    if ok and new_hash:
+        # άλλαξε το BCRYPT_ROUNDS: κρατάμε το νέο hash (SQLite write, εκτός event loop)
+        await run_in_threadpool(user_store.update_password_hash, email, new_hash)
+    return ok
 
 
-def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
+def create_token(subject: str, token_type: str, expires_delta: timedelta, jti: Optional[str] = None) -> str:
     now = datetime.now(timezone.utc)
     payload = {
         "sub": subject,
@@ -70,6 +62,8 @@ def create_token(subject: str, token_type: str, expires_delta: timedelta) -> str
         "iat": int(now.timestamp()),
         "exp": int((now + expires_delta).timestamp()),
     }
+    if jti:
+        payload["jti"] = jti
     return jwt.encode(payload, settings.JWT_SECRET, algorithm="HS256")
 
 def create_access_token(email: str) -> str:
@@ -84,11 +78,121 @@ def create_refresh_token(email: str) -> str:
         subject=email,
         token_type="refresh",
         expires_delta=timedelta(days=settings.REFRESH_TOKEN_DAYS),
+        # jti: μοναδικό id ώστε το rotation να μπορεί να το κάνει revoke
+        jti=uuid.uuid4().hex,
     )
 
-def decode_token(token: str):
+
+# ------------------ decode: fast path + verified-token cache ------------------
+
+# sha256(token) -> (exp, payload). Bounded LRU· ένα entry δεν ζει πέρα από το exp του token
+TOKEN_CACHE_MAX_ENTRIES = 10_000
+_token_cache: "OrderedDict[bytes, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+_token_cache_lock = Lock()
+_token_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _b64url_decode(part: str) -> bytes:
+    return base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+
+
+def _decode_hs256(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Λιτό HS256 verify (ό,τι ελέγχει και το jose για τα δικά μας tokens):
+    alg header, HMAC-SHA256 υπογραφή (constant-time), exp/nbf, iat ως αριθμός.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            return None
+        expected = hmac.new(
+            settings.JWT_SECRET.encode("utf-8"),
+            f"{header_b64}.{payload_b64}".encode("ascii"),
+            hashlib.sha256,
+        ).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature_b64)):
+            return None
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(payload, dict):
+        return None
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None and (not isinstance(exp, (int, float)) or exp <= now):
+        return None
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, (int, float)) or nbf > now):
+        return None
+    iat = payload.get("iat")
+    if iat is not None and not isinstance(iat, (int, float)):
+        return None
+    return payload
+
+
+def _decode_jose(token: str) -> Optional[Dict[str, Any]]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
-        return payload
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+@timed("decode_token")
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(digest)
+        if cached is not None:
+            if cached[0] > now:
+                _token_cache.move_to_end(digest)
+                _token_cache_stats["hits"] += 1
+                return dict(cached[1])
+            del _token_cache[digest]
+        _token_cache_stats["misses"] += 1
+
+    payload = _decode_hs256(token) if settings.JWT_FAST_PATH else _decode_jose(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _token_cache_lock:
+            _token_cache[digest] = (exp, dict(payload))
+            while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+                _token_cache.popitem(last=False)
+                _token_cache_stats["evictions"] += 1
+    return payload
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    with _token_cache_lock:
+        hits, misses = _token_cache_stats["hits"], _token_cache_stats["misses"]
+        return {
+            "entries": len(_token_cache),
+            "maxEntries": TOKEN_CACHE_MAX_ENTRIES,
+            "hits": hits,
+            "misses": misses,
+            "hitRatio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "evictions": _token_cache_stats["evictions"],
+        }
+
+
+def rotate_refresh_token(payload: Dict[str, Any]) -> bool:
+    """
+    Κάνει revoke το refresh token (jti) που μόλις χρησιμοποιήθηκε.
+    False αν έχει ήδη χρησιμοποιηθεί (replay). Ένα παλιό token χωρίς jti
+    (πριν το rotation) γίνεται δεκτό μία φορά, με jti το digest του payload
+    (ίδιο payload = ίδιο token), και ο client παίρνει νέο ζεύγος με jti.
+    """
+    jti = payload.get("jti")
+    if not isinstance(jti, str) or not jti:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        jti = "legacy:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)):
+        # χωρίς exp δεν λήγει ποτέ: το revocation πρέπει να ζήσει όσο ένα refresh token
+        exp = time.time() + settings.REFRESH_TOKEN_DAYS * 24 * 60 * 60
+    return user_store.revoke_token(jti, float(exp))
\ No newline at end of file
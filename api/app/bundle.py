@@ -0,0 +1,171 @@
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .responses import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli είναι προαιρετικό: χωρίς αυτό σερβίρεται μόνο gzip
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+# πόσα παλιά snapshots κρατάμε για delta sync (?since=<version>)
+BUNDLE_HISTORY = 16
+
+
+def _digest(content: Any) -> str:
+    return hashlib.blake2b(dumps(content), digest_size=8).hexdigest()
+
+
+class Blob:
+    """Έτοιμο JSON body + οι συμπιεσμένες εκδοχές του (υπολογίζονται μία φορά)."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding == "identity":
+            return self.body
+        with self._lock:
+            data = self._encoded.get(encoding)
+            if data is None:
+                if encoding == "br":
+                    data = brotli.compress(self.body, quality=BROTLI_QUALITY)
+                else:
+                    data = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+                self._encoded[encoding] = data
+        return data
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """br > gzip > identity, σύμφωνα με το Accept-Encoding (q=0 = όχι)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return "identity"
+
+
+@dataclass
+class Snapshot:
+    version: str
+    generated_at: int
+    versions: Dict[str, str]
+    entries: Dict[str, Dict[str, Any]]
+    blob: Optional[Blob] = None
+    deltas: Dict[str, Blob] = field(default_factory=dict)
+
+
+class BundleCache:
+    """
+    Versioned snapshot ολόκληρου του καταλόγου (για offline χρήση στο app).
+    Το version είναι hash του περιεχομένου, οπότε είναι ίδιο σε όλους τους
+    workers. Ξαναχτίζεται lazily, το πολύ μία φορά ανά rebuild_seconds και
+    μόνο αφού αλλάξει κάτι (invalidate)· full και delta bodies είναι
+    precomputed blobs.
+
+    Το collect() (build_entries) τρέχει στο event loop, γιατί διαβάζει τα
+    in-memory caches· τα full()/delta() (hashing, JSON, συμπίεση) μπορούν
+    να τρέξουν σε thread.
+    """
+
+    def __init__(
+            self,
+            build_entries: Callable[[], Dict[str, Dict[str, Any]]],
+            header: Dict[str, Any],
+            rebuild_seconds: float,
+    ):
+        self._build_entries = build_entries
+        self._header = header
+        self._rebuild_seconds = rebuild_seconds
+        self._lock = Lock()
+        self._dirty = True
+        self._built_at = 0.0
+        self._current: Optional[Snapshot] = None
+        # entries του τελευταίου collect() που δεν έχουν γίνει ακόμη snapshot
+        self._pending: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pending_lock = Lock()
+        # version -> per-POI versions των προηγούμενων snapshots
+        self._history: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def collect(self) -> None:
+        """Μαζεύει τα entries αν χρειάζεται rebuild· το snapshot χτίζεται στο επόμενο full()/delta()."""
+        now = time.time()
+        if not self._dirty or now - self._built_at < self._rebuild_seconds:
+            return
+        self._dirty = False
+        self._built_at = now
+        entries = self._build_entries()
+        with self._pending_lock:
+            self._pending = entries
+
+    def _snapshot(self) -> Snapshot:
+        with self._lock:
+            with self._pending_lock:
+                entries, self._pending = self._pending, None
+            if entries is None:
+                if self._current is not None:
+                    return self._current
+                entries = {}  # δεν έγινε ακόμη collect()
+
+            versions = {key: _digest(entry) for key, entry in entries.items()}
+            version = _digest([self._header, sorted(versions.items())])
+            if self._current is not None and self._current.version == version:
+                return self._current
+
+            self._current = Snapshot(version, int(time.time()), versions, entries)
+            self._history[version] = versions
+            while len(self._history) > BUNDLE_HISTORY:
+                self._history.popitem(last=False)
+            return self._current
+
+    def _body(self, snapshot: Snapshot, pois: List[Dict[str, Any]], **extra: Any) -> Blob:
+        return Blob(dumps({
+            "version": snapshot.version,
+            "generatedAt": snapshot.generated_at,
+            **extra,
+            **self._header,
+            "pois": pois,
+        }))
+
+    def full(self) -> Tuple[str, Blob]:
+        snapshot = self._snapshot()
+        with self._lock:
+            if snapshot.blob is None:
+                snapshot.blob = self._body(snapshot, list(snapshot.entries.values()), full=True)
+            return snapshot.version, snapshot.blob
+
+    def delta(self, since: str) -> Optional[Tuple[str, Blob]]:
+        """Μόνο όσα POIs άλλαξαν/προστέθηκαν (+ removed ids) από το since· None αν το since είναι άγνωστο."""
+        snapshot = self._snapshot()
+        with self._lock:
+            blob = snapshot.deltas.get(since)
+            if blob is not None:
+                return snapshot.version, blob
+            previous = self._history.get(since)
+            if previous is None:
+                return None
+            changed = [
+                entry for key, entry in snapshot.entries.items()
+                if previous.get(key) != snapshot.versions[key]
+            ]
+            removed = [key for key in previous if key not in snapshot.versions]
+            blob = self._body(snapshot, changed, full=False, since=since, removed=removed)
+            snapshot.deltas[since] = blob
+            return snapshot.version, blob
@@ -0,0 +1,367 @@
+import json
+import os
+import random
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Dict, Any, Tuple, Callable, Sequence, Set
+
+from .logs import get_logger
+
+log = get_logger("cache_store")
+
+# row: key -> (timestamp, etag, last_modified, zlib(json))
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    ts REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL
+)
+"""
+
+# cross-process single-flight: ποιος worker (pid) φέρνει τώρα ένα key και ως πότε
+_LEASES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def _json_size(value: Any) -> int:
+    if hasattr(value, "as_dict"):
+        value = value.as_dict()
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+class MemoryCache:
+    """
+    Bounded in-memory LRU cache με TTL (+ jitter ώστε να μη λήγουν όλα μαζί).
+    Όρια: max_entries και max_bytes (μέγεθος ≈ bytes του JSON).
+    Κρατάει counters για hits/misses/evictions/expirations.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, jitter: float = 0.1):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.jitter = jitter
+        # key -> (timestamp, expires_at, size, value)
+        self._data: "OrderedDict[str, Tuple[float, float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def _expires_at(self, ts: float) -> float:
+        spread = self.ttl * self.jitter
+        return ts + self.ttl + (random.uniform(-spread, spread) if spread else 0.0)
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def peek(self, key: str) -> Optional[Tuple[float, Any, bool]]:
+        """
+        (timestamp, value, fresh) ή None. Τα ληγμένα entries δεν σβήνονται
+        εδώ (φεύγουν με LRU eviction), ώστε να μπορούν να σερβιριστούν stale.
+        """
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if time.time() > item[1]:
+            self.expirations += 1
+            self.misses += 1
+            return item[0], item[3], False
+        self.hits += 1
+        return item[0], item[3], True
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.peek(key)
+        if entry is None or not entry[2]:
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Any, ts: Optional[float] = None, size: Optional[int] = None) -> None:
+        ts = ts if ts is not None else time.time()
+        size = size if size is not None else _json_size(value)
+        if size > self.max_bytes:
+            # δεν χωράει καθόλου: δεν το κρατάμε (θα ξαναδιαβαστεί από L2)
+            self._drop(key)
+            return
+        self._drop(key)
+        self._data[key] = (ts, self._expires_at(ts), size, value)
+        self._bytes += size
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def pop(self, key: str) -> None:
+        self._drop(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class DiskCache:
+    """
+    Persistent L2 cache σε SQLite (WAL), κοινό για όλους τους workers
+    του ίδιου host. Το JSON αποθηκεύεται συμπιεσμένο με zlib.
+    Η σύνδεση ανοίγει lazily, οπότε το startup δεν περιμένει τίποτα.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute(_LEASES_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(
+            self,
+            key: str,
+            newer_than: Optional[float] = None,
+    ) -> Optional[Tuple[float, Dict[str, Any], Optional[str], Optional[str]]]:
+        """
+        (timestamp, data, etag, last_modified) ή None. Δεν ελέγχει TTL.
+        Με newer_than το body διαβάζεται (και αποσυμπιέζεται) μόνο αν το
+        entry είναι νεότερο, αλλιώς None με ένα lookup στο index.
+        """
+        sql = "SELECT ts, etag, last_modified, body FROM entries WHERE key = ?"
+        params: Tuple[Any, ...] = (key,)
+        if newer_than is not None:
+            sql += " AND ts > ?"
+            params = (key, newer_than)
+        try:
+            with self._lock:
+                row = self._connect().execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            log.warning("disk_cache_read_failed", key=key, error=str(e))
+            return None
+        if not row:
+            return None
+        ts, etag, last_modified, body = row
+        try:
+            data = json.loads(zlib.decompress(body))
+        except (zlib.error, ValueError):
+            return None
+        return ts, data, etag, last_modified
+
+    def set(
+            self,
+            key: str,
+            data: Dict[str, Any],
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None,
+            ts: Optional[float] = None,
+    ) -> None:
+        body = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "INSERT OR REPLACE INTO entries (key, ts, etag, last_modified, body) VALUES (?, ?, ?, ?, ?)",
+                    (key, ts if ts is not None else time.time(), etag, last_modified, body),
+                )
+        except sqlite3.Error as e:
+            log.warning("disk_cache_write_failed", key=key, error=str(e))
+
+    def set_many(self, items: Dict[str, Any], ts: Optional[float] = None) -> None:
+        """Πολλά entries (χωρίς etag/last_modified) σε ένα transaction, π.χ. ένα batch response."""
+        if not items:
+            return
+        ts = ts if ts is not None else time.time()
+        rows = [
+            (key, ts, None, None, zlib.compress(
+                json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            ))
+            for key, data in items.items()
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO entries (key, ts, etag, last_modified, body) VALUES (?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            log.warning("disk_cache_write_failed", keys=len(items), error=str(e))
+
+    def touch(self, key: str, ts: Optional[float] = None) -> None:
+        """Ανανεώνει μόνο το timestamp (π.χ. μετά από 304 Not Modified)."""
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "UPDATE entries SET ts = ? WHERE key = ?",
+                    (ts if ts is not None else time.time(), key),
+                )
+        except sqlite3.Error as e:
+            log.warning("disk_cache_update_failed", key=key, error=str(e))
+
+    def lease(self, key: str, seconds: float) -> bool:
+        """
+        Atomic claim του key για seconds (π.χ. για upstream fetch)· False αν
+        το κρατάει άλλο process. Σε σφάλμα της βάσης επιστρέφει True (fetch).
+        """
+        return key in self.lease_many([key], seconds)
+
+    def lease_many(self, keys: Sequence[str], seconds: float) -> Set[str]:
+        """
+        Όπως το lease, για πολλά keys σε ένα transaction (ένα write αντί για
+        ένα ανά key)· επιστρέφει όσα πήραμε. Σε σφάλμα της βάσης: όλα.
+        """
+        if not keys:
+            return set()
+        now = time.time()
+        expires = now + seconds
+        owner = os.getpid()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                        "WHERE leases.expires <= ? OR leases.owner = excluded.owner",
+                        [(key, owner, expires, now) for key in keys],
+                    )
+                    # δικά μας = όσα έχουν τώρα το δικό μας owner/expires
+                    rows = conn.execute(
+                        f"SELECT key FROM leases WHERE owner = ? AND expires = ? "
+                        f"AND key IN ({','.join('?' * len(keys))})",
+                        (owner, expires, *keys),
+                    ).fetchall()
+                    conn.execute("COMMIT")
+                except sqlite3.Error:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            log.warning("disk_cache_lease_failed", keys=len(keys), error=str(e))
+            return set(keys)
+        return {row[0] for row in rows}
+
+    def leased(self, key: str) -> bool:
+        """Αν κάποιο process κρατάει ακόμη (μη ληγμένο) lease για το key."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT 1 FROM leases WHERE key = ? AND expires > ?", (key, time.time())
+                ).fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None
+
+    def release(self, key: str) -> None:
+        self.release_many([key])
+
+    def release_many(self, keys: Sequence[str]) -> None:
+        if not keys:
+            return
+        owner = os.getpid()
+        try:
+            with self._lock:
+                self._connect().executemany(
+                    "DELETE FROM leases WHERE key = ? AND owner = ?", [(key, owner) for key in keys]
+                )
+        except sqlite3.Error as e:
+            log.warning("disk_cache_release_failed", keys=len(keys), error=str(e))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def tiered_lookup(
+        memory: MemoryCache,
+        disk: Optional[DiskCache],
+        key: str,
+        ttl: float,
+        load: Callable[[Any], Any] = lambda data: data,
+) -> Tuple[Optional[Any], bool, float]:
+    """
+    (value, fresh, timestamp) από L1 ή L2. Επιστρέφει και ληγμένα entries,
+    ώστε ο caller να αποφασίσει για stale-while-revalidate / stale-on-error.
+    Για ληγμένο L1 entry το L2 διαβάζεται μόνο αν έχει νεότερη εγγραφή (π.χ.
+    από άλλο worker)· ένα L2 hit περνά μία φορά από το load() και μπαίνει στο L1.
+    """
+    entry = memory.peek(key)
+    if entry is not None and entry[2]:
+        return entry[1], True, entry[0]
+
+    stored = disk.get(key, newer_than=entry[0] if entry is not None else None) if disk is not None else None
+    return settle_lookup(memory, key, ttl, load, entry, stored)
+
+
+def settle_lookup(
+        memory: MemoryCache,
+        key: str,
+        ttl: float,
+        load: Callable[[Any], Any],
+        entry: Optional[Tuple[float, Any, bool]],
+        stored: Optional[Tuple[float, Dict[str, Any], Optional[str], Optional[str]]],
+) -> Tuple[Optional[Any], bool, float]:
+    """
+    Το δεύτερο μισό του tiered_lookup: entry = το (ληγμένο) L1 peek, stored =
+    το αποτέλεσμα του disk.get(newer_than=...). Χωριστά, ώστε το L2 read να
+    μπορεί να γίνει σε άλλο thread (βλ. tiered.lookup).
+    """
+    if stored:
+        ts, data, _, _ = stored
+        value = load(data)
+        memory.set(key, value, ts=ts)
+        return value, time.time() - ts <= ttl, ts
+
+    if entry is not None:
+        return entry[1], False, entry[0]
+    return None, False, 0.0
@@ -0,0 +1,81 @@
+import json
+import os
+from typing import Optional, Dict, Any, List
+
+from .config import settings
+from .data import CATEGORIES, POIS
+from .logs import get_logger
+
+log = get_logger("catalogue")
+
+# dataset του importer (python -m app.importer): POIs της περιοχής Ιωαννίνων από SPARQL
+CATALOGUE_FILE = settings.CATALOGUE_PATH or os.path.join(os.path.dirname(__file__), "catalogue.json")
+
+
+class Catalogue:
+    """
+    Όλα τα POIs (data.POIS + imported dataset) με indexes που χτίζονται
+    μία φορά στο startup: O(1) lookups ανά id, qid και κατηγορία.
+    """
+
+    def __init__(self, categories: List[Dict[str, Any]], pois: List[Dict[str, Any]]):
+        self.categories = categories
+        self.category_by_id: Dict[str, Dict[str, Any]] = {c["id"]: c for c in categories}
+        self.pois: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_qid: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {c["id"]: [] for c in categories}
+        for p in pois:
+            self.add(p)
+
+    def add(self, p: Dict[str, Any]) -> bool:
+        """False αν υπάρχει ήδη POI με το ίδιο id ή qid (τα hand-written κερδίζουν)."""
+        if p["id"] in self.by_id or p["wikidataId"] in self.by_qid:
+            return False
+        self.pois.append(p)
+        self.by_id[p["id"]] = p
+        self.by_qid.setdefault(p["wikidataId"], []).append(p)
+        self.by_category.setdefault(p["categoryId"], []).append(p)
+        return True
+
+    @property
+    def qids(self) -> List[str]:
+        return list(self.by_qid)
+
+    def counts(self) -> Dict[str, int]:
+        return {cid: len(items) for cid, items in self.by_category.items()}
+
+
+def load_dataset(path: str) -> List[Dict[str, Any]]:
+    """
+    Compact format του importer:
+    {"version": 1, "generatedAt": ..., "pois": [[id, categoryId, qid, lat, lon], ...]}
+    """
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning("catalogue_read_failed", path=path, error=str(e))
+        return []
+
+    out: List[Dict[str, Any]] = []
+    for row in data.get("pois") or []:
+        poi_id, category_id, qid = row[0], row[1], row[2]
+        lat: Optional[float] = row[3] if len(row) > 3 else None
+        lon: Optional[float] = row[4] if len(row) > 4 else None
+        out.append({"id": poi_id, "categoryId": category_id, "wikidataId": qid, "lat": lat, "lon": lon})
+    return out
+
+
+def build_catalogue(path: str = CATALOGUE_FILE) -> Catalogue:
+    catalogue = Catalogue(CATEGORIES, POIS)
+    imported = [p for p in load_dataset(path) if p["categoryId"] in catalogue.category_by_id]
+    added = sum(1 for p in imported if catalogue.add(p))
+    if added:
+        log.info("catalogue_loaded", imported=added, path=path)
+    return catalogue
+
+
+catalogue = build_catalogue()
@@ -0,0 +1,97 @@
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    JWT_SECRET: str = "change-me"
+    ACCESS_TOKEN_MINUTES: int = 15
+    REFRESH_TOKEN_DAYS: int = 7
+    JWT_FAST_PATH: bool = True  # λιτό HS256 verify αντί για python-jose (βλ. bench/bench_jwt.py)
+
+    # Users (SQLite). Κενό = app/users.sqlite3
+    USERS_DB_PATH: str = ""
+
+    # Password hashing: dedicated pool εκτός event loop / default threadpool
+    BCRYPT_ROUNDS: int = 12
+    HASH_WORKERS: int = 0  # 0 = διαθέσιμοι πυρήνες / HASH_WORKER_SHARES
+    # processes που μοιράζονται τους πυρήνες (το θέτει το app.serve = workers),
+    # ώστε τα bcrypt threads όλων των workers μαζί να μην ξεπερνούν τους πυρήνες
+    HASH_WORKER_SHARES: int = 1
+    HASH_MAX_PENDING: int = 64  # πάνω από αυτό το login/signup παίρνει 503
+
+    # Outbound HTTP (Wikidata / Wikipedia): ένας pooled client ανά host
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2: bool = False  # χρειάζεται το πακέτο h2 (pip install "httpx[http2]")
+    # Όλα τα upstream requests σε αυτό το base URL (π.χ. το bench.mock_upstream),
+    # με τον πραγματικό host στο X-Upstream-Host. Κενό = τα κανονικά hosts
+    UPSTREAM_BASE_URL: str = ""
+    # ένα timeout για όλα τα upstream calls (χωρίς overrides ανά call)· τα fan-out
+    # paths κόβονται νωρίτερα από το δικό τους deadline (π.χ. ENTITY_DEADLINE_SECONDS)
+    UPSTREAM_TIMEOUT_SECONDS: float = 10.0
+    UPSTREAM_CONNECT_TIMEOUT_SECONDS: float = 3.0
+
+    # Resilience ανά host (app/resilience.py): retries με jitter για GET, το πολύ
+    # RETRY_BUDGET_RATIO των requests· Retry-After μεγαλύτερο από RETRY_AFTER_MAX
+    # ανοίγει τον breaker ως τότε. Token bucket: RATE_PER_SECOND=0 = χωρίς όριο
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_RETRY_BUDGET_RATIO: float = 0.2
+    UPSTREAM_RETRY_AFTER_MAX_SECONDS: float = 5.0
+    UPSTREAM_BREAKER_FAILURES: int = 5
+    UPSTREAM_BREAKER_RESET_SECONDS: float = 30.0
+    UPSTREAM_RATE_PER_SECOND: float = 25.0
+    UPSTREAM_RATE_BURST: int = 50
+    UPSTREAM_RATE_MAX_WAIT_SECONDS: float = 10.0
+    # processes που μοιράζονται το rate/burst (το θέτει το app.serve = workers),
+    # ώστε το σύνολο να μένει UPSTREAM_RATE_PER_SECOND όσοι workers κι αν τρέχουν
+    UPSTREAM_RATE_SHARES: int = 1
+
+    # In-memory L1 caches (LRU): όρια ανά cache
+    CACHE_MAX_ENTRIES: int = 2000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SUMMARY_CACHE_MAX_ENTRIES: int = 2000
+    SUMMARY_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+
+    # Wikipedia summaries: αλλάζουν σπάνια, οπότε δικό τους (μεγαλύτερο) TTL.
+    # Με prefetch, κάθε σελίδα κατηγορίας φέρνει στο background τα summaries της
+    SUMMARY_TTL_SECONDS: int = 6 * 60 * 60
+    SUMMARY_PREFETCH: bool = True
+
+    # Commons image metadata (imageinfo): τα URLs των αρχείων αλλάζουν σπάνια
+    IMAGE_CACHE_MAX_ENTRIES: int = 5000
+    IMAGE_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    IMAGE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    # Persistent entity cache (SQLite). Κενό = μόνο in-memory cache
+    CACHE_DB_PATH: str = "cache/wikidata.sqlite3"
+
+    # Imported POI dataset (python -m app.importer). Κενό = app/catalogue.json
+    CATALOGUE_PATH: str = ""
+
+    # Background cache warmer για όλο τον κατάλογο
+    WARMER_ENABLED: bool = True
+    WARMER_CONCURRENCY: int = 4
+    # /ready μετά από έναν πλήρη γύρο με τουλάχιστον τόση κάλυψη του καταλόγου
+    # (missing entities μετράνε ως resolved)
+    WARMER_READY_COVERAGE: float = 0.9
+
+    # python -m app.serve: prefork workers (0 = ένας ανά διαθέσιμο πυρήνα, με βάση
+    # affinity και cgroup CPU limit) πάνω στο ίδιο socket.
+    # Με πολλούς workers μοιράζονται το L2 (CACHE_DB_PATH) και μόνο ένας τρέχει τον warmer
+    WORKERS: int = 1
+    GRACEFUL_TIMEOUT_SECONDS: float = 30.0
+
+    # /pois/bundle: το snapshot ξαναχτίζεται το πολύ μία φορά ανά τόσα δευτερόλεπτα
+    BUNDLE_REBUILD_SECONDS: float = 60.0
+
+    # Observability: JSON logs στο stdout και /metrics (Prometheus).
+    # Με METRICS_TOKEN το /metrics θέλει "Authorization: Bearer <token>"
+    LOG_LEVEL: str = "INFO"
+    ACCESS_LOG: bool = True
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+
+    class Config:
+        env_file = ".env"
+
+settings = Settings()
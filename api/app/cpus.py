@@ -0,0 +1,37 @@
+"""Πόσους πυρήνες έχει πραγματικά το process (για workers και thread pools)."""
+import math
+import os
+from typing import Optional
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPU quota του container σε πυρήνες (cgroup v2 ή v1)· None αν δεν υπάρχει όριο."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="ascii") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r", encoding="ascii") as f:
+            quota_us = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r", encoding="ascii") as f:
+            period_us = int(f.read())
+        return quota_us / period_us if quota_us > 0 and period_us > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    """
+    Πυρήνες που μπορεί πραγματικά να χρησιμοποιήσει το process: το os.cpu_count()
+    μετράει όλο το host, αγνοώντας CPU affinity και το CPU limit ενός container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # π.χ. macOS
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
@@ -0,0 +1,107 @@
+import math
+from threading import Lock
+from typing import Optional, Dict, List, Set, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+# μέγεθος κελιού του grid σε μοίρες (~11 km σε γεωγραφικό πλάτος)
+CELL_DEGREES = 0.1
+
+Cell = Tuple[int, int]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _haversine_many(lat: float, lon: float, lats: List[float], lons: List[float]) -> List[float]:
+    # vectorized: ~10x ταχύτερο από το loop του haversine_m από μερικές εκατοντάδες υποψήφιους
+    p1 = math.radians(lat)
+    p2 = np.radians(np.asarray(lats, dtype=float))
+    dl = np.radians(np.asarray(lons, dtype=float) - lon)
+    a = np.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return (2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))).tolist()
+
+
+def _cell(lat: float, lon: float) -> Cell:
+    return math.floor(lat / CELL_DEGREES), math.floor(lon / CELL_DEGREES)
+
+
+class GeoIndex:
+    """
+    Grid index (κελιά CELL_DEGREES x CELL_DEGREES) πάνω στα lat/lon των POIs.
+    Τα queries κοιτάνε μόνο τα κελιά που τέμνουν την περιοχή και μετά
+    κάνουν ranking με haversine (numpy) πάνω στους υποψήφιους.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._cells: Dict[Cell, Set[str]] = {}
+        # keys που έχουμε δει (και χωρίς coords), για να ξέρουμε τι λείπει
+        self.known: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def upsert(self, key: str, lat: Optional[float], lon: Optional[float]) -> None:
+        with self._lock:
+            self.known.add(key)
+            old = self._points.pop(key, None)
+            if old is not None:
+                cell = self._cells.get(_cell(*old))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self._cells[_cell(*old)]
+            if lat is None or lon is None:
+                return
+            self._points[key] = (lat, lon)
+            self._cells.setdefault(_cell(lat, lon), set()).add(key)
+
+    def _candidates(self, south: float, west: float, north: float, east: float) -> List[str]:
+        (c0, r0), (c1, r1) = _cell(south, west), _cell(north, east)
+        # λίγα κελιά -> σάρωση του grid, πολλά -> σάρωση των σημείων
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self._cells):
+            return [
+                k for k, (la, lo) in self._points.items()
+                if south <= la <= north and west <= lo <= east
+            ]
+        out: List[str] = []
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                out.extend(self._cells.get((c, r), ()))
+        return out
+
+    def nearby(self, lat: float, lon: float, radius_m: float, limit: int) -> List[Tuple[str, float]]:
+        """[(key, distance_m)] ταξινομημένα κατά απόσταση, μέσα στο radius."""
+        dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+        coslat = max(math.cos(math.radians(lat)), 1e-6)
+        dlon = min(180.0, dlat / coslat)
+        with self._lock:
+            keys = self._candidates(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+            points = [self._points[k] for k in keys]
+        if not keys:
+            return []
+        distances = _haversine_many(lat, lon, [p[0] for p in points], [p[1] for p in points])
+        ranked = sorted((d, k) for k, d in zip(keys, distances) if d <= radius_m)
+        return [(k, d) for d, k in ranked[:limit]]
+
+    def bbox(self, south: float, west: float, north: float, east: float, limit: int) -> List[str]:
+        """Keys μέσα στο bbox, ταξινομημένα από το κέντρο του προς τα έξω."""
+        with self._lock:
+            keys = [
+                k for k in self._candidates(south, west, north, east)
+                if south <= self._points[k][0] <= north and west <= self._points[k][1] <= east
+            ]
+            points = [self._points[k] for k in keys]
+        if not keys:
+            return []
+        clat, clon = (south + north) / 2, (west + east) / 2
+        distances = _haversine_many(clat, clon, [p[0] for p in points], [p[1] for p in points])
+        return [k for _, k in sorted(zip(distances, keys))[:limit]]
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Optional, Dict, Any, Tuple, Callable, TypeVar
+
+from passlib.context import CryptContext
+
+from .config import settings
+from .cpus import available_cpus
+from .metrics import STAGE_SECONDS
+
+T = TypeVar("T")
+
+# bcrypt cost από settings· hashes με άλλο cost ξαναγίνονται hash στο login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+class HashingBusy(Exception):
+    """Η ουρά του hashing pool είναι γεμάτη."""
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+
+
+_stats = _Stats()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _workers() -> int:
+    return settings.HASH_WORKERS or max(1, available_cpus() // max(1, settings.HASH_WORKER_SHARES))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # bcrypt αφήνει το GIL όσο κάνει hash, οπότε threads κλιμακώνουν με τους πυρήνες
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="bcrypt")
+    return _executor
+
+
+def shutdown_hashing() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Τρέχει το fn στο dedicated pool (όχι στο default threadpool του Starlette),
+    με όριο στην ουρά: πάνω από HASH_MAX_PENDING -> HashingBusy.
+    """
+    with _stats.lock:
+        if _stats.pending >= settings.HASH_MAX_PENDING:
+            _stats.rejected += 1
+            raise HashingBusy()
+        _stats.pending += 1
+    submitted = time.perf_counter()
+
+    def _job() -> T:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            done = time.perf_counter()
+            waited = started - submitted
+            STAGE_SECONDS.observe(waited, "hash_queue")
+            with _stats.lock:
+                _stats.completed += 1
+                _stats.queue_seconds_total += waited
+                _stats.queue_seconds_max = max(_stats.queue_seconds_max, waited)
+                _stats.run_seconds_total += done - started
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), _job)
+    finally:
+        with _stats.lock:
+            _stats.pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_password(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """(ok, new_hash): new_hash != None αν το hash είχε παλιό cost και πρέπει να αποθηκευτεί."""
+    ok, new_hash = await _run(pwd_context.verify_and_update, password, password_hash)
+    if ok and new_hash:
+        with _stats.lock:
+            _stats.rehashed += 1
+    return ok, new_hash
+
+
+def hashing_stats() -> Dict[str, Any]:
+    with _stats.lock:
+        completed = _stats.completed
+        return {
+            "workers": _workers(),
+            "bcryptRounds": settings.BCRYPT_ROUNDS,
+            "maxPending": settings.HASH_MAX_PENDING,
+            "pending": _stats.pending,
+            "completed": completed,
+            "rejected": _stats.rejected,
+            "rehashed": _stats.rehashed,
+            "queueSecondsAvg": round(_stats.queue_seconds_total / completed, 6) if completed else None,
+            "queueSecondsMax": round(_stats.queue_seconds_max, 6),
+            "runSecondsAvg": round(_stats.run_seconds_total / completed, 6) if completed else None,
+        }
@@ -0,0 +1,280 @@
+import asyncio
+import re
+from typing import Optional, Dict, Any, List, Tuple
+
+from .cache_store import MemoryCache
+from .config import settings
+from .logs import get_logger
+from .tiered import can_serve_stale, lookup, single_flight, split_inflight, store_many
+from .wikidata import TTL_JITTER, PoiProjection, commons_file_url
+from .upstream import get_client
+
+log = get_logger("images")
+
+COMMONS_HOST = "commons.wikimedia.org"
+
+IMAGE_TTL_SECONDS = settings.IMAGE_TTL_SECONDS
+# λίστα αρχείων ενός Commons category: αλλάζει συχνότερα από τα ίδια τα αρχεία
+COMMONS_CATEGORY_TTL_SECONDS = 24 * 60 * 60
+
+# L1: "img:<file>" -> imageinfo dict, "cc:<category>" -> [files]· L2 το κοινό SQLite
+_IMAGE_CACHE = MemoryCache(
+    settings.IMAGE_CACHE_MAX_ENTRIES, settings.IMAGE_CACHE_MAX_BYTES, IMAGE_TTL_SECONDS, TTL_JITTER
+)
+
+# widths για responsive loading (srcset)· το imageinfo ζητά το μεγαλύτερο
+# και τα υπόλοιπα βγαίνουν από το ίδιο thumbnail URL pattern
+IMAGE_WIDTHS = (320, 640, 1280)
+LIST_IMAGE_WIDTH = 640
+DETAIL_IMAGE_WIDTH = 1280
+
+IMAGEINFO_MAX_TITLES = 50
+IMAGEINFO_PROPS = "url|size|mime"
+IMAGE_DEADLINE_SECONDS = 3.0
+# ταυτόχρονα requests προς το Commons (π.χ. όταν ο warmer ζητά όλο τον κατάλογο)
+COMMONS_CONCURRENCY = 4
+# δημιουργείται στο πρώτο request, μέσα στο event loop που τρέχει (όχι στο import)
+_commons_sem: Optional[asyncio.Semaphore] = None
+# αρχεία ανά Commons category που φέρνουμε για τα extra images
+COMMONS_CATEGORY_LIMIT = 10
+
+_THUMB_WIDTH_RE = re.compile(r"/\d+px-([^/]+)$")
+
+
+def normalize_filename(filename: str) -> str:
+    """Όπως το κάνει το MediaWiki: χωρίς "File:", underscores -> κενά, κεφαλαίο πρώτο γράμμα."""
+    name = filename.strip()
+    if name[:5].lower() == "file:":
+        name = name[5:]
+    name = name.replace("_", " ").strip()
+    return name[:1].upper() + name[1:]
+
+
+def _info_from_page(page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    info = (page.get("imageinfo") or [{}])[0]
+    if not info.get("url"):
+        return None
+    return {
+        "url": info["url"],
+        "width": info.get("width"),
+        "height": info.get("height"),
+        "mime": info.get("mime"),
+        "thumbUrl": info.get("thumburl"),
+    }
+
+
+def _thumb_url(info: Dict[str, Any], width: int) -> Tuple[str, int, Optional[int]]:
+    """(url, width, height) για το ζητούμενο width, χωρίς upscale πέρα από το original."""
+    orig_w, orig_h = info.get("width") or 0, info.get("height")
+    thumb = info.get("thumbUrl")
+    if not thumb or not orig_w or width >= orig_w or not _THUMB_WIDTH_RE.search(thumb):
+        return info["url"], orig_w, orig_h
+    height = round(orig_h * width / orig_w) if orig_h else None
+    return _THUMB_WIDTH_RE.sub(lambda m: f"/{width}px-{m.group(1)}", thumb), width, height
+
+
+def image_variants(info: Dict[str, Any], widths: Tuple[int, ...] = IMAGE_WIDTHS) -> List[Dict[str, Any]]:
+    variants: Dict[str, Dict[str, Any]] = {}
+    for w in widths:
+        url, width, height = _thumb_url(info, w)
+        variants.setdefault(url, {"width": width, "height": height, "url": url})
+    return sorted(variants.values(), key=lambda v: v["width"] or 0)
+
+
+def _commons_slot() -> asyncio.Semaphore:
+    global _commons_sem
+    if _commons_sem is None:
+        _commons_sem = asyncio.Semaphore(COMMONS_CONCURRENCY)
+    return _commons_sem
+
+
+async def _imageinfo_query(params: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+    query = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "prop": "imageinfo",
+        "iiprop": IMAGEINFO_PROPS,
+        "iiurlwidth": str(max(IMAGE_WIDTHS)),
+        **params,
+    }
+    try:
+        async with _commons_slot():
+            r = await get_client(COMMONS_HOST).get("/w/api.php", params=query)
+        if r.status_code != 200:
+            log.warning("commons_bad_status", status=r.status_code)
+            return None
+        return (r.json().get("query") or {}).get("pages") or []
+    except Exception as e:
+        log.warning("commons_request_failed", error=str(e))
+        return None
+
+
+async def _fetch_imageinfo_batch(names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Έως 50 αρχεία ανά request. Επιστρέφει μόνο όσα απάντησε το Commons
+    ({"missing": True} για αρχεία που δεν υπάρχουν)· αποτυχία -> {}.
+    """
+    pages = await _imageinfo_query({"titles": "|".join(f"File:{n}" for n in names)})
+    if pages is None:
+        return {}
+    out: Dict[str, Dict[str, Any]] = {}
+    for page in pages:
+        name = normalize_filename(page.get("title") or "")
+        if not name:
+            continue
+        out[name] = _info_from_page(page) or {"missing": True}
+    await store_many(_IMAGE_CACHE, {f"img:{name}": info for name, info in out.items()})
+    return out
+
+
+async def _from_batch(batch: "asyncio.Future[Any]", name: str) -> Optional[Dict[str, Any]]:
+    return (await asyncio.shield(batch)).get(name)
+
+
+def _batch_flights(names: List[str]) -> Dict[str, "asyncio.Future[Any]"]:
+    """Ένα single-flight ανά αρχείο· όσα δεν είναι ήδη in-flight μοιράζονται imageinfo batches."""
+    flights, todo = split_inflight(names, "img")
+    chunks = [todo[i:i + IMAGEINFO_MAX_TITLES] for i in range(0, len(todo), IMAGEINFO_MAX_TITLES)]
+    for chunk in chunks:
+        batch = asyncio.ensure_future(_fetch_imageinfo_batch(chunk))
+        for name in chunk:
+            flights[name] = single_flight(f"img:{name}", lambda name=name, batch=batch: _from_batch(batch, name))
+    return flights
+
+
+async def resolve_images(
+        filenames: List[str],
+        deadline: float = IMAGE_DEADLINE_SECONDS,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Commons filename -> imageinfo (url, width, height, mime, thumbUrl), με cache
+    (L1/L2) και batched imageinfo requests για όσα λείπουν. Ληγμένα entries
+    σερβίρονται και ανανεώνονται στο background. None = άγνωστο/αποτυχία.
+    """
+    names = list(dict.fromkeys(normalize_filename(f) for f in filenames if f))
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    waiting: List[str] = []
+    refresh: List[str] = []
+    for name in names:
+        info, fresh, ts = await lookup(_IMAGE_CACHE, f"img:{name}", IMAGE_TTL_SECONDS)
+        if info is not None and (fresh or can_serve_stale(ts, IMAGE_TTL_SECONDS)):
+            results[name] = info
+            if not fresh:
+                refresh.append(name)
+        else:
+            results[name] = info  # stale-on-error
+            waiting.append(name)
+
+    flights = _batch_flights(waiting + refresh)
+
+    async def _wait(name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        try:
+            return name, await asyncio.wait_for(asyncio.shield(flights[name]), deadline)
+        except asyncio.TimeoutError:
+            log.warning("commons_deadline_exceeded", file=name, deadline=deadline)
+        except Exception as e:
+            log.warning("commons_request_failed", file=name, error=str(e))
+        return name, None
+
+    for name, info in await asyncio.gather(*(_wait(n) for n in waiting)):
+        if info is not None:
+            results[name] = info
+    return {n: (i if i and not i.get("missing") else None) for n, i in results.items()}
+
+
+async def _fetch_category_upstream(category: str) -> Optional[List[str]]:
+    pages = await _imageinfo_query({
+        "generator": "categorymembers",
+        "gcmtitle": f"Category:{category}",
+        "gcmtype": "file",
+        "gcmlimit": str(COMMONS_CATEGORY_LIMIT),
+    })
+    if pages is None:
+        return None
+    files: List[str] = []
+    items: Dict[str, Any] = {}
+    for page in sorted(pages, key=lambda p: p.get("index", 0)):
+        info = _info_from_page(page)
+        name = normalize_filename(page.get("title") or "")
+        # μόνο εικόνες (όχι pdf/video/audio)
+        if not info or not name or not (info.get("mime") or "").startswith("image/"):
+            continue
+        items[f"img:{name}"] = info
+        files.append(name)
+    items[f"cc:{category}"] = files
+    await store_many(_IMAGE_CACHE, items)
+    return files
+
+
+async def fetch_commons_category_files(category: str) -> List[str]:
+    """Αρχεία εικόνων του Commons category (P373), cached· [] αν αποτύχει."""
+    key = f"cc:{category}"
+    files, fresh, ts = await lookup(_IMAGE_CACHE, key, COMMONS_CATEGORY_TTL_SECONDS)
+    if files is not None and fresh:
+        return files
+    if files is not None and can_serve_stale(ts, COMMONS_CATEGORY_TTL_SECONDS):
+        single_flight(key, lambda: _fetch_category_upstream(category))
+        return files
+    fetched = await asyncio.shield(single_flight(key, lambda: _fetch_category_upstream(category)))
+    return fetched if fetched is not None else (files or [])
+
+
+def image_url(poi: PoiProjection, width: int = LIST_IMAGE_WIDTH) -> Optional[str]:
+    """Τελικό thumbnail URL από το cache (χωρίς redirect), αλλιώς το Special:FilePath URL."""
+    if not poi.imageFile:
+        return poi.image
+    entry = _IMAGE_CACHE.peek(f"img:{normalize_filename(poi.imageFile)}")
+    info = entry[1] if entry is not None else None
+    if not info or info.get("missing"):
+        return poi.image
+    return _thumb_url(info, width)[0]
+
+
+async def resolve_poi_images(pois: List[Optional[PoiProjection]], deadline: float = IMAGE_DEADLINE_SECONDS) -> None:
+    """Γεμίζει το cache για τα κύρια images μιας λίστας POIs (για το image_url)."""
+    files = [p.imageFile for p in pois if p and p.imageFile]
+    if files:
+        await resolve_images(files, deadline)
+
+
+async def poi_gallery(
+        poi: PoiProjection,
+        extra_files: List[str],
+        limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    Κύρια εικόνα + επιμελημένα extra (data.EXTRA_IMAGES) + αρχεία του Commons
+    category του POI, χωρίς διπλότυπα. Κάθε εικόνα έχει srcset σε IMAGE_WIDTHS.
+    """
+    category_files: List[str] = []
+    if poi.commonsCategory and len(extra_files) + 1 < limit:
+        category_files = await fetch_commons_category_files(poi.commonsCategory)
+
+    urls = [f for f in extra_files if f.startswith("http")]
+    names = list(dict.fromkeys(
+        normalize_filename(f)
+        for f in [poi.imageFile or "", *[f for f in extra_files if not f.startswith("http")], *category_files]
+        if f
+    ))[:limit]
+    infos = await resolve_images(names)
+
+    gallery: List[Dict[str, Any]] = []
+    for name in names:
+        info = infos.get(name)
+        if info is None:
+            if name == normalize_filename(poi.imageFile or ""):
+                url = commons_file_url(name, DETAIL_IMAGE_WIDTH)
+                gallery.append({"file": name, "url": url, "width": None, "height": None, "srcset": []})
+            continue
+        url, width, height = _thumb_url(info, DETAIL_IMAGE_WIDTH)
+        gallery.append({
+            "file": name, "url": url, "width": width, "height": height, "srcset": image_variants(info),
+        })
+    for url in urls:
+        gallery.append({"file": None, "url": url, "width": None, "height": None, "srcset": []})
+    return gallery[:limit]
+
+
+def image_cache_stats() -> Dict[str, Any]:
+    return _IMAGE_CACHE.stats()
@@ -0,0 +1,182 @@
+"""
+Bulk import των POIs της περιοχής Ιωαννίνων από το Wikidata (SPARQL)
+σε compact local dataset, που φορτώνει το app/catalogue.py στο startup.
+
+    cd api
+    python -m app.importer                          # query.wikidata.org
+    python -m app.importer --results results.json   # έτοιμο SPARQL results JSON
+    python -m app.importer --endpoint http://localhost:9000/sparql
+"""
+import argparse
+import json
+import re
+import sys
+import time
+import unicodedata
+from typing import Optional, Dict, Any, List, Tuple
+
+import httpx
+
+from .catalogue import CATALOGUE_FILE
+from .data import CATEGORIES, POIS
+from .upstream import UPSTREAM_HEADERS
+
+DEFAULT_ENDPOINT = "https://query.wikidata.org/sparql"
+
+# Περιφερειακή Ενότητα Ιωαννίνων (περίπου): south-west / north-east γωνία
+REGION_SW = (39.30, 20.30)
+REGION_NE = (40.30, 21.40)
+
+# Wikidata class -> κατηγορία του API (με P31/P279*)
+CLASS_CATEGORIES: Dict[str, str] = {
+    "Q33506": "museums",     # museum
+    "Q207694": "museums",    # art museum
+    "Q4989906": "monuments", # monument
+    "Q23413": "monuments",   # castle
+    "Q57821": "monuments",   # fortification
+    "Q32815": "monuments",   # mosque
+    "Q16970": "monuments",   # church building
+    "Q839954": "monuments",  # archaeological site
+    "Q46169": "nature",      # national park
+    "Q473972": "nature",     # protected area
+    "Q23397": "nature",      # lake
+    "Q8502": "nature",       # mountain
+    "Q150784": "nature",     # canyon
+    "Q35509": "nature",      # cave
+    "Q23442": "nature",      # island
+    "Q4022": "nature",       # river
+}
+
+# όταν ένα item ταιριάζει σε πολλές κατηγορίες
+CATEGORY_PRIORITY = ("museums", "monuments", "nature")
+
+QUERY_TEMPLATE = """
+SELECT ?item ?class ?coord ?labelEl ?labelEn WHERE {{
+  SERVICE wikibase:box {{
+    ?item wdt:P625 ?coord .
+    bd:serviceParam wikibase:cornerSouthWest "Point({sw_lon} {sw_lat})"^^geo:wktLiteral .
+    bd:serviceParam wikibase:cornerNorthEast "Point({ne_lon} {ne_lat})"^^geo:wktLiteral .
+  }}
+  ?item wdt:P31/wdt:P279* ?class .
+  VALUES ?class {{ {classes} }}
+  OPTIONAL {{ ?item rdfs:label ?labelEl FILTER(LANG(?labelEl) = "el") }}
+  OPTIONAL {{ ?item rdfs:label ?labelEn FILTER(LANG(?labelEn) = "en") }}
+}}
+"""
+
+_POINT_RE = re.compile(r"Point\(\s*([-\d.eE+]+)\s+([-\d.eE+]+)\s*\)")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def build_query() -> str:
+    return QUERY_TEMPLATE.format(
+        sw_lat=REGION_SW[0], sw_lon=REGION_SW[1],
+        ne_lat=REGION_NE[0], ne_lon=REGION_NE[1],
+        classes=" ".join(f"wd:{q}" for q in CLASS_CATEGORIES),
+    )
+
+
+def fetch_results(endpoint: str, timeout: float = 120.0) -> Dict[str, Any]:
+    headers = {**UPSTREAM_HEADERS, "Accept": "application/sparql-results+json"}
+    r = httpx.post(endpoint, data={"query": build_query()}, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+def _value(binding: Dict[str, Any], name: str) -> Optional[str]:
+    return (binding.get(name) or {}).get("value")
+
+
+def _qid(uri: Optional[str]) -> Optional[str]:
+    if not uri:
+        return None
+    qid = uri.rsplit("/", 1)[-1]
+    return qid if re.fullmatch(r"Q\d+", qid) else None
+
+
+def _point(wkt: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    m = _POINT_RE.search(wkt or "")
+    if not m:
+        return None, None
+    lon, lat = float(m.group(1)), float(m.group(2))
+    return lat, lon
+
+
+def slugify(text: str) -> str:
+    # τα ελληνικά γίνονται ASCII μέσω NFKD μόνο όσο γίνεται· αλλιώς fallback στο qid
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _SLUG_RE.sub("-", ascii_text.lower()).strip("-")
+
+
+def parse_results(results: Dict[str, Any]) -> List[List[Any]]:
+    """SPARQL results -> [[id, categoryId, qid, lat, lon], ...] (χωρίς τα hand-written POIs)."""
+    items: Dict[str, Dict[str, Any]] = {}
+    for b in (results.get("results") or {}).get("bindings") or []:
+        qid = _qid(_value(b, "item"))
+        category = CLASS_CATEGORIES.get(_qid(_value(b, "class")) or "")
+        if not qid or not category:
+            continue
+        item = items.setdefault(qid, {"categories": set(), "lat": None, "lon": None, "label": None})
+        item["categories"].add(category)
+        if item["lat"] is None:
+            item["lat"], item["lon"] = _point(_value(b, "coord"))
+        item["label"] = item["label"] or _value(b, "labelEn") or _value(b, "labelEl")
+
+    known_qids = {p["wikidataId"] for p in POIS}
+    used_ids = {p["id"] for p in POIS}
+    valid_categories = {c["id"] for c in CATEGORIES}
+    rows: List[List[Any]] = []
+    for qid in sorted(items, key=lambda q: int(q[1:])):
+        if qid in known_qids:
+            continue
+        item = items[qid]
+        category = next((c for c in CATEGORY_PRIORITY if c in item["categories"]), None)
+        if category not in valid_categories:
+            continue
+        poi_id = slugify(item["label"] or "")
+        if not re.search(r"[a-z]", poi_id):
+            poi_id = qid.lower()
+        if poi_id in used_ids:
+            poi_id = f"{poi_id}-{qid.lower()}"
+        used_ids.add(poi_id)
+        rows.append([poi_id, category, qid, item["lat"], item["lon"]])
+    return rows
+
+
+def write_dataset(rows: List[List[Any]], path: str, source: str) -> None:
+    data = {"version": 1, "generatedAt": int(time.time()), "source": source, "pois": rows}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import Ioannina POIs from Wikidata SPARQL")
+    parser.add_argument("--results", help="SPARQL results JSON file (αντί για HTTP query)")
+    parser.add_argument("--endpoint", default=DEFAULT_ENDPOINT, help="SPARQL endpoint")
+    parser.add_argument("--output", default=CATALOGUE_FILE, help="dataset path")
+    parser.add_argument("--print-query", action="store_true", help="τύπωσε το query και σταμάτα")
+    args = parser.parse_args(argv)
+
+    if args.print_query:
+        print(build_query())
+        return 0
+
+    if args.results:
+        with open(args.results, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        source = args.results
+    else:
+        results = fetch_results(args.endpoint)
+        source = args.endpoint
+
+    rows = parse_results(results)
+    write_dataset(rows, args.output, source)
+    counts: Dict[str, int] = {}
+    for row in rows:
+        counts[row[1]] = counts.get(row[1], 0) + 1
+    print(f"Imported {len(rows)} POIs -> {args.output} {counts}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
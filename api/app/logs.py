@@ -0,0 +1,67 @@
+import json
+import logging
+import sys
+from typing import Any
+
+from .config import settings
+
+_ROOT = "app"
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Μία γραμμή JSON ανά event: {"ts", "level", "logger", "pid", "event", ...fields}."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "pid": record.process,
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging() -> None:
+    global _configured
+    if _configured:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger(_ROOT)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.propagate = False
+    _configured = True
+
+
+class EventLogger:
+    """Structured logging: log.warning("wikidata_bad_status", qid=qid, status=503)."""
+
+    def __init__(self, name: str):
+        configure_logging()
+        self._logger = logging.getLogger(f"{_ROOT}.{name}")
+
+    def _log(self, level: int, event: str, fields: Any) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self._log(logging.ERROR, event, fields)
+
+
+def get_logger(name: str) -> EventLogger:
+    return EventLogger(name)
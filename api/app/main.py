@@ -1,19 +1,337 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
-from typing import Optional, List
+import asyncio
+import base64
+import hmac
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from itertools import islice
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import Any, Optional, List, Set, Dict, Union
 
 from .models import (
     AboutMember, LoginRequest, TokenResponse, RefreshRequest,
     SignupRequest,
-    CategoryOut, PoiListItem, PoiDetails
+    CategoryOut, PoiListItem, PoiNearbyItem, PoiSearchItem, PoiDetails
 )
-from .data import TEAM_MEMBERS, CATEGORIES, POIS, EXTRA_IMAGES
-from .auth import verify_user, create_access_token, create_refresh_token, decode_token, register_user
-from .wikidata import fetch_wikidata_entity, parse_poi_from_wikidata, commons_file_url, fetch_wikipedia_short_description
+from .data import TEAM_MEMBERS, EXTRA_IMAGES
+from .bundle import BundleCache, choose_encoding
+from .catalogue import catalogue
+from .config import settings
+from .hashing import HashingBusy, hashing_stats, shutdown_hashing
+from .auth import (
+    user_store, verify_user, create_access_token, create_refresh_token, decode_token, register_user,
+    rotate_refresh_token, token_cache_stats,
+)
+from .wikidata import (
+    fetch_wikidata_entity, fetch_poi, fetch_pois, fetch_poi_with_summary, schedule_summary_prefetch,
+    close_cache, stop_prefetches, known_missing, TTL_SECONDS,
+    PoiProjection, on_projection, on_summary, peek_wikipedia_summary, cache_stats,
+)
+from .geo import GeoIndex
+from .images import (
+    LIST_IMAGE_WIDTH, DETAIL_IMAGE_WIDTH, image_url, image_cache_stats, poi_gallery, resolve_poi_images,
+)
+from .search import SearchIndex
+from .tiered import inflight_fetches
+from .logs import get_logger
+from .metrics import HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, register_collector, render as render_metrics
+from .resilience import resilience_stats
+from .responses import conditional_bytes, conditional_json, dumps, make_etag
+from .upstream import start_clients, close_clients
+from .warmer import start_warmer, stop_warmer, warmer_status
+
+log = get_logger("main")
+access_log = get_logger("access")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_clients()
+    start_warmer()
+    try:
+        yield
+    finally:
+        # graceful shutdown: πρώτα ό,τι κάνει upstream requests, μετά clients και βάσεις
+        await stop_warmer()
+        await stop_prefetches()
+        await close_clients()
+        close_cache()
+        shutdown_hashing()
+        user_store.close()
+
+
+app = FastAPI(title="Mobile Apps Assignment API", version="1.0.0", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Latency histogram ανά route (template, όχι path) + JSON access log."""
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - started
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(elapsed, request.method, route, status)
+        if settings.ACCESS_LOG:
+            access_log.info(
+                "request",
+                method=request.method,
+                path=request.url.path,
+                route=route,
+                status=status,
+                durationMs=round(elapsed * 1000, 2),
+                client=request.client.host if request.client else None,
+            )
+
+
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _runtime_metrics():
+    caches = {**cache_stats(), "images": image_cache_stats(), "tokens": token_cache_stats()}
+    yield "cache_hit_ratio", "gauge", "Hit ratio ανά in-memory cache", [
+        ({"cache": name}, stats["hitRatio"]) for name, stats in caches.items()
+    ]
+    yield "cache_hits_total", "counter", "Cache hits ανά cache", [
+        ({"cache": name}, stats["hits"]) for name, stats in caches.items()
+    ]
+    yield "cache_misses_total", "counter", "Cache misses ανά cache", [
+        ({"cache": name}, stats["misses"]) for name, stats in caches.items()
+    ]
+    yield "cache_entries", "gauge", "Entries ανά cache", [
+        ({"cache": name}, stats["entries"]) for name, stats in caches.items()
+    ]
+    yield "cache_evictions_total", "counter", "Entries που έφυγαν λόγω ορίου (LRU) ανά cache", [
+        ({"cache": name}, stats["evictions"]) for name, stats in caches.items()
+    ]
+    # το token cache μετράει μόνο entries (όχι bytes)
+    yield "cache_bytes", "gauge", "Εκτιμώμενο μέγεθος ανά cache", [
+        ({"cache": name}, stats["bytes"]) for name, stats in caches.items() if "bytes" in stats
+    ]
+    hashing = hashing_stats()
+    yield "password_hashing_pending", "gauge", "bcrypt jobs σε αναμονή ή εκτέλεση", [({}, hashing["pending"])]
+    yield "password_hashing_completed_total", "counter", "bcrypt jobs που ολοκληρώθηκαν", [({}, hashing["completed"])]
+    yield "password_hashing_rejected_total", "counter", "bcrypt jobs που απορρίφθηκαν (503)", [({}, hashing["rejected"])]
+    yield "upstream_fetches_in_flight", "gauge", "Single-flight upstream fetches που τρέχουν", [({}, inflight_fetches())]
+    hosts = resilience_stats()
+    yield "upstream_circuit_state", "gauge", "Breaker ανά host: 0 closed, 1 half-open, 2 open", [
+        ({"host": host}, CIRCUIT_STATES[s["circuit"]["state"]]) for host, s in hosts.items()
+    ]
+    yield "upstream_circuit_opened_total", "counter", "Πόσες φορές άνοιξε ο breaker", [
+        ({"host": host}, s["circuit"]["opened"]) for host, s in hosts.items()
+    ]
+    yield "upstream_fast_failures_total", "counter", "Requests που απορρίφθηκαν αμέσως (breaker ή rate limit)", [
+        ({"host": host, "reason": "circuit"}, s["circuit"]["rejected"]) for host, s in hosts.items()
+    ] + [
+        ({"host": host, "reason": "rate_limit"}, s["rateLimit"]["rejected"]) for host, s in hosts.items()
+    ]
+    yield "upstream_retries_total", "counter", "Retries ανά host", [
+        ({"host": host}, s["retries"]) for host, s in hosts.items()
+    ]
+    yield "upstream_retry_budget_exhausted_total", "counter", "Retries που δεν έγιναν λόγω retry budget", [
+        ({"host": host}, s["retryBudgetExhausted"]) for host, s in hosts.items()
+    ]
+    yield "upstream_rate_limit_per_second", "gauge", "Τρέχον (adaptive) rate του token bucket", [
+        ({"host": host}, s["rateLimit"]["ratePerSecond"]) for host, s in hosts.items()
+    ]
+    yield "upstream_rate_limit_wait_seconds_total", "counter", "Συνολική αναμονή στο token bucket", [
+        ({"host": host}, s["rateLimit"]["waitSeconds"]) for host, s in hosts.items()
+    ]
+
+
+register_collector(_runtime_metrics)
+
+# Cache-Control: οι κατηγορίες είναι στατικές (data.py), τα POIs ακολουθούν το Wikidata TTL
+CATEGORIES_CACHE_CONTROL = "private, max-age=86400"
+POI_CACHE_CONTROL = f"private, max-age={TTL_SECONDS}"
+
+# /pois/{id}: πεδία που επιστρέφονται μόνο αν ζητηθούν (include=raw)
+DETAIL_FIELDS = set(PoiDetails.model_fields)
+OPTIONAL_DETAIL_FIELDS = {"raw"}
+DETAIL_IMAGES_MAX = 3
+
+
+def _csv_param(value: Optional[str]) -> Set[str]:
+    return {v.strip() for v in value.split(",") if v.strip()} if value else set()
+
+
+def _list_item(p: dict, poi: PoiProjection) -> dict:
+    return {
+        "id": p["id"],
+        "categoryId": p["categoryId"],
+        "wikidataId": p["wikidataId"],
+        "title": poi.title,
+        "description": poi.description,
+        "lat": poi.lat,
+        "lon": poi.lon,
+        "image": image_url(poi, LIST_IMAGE_WIDTH),
+        "wikipediaUrl": poi.wikipediaUrl,
+    }
 
-app = FastAPI(title="Mobile Apps Assignment API", version="1.0.0")
+
+# Spatial index (qid -> lat/lon): seed από τα coords του imported dataset,
+# μετά ενημερώνεται με κάθε νέα projection
+geo_index = GeoIndex()
+for _p in catalogue.pois:
+    if _p.get("lat") is not None and _p.get("lon") is not None:
+        geo_index.upsert(_p["wikidataId"], _p["lat"], _p["lon"])
+on_projection(lambda poi: geo_index.upsert(poi.qid, poi.lat, poi.lon))
+
+# Full-text index (qid -> title/description/summary/facts), ενημερώνεται
+# incrementally με κάθε projection και κάθε Wikipedia summary
+search_index = SearchIndex()
+_search_qids_by_url: Dict[str, Set[str]] = {}
+
+
+def _index_projection(poi: PoiProjection) -> None:
+    # τα URLs (π.χ. ιστότοπος) δεν είναι χρήσιμο κείμενο για αναζήτηση
+    facts = " ".join(
+        str(f.get("value")) for f in poi.facts or []
+        if f.get("value") and not str(f.get("value")).startswith("http")
+    )
+    fields = {"title": poi.title or "", "description": poi.description or "", "facts": facts}
+    if poi.wikipediaUrl:
+        _search_qids_by_url.setdefault(poi.wikipediaUrl, set()).add(poi.qid)
+        summary = peek_wikipedia_summary(poi.wikipediaUrl)
+        if summary is not None:
+            fields["summary"] = summary
+    search_index.update_fields(poi.qid, **fields)
+
+
+def _index_summary(wikipedia_url: str, summary: str) -> None:
+    for qid in _search_qids_by_url.get(wikipedia_url, ()):
+        search_index.update_fields(qid, summary=summary)
+
+
+on_projection(_index_projection)
+on_summary(_index_summary)
+
+# /pois/categories: στατικό, υπολογίζεται μία φορά
+_counts = catalogue.counts()
+CATEGORIES_OUT = [{"id": c["id"], "name": c["name"], "count": _counts.get(c["id"], 0)} for c in catalogue.categories]
+CATEGORIES_ETAG = make_etag("categories", CATEGORIES_OUT)
+
+# /pois/bundle: όλος ο κατάλογος (categories + list items + slim details) για
+# offline χρήση, από τις projections/summaries που έχουν ήδη έρθει· χωρίς upstream requests.
+# Κρατάμε μόνο τα POIs του καταλόγου και τα summaries των URLs τους (όριο = μέγεθος καταλόγου).
+_bundle_pois: Dict[str, PoiProjection] = {}
+_bundle_summaries: Dict[str, str] = {}
+_bundle_qids_by_url: Dict[str, Set[str]] = {}
+
+
+def _bundle_entries() -> Dict[str, dict]:
+    out: Dict[str, dict] = {}
+    for p in catalogue.pois:
+        poi = _bundle_pois.get(p["wikidataId"])
+        row = _category_row(p, poi)
+        if row is None:
+            continue
+        urls = (poi.wikipediaUrl, *poi.wikipediaFallbackUrls)
+        summary = next((_bundle_summaries[u] for u in urls if _bundle_summaries.get(u)), None)
+        row["facts"] = poi.facts
+        row["shortDescription"] = summary or poi.description
+        out[p["id"]] = row
+    return out
 
 
-def require_access_token(authorization: Optional[str] = Header(default=None)) -> str:
+bundle_cache = BundleCache(_bundle_entries, {"categories": CATEGORIES_OUT}, settings.BUNDLE_REBUILD_SECONDS)
+
+
+def _wikipedia_urls(poi: PoiProjection) -> Set[str]:
+    return {u for u in (poi.wikipediaUrl, *poi.wikipediaFallbackUrls) if u}
+
+
+def _bundle_projection(poi: PoiProjection) -> None:
+    if poi.qid not in catalogue.by_qid:
+        return
+    previous = _bundle_pois.get(poi.qid)
+    _bundle_pois[poi.qid] = poi
+    urls = _wikipedia_urls(poi)
+    for url in _wikipedia_urls(previous) - urls if previous is not None else ():
+        qids = _bundle_qids_by_url.get(url, set())
+        qids.discard(poi.qid)
+        if not qids:
+            _bundle_qids_by_url.pop(url, None)
+            _bundle_summaries.pop(url, None)
+    for url in urls:
+        _bundle_qids_by_url.setdefault(url, set()).add(poi.qid)
+        summary = peek_wikipedia_summary(url)
+        if summary is not None:
+            _bundle_summaries[url] = summary
+    if previous is None or previous.version != poi.version:
+        bundle_cache.invalidate()
+
+
+def _bundle_summary(wikipedia_url: str, summary: str) -> None:
+    if wikipedia_url not in _bundle_qids_by_url:
+        return
+    if _bundle_summaries.get(wikipedia_url) != summary:
+        _bundle_summaries[wikipedia_url] = summary
+        bundle_cache.invalidate()
+
+
+on_projection(_bundle_projection)
+on_summary(_bundle_summary)
+
+CATEGORY_MAX_LIMIT = 500
+# NDJSON streaming: POIs ανά batch (= ένα wbgetentities request), λίγα batches τη φορά
+STREAM_CHUNK = 50
+STREAM_WINDOW = 2
+
+NEARBY_MAX_RADIUS_M = 200_000
+GEO_MAX_LIMIT = 500
+SEARCH_MAX_LIMIT = 100
+SEARCH_MAX_QUERY = 200
+
+
+# qids του καταλόγου που ζητήσαμε για τα indexes χωρίς να έρθουν (π.χ. διαγραμμένα
+# entities, αποτυχημένα batches): ξαναδοκιμάζονται μόνο μετά από INDEX_RETRY_SECONDS
+INDEX_RETRY_SECONDS = 5 * 60
+_index_retry_at: Dict[str, float] = {}
+_index_fills: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+async def _ensure_indexed(name: str, covered: Union[Set[str], SearchIndex]) -> None:
+    """
+    Φροντίζει να είναι όλος ο κατάλογος σε ένα index· covered = τα qids που
+    έχει ήδη (geo_index.known, search_index). Ένα κοινό fetch για όσα λείπουν.
+    Το geo index έχει ήδη τα coords του dataset, το search όχι: γι' αυτό η
+    κάλυψη μετριέται χωριστά ανά index.
+    """
+    fill = _index_fills.get(name)
+    if fill is None or fill.done():
+        if len(covered) >= len(catalogue.by_qid):
+            return
+        now = time.monotonic()
+        missing = [
+            q for q in catalogue.by_qid
+            if q not in covered and _index_retry_at.get(q, 0.0) <= now
+        ]
+        if not missing:
+            return
+        for q in missing:
+            _index_retry_at[q] = now + INDEX_RETRY_SECONDS
+        fill = _index_fills[name] = asyncio.ensure_future(fetch_pois(missing))
+    # shield: ένα request που ακυρώνεται δεν ακυρώνει το fetch των υπολοίπων
+    await asyncio.shield(fill)
+
+
+async def _indexed_pois(qids: List[str]) -> Dict[str, PoiProjection]:
+    """Projections των hits ενός index query (χωρίς όσα δεν υπάρχουν/απέτυχαν)."""
+    pois = await fetch_pois(qids)
+    return {q: poi for q, poi in pois.items() if poi}
+
+
+async def require_access_token(authorization: Optional[str] = Header(default=None)) -> str:
+    # async: ένα HMAC (ή cache hit) είναι φθηνότερο από το hop στο threadpool του Starlette
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing Bearer token")
     token = authorization.split(" ", 1)[1]
@@ -23,14 +341,40 @@ def require_access_token(authorization: Optional[str] = Header(default=None)) ->
     return payload["sub"]
 
 
+@app.get("/ready")
+def ready():
+    # readiness: 200 μόνο όταν ο κατάλογος είναι ζεστός στο cache· χωρίς warmer
+    # δεν υπάρχει warm-up να περιμένουμε (το cache γεμίζει από τα requests)
+    status = warmer_status()
+    ready = status["ready"] or not status["enabled"]
+    return JSONResponse({**status, "ready": ready}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(default=None)):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {settings.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/about", response_model=List[AboutMember])
 def about():
     return TEAM_MEMBERS
 
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Too many login attempts, try again", headers={"Retry-After": "1"})
+
+
 @app.post("/api/auth/login", response_model=TokenResponse)
-def login(body: LoginRequest):
-    if not verify_user(body.email, body.password):
+async def login(body: LoginRequest):
+    try:
+        ok = await verify_user(body.email, body.password)
+    except HashingBusy:
+        raise _hashing_busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     return {
         "accessToken": create_access_token(body.email),
@@ -39,13 +383,15 @@ def login(body: LoginRequest):
 
 
 @app.post("/api/auth/signup", response_model=TokenResponse)
-def signup(body: SignupRequest):
+async def signup(body: SignupRequest):
     if len(body.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
     try:
-        register_user(body.email, body.password)
+        await register_user(body.email, body.password)
     except ValueError:
         raise HTTPException(status_code=409, detail="User already exists")
+    except HashingBusy:
+        raise _hashing_busy()
     return {
         "accessToken": create_access_token(body.email),
         "refreshToken": create_refresh_token(body.email),
@@ -57,6 +403,9 @@ def refresh(body: RefreshRequest):
     payload = decode_token(body.refreshToken)
     if not payload or payload.get("type") != "refresh":
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    # rotation: κάθε refresh token χρησιμοποιείται μία φορά
+    if not rotate_refresh_token(payload):
+        raise HTTPException(status_code=401, detail="Refresh token already used")
     email = payload["sub"]
     return {
         "accessToken": create_access_token(email),
@@ -65,103 +414,301 @@ def refresh(body: RefreshRequest):
 
 
 @app.get("/pois/categories", response_model=List[CategoryOut])
-def get_categories(user: str = Depends(require_access_token)):
-    counts = {c["id"]: 0 for c in CATEGORIES}
-    for p in POIS:
-        if p["categoryId"] in counts:
-            counts[p["categoryId"]] += 1
-    return [{"id": c["id"], "name": c["name"], "count": counts.get(c["id"], 0)} for c in CATEGORIES]
+def get_categories(request: Request, user: str = Depends(require_access_token)):
+    return conditional_json(request, CATEGORIES_OUT, CATEGORIES_ETAG, CATEGORIES_CACHE_CONTROL)
 
 
-@app.get("/pois/categories/{id}", response_model=List[PoiListItem])
-async def get_pois_by_category(id: str, user: str = Depends(require_access_token)):
-    items = [p for p in POIS if p["categoryId"] == id]
-    if not any(c["id"] == id for c in CATEGORIES):
-        raise HTTPException(status_code=404, detail="Category not found")
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode("ascii")).decode("ascii").rstrip("=")
 
-    out: List[PoiListItem] = []
-    for p in items:
-        try:
-            wd = await fetch_wikidata_entity(p["wikidataId"])
-            if not wd:
-                continue
 
-            parsed = parse_poi_from_wikidata(p["wikidataId"], wd)
+def _decode_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        prefix, offset = raw.split(":", 1)
+        if prefix != "o" or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
-            # Αν δεν έχει coords, δεν μπορεί να μπει σωστά στον χάρτη
-            if parsed.get("lat") is None or parsed.get("lon") is None:
-                continue
+def _category_row(p: dict, poi: Optional[PoiProjection]) -> Optional[dict]:
+    # Αν δεν έχει coords, δεν μπορεί να μπει σωστά στον χάρτη
+    if not poi or poi.lat is None or poi.lon is None:
+        return None
+    return _list_item(p, poi)
 
-            out.append({
-                "id": p["id"],
-                "categoryId": p["categoryId"],
-                "wikidataId": p["wikidataId"],
-                "title": parsed.get("title"),
-                "description": parsed.get("description"),
-                "lat": parsed.get("lat"),
-                "lon": parsed.get("lon"),
-                "image": parsed.get("image"),
-                "wikipediaUrl": parsed.get("wikipediaUrl"),
-            })
-        except Exception as e:
-            print(f"⚠️ Skipping POI {p.get('id')} ({p.get('wikidataId')}): {e}")
-            continue
 
-    return out
+def _prefetch_summaries(pois: Dict[str, Optional[PoiProjection]]) -> None:
+    # το επόμενο βήμα του client είναι συνήθως το details ενός POI της σελίδας
+    if settings.SUMMARY_PREFETCH:
+        schedule_summary_prefetch(list(pois.values()))
+
 
+async def _stream_category(items: List[dict]):
+    """
+    NDJSON: ένα POI ανά γραμμή, batch-batch με τη σειρά του καταλόγου. Το πολύ
+    STREAM_WINDOW batches σε πτήση (το επόμενο φορτώνει όσο γράφεται το τρέχον).
+    """
+    chunks = iter([items[i:i + STREAM_CHUNK] for i in range(0, len(items), STREAM_CHUNK)])
 
-@app.get("/pois/{id}", response_model=PoiDetails)
-async def get_poi_details(id: str, user: str = Depends(require_access_token)):
-    p = next((x for x in POIS if x["id"] == id), None)
+    async def _chunk(chunk: List[dict]):
+        pois = await fetch_pois([p["wikidataId"] for p in chunk])
+        await resolve_poi_images(list(pois.values()))
+        return chunk, pois
+
+    window = deque(asyncio.ensure_future(_chunk(c)) for c in islice(chunks, STREAM_WINDOW))
+    try:
+        while window:
+            chunk, pois = await window.popleft()
+            following = next(chunks, None)
+            if following is not None:
+                window.append(asyncio.ensure_future(_chunk(following)))
+            _prefetch_summaries(pois)
+            for p in chunk:
+                row = _category_row(p, pois.get(p["wikidataId"]))
+                if row is not None:
+                    yield dumps(row) + b"\n"
+    finally:
+        # ο client έκλεισε: τα upstream fetches είναι shielded single-flights
+        for task in window:
+            task.cancel()
+
+
+@app.get("/pois/categories/{id}", response_model=List[PoiListItem])
+async def get_pois_by_category(
+        request: Request,
+        id: str,
+        limit: Optional[int] = Query(default=None, ge=1, le=CATEGORY_MAX_LIMIT, description="Μέγεθος σελίδας"),
+        cursor: Optional[str] = Query(default=None, description="X-Next-Cursor της προηγούμενης σελίδας"),
+        format: Optional[str] = Query(default=None, pattern="^(json|ndjson)$"),
+        user: str = Depends(require_access_token),
+):
+    if id not in catalogue.category_by_id:
+        raise HTTPException(status_code=404, detail="Category not found")
+    items = catalogue.by_category.get(id, [])
+
+    # σελίδα = slice του καταλόγου· χωρίς limit επιστρέφονται όλα (όπως πριν)
+    offset = _decode_cursor(cursor)
+    end = len(items) if limit is None else min(offset + limit, len(items))
+    page = items[offset:end]
+    headers = {"X-Next-Cursor": _encode_cursor(end)} if end < len(items) else {}
+
+    wants_ndjson = format == "ndjson" or (
+        format is None and "application/x-ndjson" in request.headers.get("accept", "")
+    )
+    if wants_ndjson:
+        return StreamingResponse(_stream_category(page), media_type="application/x-ndjson", headers=headers)
+
+    # όλα τα entities παράλληλα -> latency ~ του πιο αργού, όχι άθροισμα
+    pois = await fetch_pois([p["wikidataId"] for p in page])
+    _prefetch_summaries(pois)
+    await resolve_poi_images(list(pois.values()))
+
+    out: List[dict] = []
+    versions: List[str] = []
+    for p in page:
+        try:
+            poi = pois.get(p["wikidataId"])
+            row = _category_row(p, poi)
+            if row is None:
+                continue
+            out.append(row)
+            versions.append(f'{p["id"]}:{poi.version}:{row["image"]}')
+        except Exception as e:
+            log.warning("poi_skipped", id=p.get("id"), qid=p.get("wikidataId"), error=str(e))
+            continue
+
+    response = conditional_json(
+        request, out, make_etag("category", id, offset, end, versions), POI_CACHE_CONTROL
+    )
+    response.headers.update(headers)
+    return response
+
+
+@app.get("/pois/nearby", response_model=List[PoiNearbyItem])
+async def get_pois_nearby(
+        request: Request,
+        lat: float = Query(ge=-90, le=90),
+        lon: float = Query(ge=-180, le=180),
+        radius: float = Query(default=5000, gt=0, le=NEARBY_MAX_RADIUS_M, description="Ακτίνα σε μέτρα"),
+        limit: int = Query(default=20, ge=1, le=GEO_MAX_LIMIT),
+        user: str = Depends(require_access_token),
+):
+    await _ensure_indexed("geo", geo_index.known)
+    hits = geo_index.nearby(lat, lon, radius, limit * 2)
+    pois = await _indexed_pois([q for q, _ in hits])
+    await resolve_poi_images(list(pois.values()))
+
+    out: List[dict] = []
+    for qid, distance in hits:
+        poi = pois.get(qid)
+        if not poi:
+            continue
+        for p in catalogue.by_qid.get(qid, []):
+            out.append({**_list_item(p, poi), "distanceMeters": round(distance, 1)})
+    out = out[:limit]
+    etag = make_etag("nearby", [(x["id"], x["distanceMeters"], pois[x["wikidataId"]].version, x["image"]) for x in out])
+    return conditional_json(request, out, etag, POI_CACHE_CONTROL)
+
+
+@app.get("/pois/bbox", response_model=List[PoiListItem])
+async def get_pois_in_bbox(
+        request: Request,
+        south: float = Query(ge=-90, le=90),
+        west: float = Query(ge=-180, le=180),
+        north: float = Query(ge=-90, le=90),
+        east: float = Query(ge=-180, le=180),
+        limit: int = Query(default=100, ge=1, le=GEO_MAX_LIMIT),
+        user: str = Depends(require_access_token),
+):
+    if south > north or west > east:
+        raise HTTPException(status_code=400, detail="Invalid bbox: expected south<=north and west<=east")
+    await _ensure_indexed("geo", geo_index.known)
+    qids = geo_index.bbox(south, west, north, east, limit)
+    pois = await _indexed_pois(qids)
+    await resolve_poi_images(list(pois.values()))
+
+    out: List[dict] = []
+    for qid in qids:
+        poi = pois.get(qid)
+        if not poi:
+            continue
+        for p in catalogue.by_qid.get(qid, []):
+            out.append(_list_item(p, poi))
+    out = out[:limit]
+    etag = make_etag("bbox", [(x["id"], pois[x["wikidataId"]].version, x["image"]) for x in out])
+    return conditional_json(request, out, etag, POI_CACHE_CONTROL)
+
+
+@app.get("/pois/bundle")
+async def get_bundle(
+        request: Request,
+        since: Optional[str] = Query(default=None, max_length=64, description="version του τελευταίου sync (delta)"),
+        user: str = Depends(require_access_token),
+):
+    # τα entries μαζεύονται εδώ, στο loop (image_url/L1 caches δεν είναι thread-safe)·
+    # hashing, JSON και συμπίεση σε thread. Άγνωστο/παλιό since -> πλήρες snapshot ("full": true)
+    bundle_cache.collect()
+    result = await run_in_threadpool(bundle_cache.delta, since) if since else None
+    if result is None:
+        result = await run_in_threadpool(bundle_cache.full)
+        since = None
+    version, blob = result
+
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    body = await run_in_threadpool(blob.encoded, encoding)
+    headers = {"Vary": "Accept-Encoding", "X-Bundle-Version": version}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return conditional_bytes(request, body, make_etag("bundle", version, since), POI_CACHE_CONTROL, headers=headers)
+
+
+@app.get("/pois/search", response_model=List[PoiSearchItem])
+async def search_pois(
+        request: Request,
+        q: str = Query(min_length=1, max_length=SEARCH_MAX_QUERY, description="Κείμενο αναζήτησης (prefix για type-ahead)"),
+        limit: int = Query(default=20, ge=1, le=SEARCH_MAX_LIMIT),
+        user: str = Depends(require_access_token),
+):
+    await _ensure_indexed("search", search_index)
+    hits = search_index.search(q, limit)
+    pois = await _indexed_pois([qid for qid, _ in hits])
+    await resolve_poi_images(list(pois.values()))
+
+    out: List[dict] = []
+    for qid, score in hits:
+        poi = pois.get(qid)
+        if not poi:
+            continue
+        for p in catalogue.by_qid.get(qid, []):
+            out.append({**_list_item(p, poi), "score": score})
+    out = out[:limit]
+    etag = make_etag("search", [(x["id"], x["score"], pois[x["wikidataId"]].version, x["image"]) for x in out])
+    return conditional_json(request, out, etag, POI_CACHE_CONTROL)
+
+
+@app.get("/pois/{id}", response_model=PoiDetails, response_model_exclude_unset=True)
+async def get_poi_details(
+        request: Request,
+        id: str,
+        fields: Optional[str] = Query(default=None, description="Comma-separated πεδία, π.χ. title,lat,lon"),
+        include: Optional[str] = Query(default=None, description="Extra πεδία εκτός default, π.χ. raw"),
+        user: str = Depends(require_access_token),
+):
+    wanted = _csv_param(fields)
+    extras = _csv_param(include)
+    unknown = (wanted | extras) - DETAIL_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # slim default: όλα εκτός από raw
+    selected = (wanted or (DETAIL_FIELDS - OPTIONAL_DETAIL_FIELDS)) | extras | {"id"}
+
+    p = catalogue.by_id.get(id)
 
     if not p:
         raise HTTPException(status_code=404, detail="POI not found")
 
-    cat = next((c for c in CATEGORIES if c["id"] == p["categoryId"]), None)
-
-    wd = await fetch_wikidata_entity(p["wikidataId"])
-    if not wd:
-        raise HTTPException(status_code=502, detail="Wikidata unavailable")
+    cat = catalogue.category_by_id.get(p["categoryId"])
 
-    parsed = parse_poi_from_wikidata(p["wikidataId"], wd)
+    # summary παράλληλα με το entity όταν ξέρουμε ήδη τα sitelinks
     short_desc = None
-    if parsed.get("wikipediaUrl"):
-        short_desc = await fetch_wikipedia_short_description(parsed["wikipediaUrl"])
-    # ---- images (3) ----
-    images: List[str] = []
-    if parsed.get("image"):
-        images.append(parsed["image"])
+    if "shortDescription" in selected:
+        poi, short_desc = await fetch_poi_with_summary(p["wikidataId"])
+    else:
+        poi = await fetch_poi(p["wikidataId"])
+    if not poi and known_missing(p["wikidataId"]):
+        raise HTTPException(status_code=404, detail="POI not found")
+    if not poi:
+        raise HTTPException(status_code=502, detail="Wikidata unavailable")
 
-    extra = EXTRA_IMAGES.get(id, [])
-    for filename in extra[:3]:
-        images.append(commons_file_url(filename, 1100))
+    # raw entity: μόνο αν ζητηθεί, lazily από το L2 (δεν κρατιέται στη μνήμη)
+    raw = None
+    if "raw" in selected:
+        wd = await fetch_wikidata_entity(p["wikidataId"])
+        raw = ((wd or {}).get("entities") or {}).get(p["wikidataId"])
 
-    while len(images) < 3 and len(images) > 0:
-        images.append(images[0])
+    # ---- images: κύρια + EXTRA_IMAGES + Commons category, χωρίς διπλότυπα ----
+    gallery: List[dict] = []
+    if selected & {"image", "images", "gallery"}:
+        gallery = await poi_gallery(poi, EXTRA_IMAGES.get(id, []), DETAIL_IMAGES_MAX)
+    images = [g["url"] for g in gallery]
 
     # ---- extraText from facts ----
-    facts = parsed.get("facts", [])
+    facts = poi.facts
     extra_text = "\n".join([f'{f["label"]}: {f["value"]}' for f in facts]) if facts else ""
 
-    return {
+    out = {
         "id": p["id"],
         "categoryId": p["categoryId"],
         "wikidataId": p["wikidataId"],
         "categoryName": cat["name"] if cat else None,
 
-        "title": parsed.get("title"),
-        "description": parsed.get("description"),
-        "lat": parsed.get("lat"),
-        "lon": parsed.get("lon"),
+        "title": poi.title,
+        "description": poi.description,
+        "lat": poi.lat,
+        "lon": poi.lon,
 
-        "image": parsed.get("image"),
-        "wikipediaUrl": parsed.get("wikipediaUrl"),
+        "image": image_url(poi, DETAIL_IMAGE_WIDTH),
+        "wikipediaUrl": poi.wikipediaUrl,
 
         "images": images,
+        "gallery": gallery,
 
         # ✅ ΕΠΙΣΤΡΕΦΕΙ ΟΛΑ:
         "facts": facts,
         "extraText": extra_text,
-        "raw": parsed.get("raw"),   # ✅ ΟΛΟ το Wikidata entity (claims κτλ)
-        "shortDescription": short_desc or parsed.get("description"),
+        "raw": raw,   # ✅ ΟΛΟ το Wikidata entity (claims κτλ)
+        "shortDescription": short_desc or poi.description,
     }
+    # έτοιμα primitives -> κατευθείαν orjson, χωρίς pydantic validation
+    body = {k: v for k, v in out.items() if k in selected}
+    if raw is not None:
+        # το raw δεν καλύπτεται από το projection version
+        etag = make_etag("poi", body)
+    else:
+        etag = make_etag("poi", id, poi.version, sorted(selected), short_desc, images)
+    return conditional_json(request, body, etag, POI_CACHE_CONTROL)
@@ -0,0 +1,208 @@
+"""
+Μετρικές σε Prometheus text format (GET /metrics), χωρίς εξωτερική
+εξάρτηση: histograms/counters/gauges με labels και collectors που
+διαβάζουν stats (caches, hashing) τη στιγμή του scrape.
+"""
+import functools
+import inspect
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# seconds· από cache hits (~ms) μέχρι upstream timeouts
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labelvalues: Tuple[Any, ...]) -> Labels:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+        return tuple(str(v) for v in labelvalues)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = self._header()
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labelvalues: Any, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value: float, *labelvalues: Any) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            labelnames: Iterable[str] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (counts ανά bucket, sum, count)
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        key = self._key(labelvalues)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * len(self.buckets), [0.0, 0.0])
+            counts, totals = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            totals[0] += value
+            totals[1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((k, (list(c), list(t))) for k, (c, t) in self._values.items())
+        lines = self._header()
+        for key, (counts, (total, count)) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {_format_value(count)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(count)}")
+        return lines
+
+
+_REGISTRY: List[_Metric] = []
+# collectors: (name, type, help, samples) που υπολογίζονται στο scrape
+_COLLECTORS: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+
+def _register(metric: _Metric) -> Any:
+    _REGISTRY.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+    _COLLECTORS.append(collector)
+
+
+HTTP_REQUEST_SECONDS: Histogram = _register(Histogram(
+    "http_request_duration_seconds", "Latency των HTTP requests ανά route", ("method", "route", "status"),
+))
+HTTP_IN_FLIGHT: Gauge = _register(Gauge("http_requests_in_flight", "HTTP requests που εξυπηρετούνται τώρα"))
+UPSTREAM_REQUEST_SECONDS: Histogram = _register(Histogram(
+    "upstream_request_duration_seconds", "Latency των upstream requests ανά host και status", ("host", "status"),
+))
+STAGE_SECONDS: Histogram = _register(Histogram(
+    "app_stage_duration_seconds", "Διάρκεια επιμέρους σταδίων (fetch, parse, auth, hash_queue, serialize)", ("stage",),
+))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage)
+
+
+def timed(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator: μετράει τη συνάρτηση (sync ή async) στο app_stage_duration_seconds."""
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    for collector in _COLLECTORS:
+        try:
+            families = list(collector())
+        except Exception:
+            continue
+        for name, type_, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type_}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
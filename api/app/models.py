@@ -45,11 +45,33 @@ class PoiListItem(BaseModel):
     wikipediaUrl: Optional[str] = None
 
 
+class PoiNearbyItem(PoiListItem):
+    distanceMeters: Optional[float] = None
+
+
+class PoiSearchItem(PoiListItem):
+    score: Optional[float] = None
+
+
 class FactItem(BaseModel):
     label: str
     value: str
 
 
+class ImageVariant(BaseModel):
+    width: Optional[int] = None
+    height: Optional[int] = None
+    url: str
+
+
+class PoiImage(BaseModel):
+    file: Optional[str] = None
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    srcset: List[ImageVariant] = []
+
+
 class PoiDetails(BaseModel):
     id: str
     categoryId: str
@@ -67,6 +89,8 @@ class PoiDetails(BaseModel):
     wikipediaUrl: Optional[str] = None
 
     images: List[str] = []
+    # ίδιες εικόνες με το images, με διαστάσεις και thumbnails ανά width
+    gallery: List[PoiImage] = []
     extraText: Optional[str] = None
 
     # ✅ ΝΕΑ: επιστρέφει facts & raw
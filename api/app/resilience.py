@@ -0,0 +1,314 @@
+"""
+Resilience ανά upstream host: circuit breaker, retries με jitter μέσα σε
+retry budget, σεβασμός του Retry-After και token bucket για να μένουμε
+κάτω από το rate policy του Wikimedia (warm-ups, bursts).
+
+Όλα τρέχουν στο transport του httpx client (βλ. upstream.py), οπότε
+ισχύουν για κάθε outbound call χωρίς αλλαγές στους callers: όταν ο host
+είναι "κάτω" το request αποτυγχάνει αμέσως με UpstreamUnavailable (ένα
+httpx.TransportError) και οι callers σερβίρουν stale όπως σε κάθε σφάλμα.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .config import settings
+from .logs import get_logger
+
+log = get_logger("resilience")
+
+RETRY_METHODS = {"GET", "HEAD"}
+RETRY_STATUSES = {429, 502, 503, 504}
+# σφάλματα που αξίζει να ξαναδοκιμαστούν· ένα ReadTimeout σημαίνει αργό host,
+# και ένα retry θα πρόσθετε άλλα τόσα δευτερόλεπτα αναμονής
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+BACKOFF_BASE_SECONDS = 0.2
+BACKOFF_MAX_SECONDS = 2.0
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+class UpstreamUnavailable(httpx.TransportError):
+    """Fail fast: ο breaker είναι ανοιχτός ή το rate limit θα αργούσε πολύ."""
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After σε δευτερόλεπτα (delta-seconds ή HTTP-date)· None αν λείπει/είναι άκυρο."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    closed -> open μετά από `failures` συνεχόμενες αποτυχίες (ή Retry-After
+    μεγαλύτερο από όσο περιμένουμε). Όσο είναι open, όλα αποτυγχάνουν αμέσως·
+    μετά το reset περνάει ένα probe (half-open) που το κλείνει ή το ξανανοίγει.
+    """
+
+    def __init__(self, host: str, failures: int, reset_seconds: float):
+        self.host = host
+        self.failures = max(1, failures)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._probe_at = 0.0
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+        if now < self.open_until:
+            self.rejected += 1
+            return False
+        # half-open: ένα probe τη φορά· αν χαθεί (cancel), επόμενο μετά από reset_seconds
+        self.state = HALF_OPEN
+        if now >= self._probe_at:
+            self._probe_at = now + self.reset_seconds
+            return True
+        self.rejected += 1
+        return False
+
+    def success(self) -> None:
+        if self.state != CLOSED:
+            log.info("circuit_closed", host=self.host)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+
+    def failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failures:
+            self.trip(self.reset_seconds)
+
+    def trip(self, seconds: float) -> None:
+        now = time.monotonic()
+        if self.state != OPEN:
+            self.opened += 1
+            log.warning("circuit_opened", host=self.host, seconds=round(seconds, 3), failures=self.consecutive_failures)
+        self.state = OPEN
+        self.open_until = max(self.open_until, now + seconds)
+        self._probe_at = self.open_until
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.consecutive_failures,
+            "openForSeconds": round(max(0.0, self.open_until - time.monotonic()), 3) if self.state == OPEN else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """
+    Τα retries είναι το πολύ `ratio` των requests (+ ένα μικρό σταθερό
+    απόθεμα ανά δευτερόλεπτο), ώστε σε outage να μη διπλασιάζουμε το load.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float = 1.0, cap: float = 20.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.cap = cap
+        self.tokens = cap
+        self.exhausted = 0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.cap, self.tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def deposit(self) -> None:
+        self._refill()
+        self.tokens = min(self.cap, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
+
+
+class TokenBucket:
+    """
+    Rate limiter (rate/s, burst). Adaptive: σε 429 το rate υποδιπλασιάζεται
+    και ανεβαίνει ξανά σιγά σιγά με κάθε επιτυχία (AIMD), μέχρι το base rate.
+    """
+
+    def __init__(self, rate: float, burst: float, max_wait: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_wait = max_wait
+        self.tokens = self.burst
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.base_rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> bool:
+        """Περιμένει token· False (χωρίς αναμονή) αν η σειρά μας είναι πάνω από max_wait."""
+        if not self.enabled:
+            return True
+        self._refill()
+        # κρατάμε το token από τώρα (tokens < 0 = ουρά), ώστε οι επόμενοι να περιμένουν τη σειρά τους
+        wait = (1.0 - self.tokens) / self.rate if self.tokens < 1.0 else 0.0
+        if wait > self.max_wait:
+            self.rejected += 1
+            return False
+        self.tokens -= 1.0
+        if wait > 0:
+            self.waited += 1
+            self.wait_seconds += wait
+            await asyncio.sleep(wait)
+        return True
+
+    def throttle(self) -> None:
+        if self.enabled:
+            self.rate = max(self.base_rate / 16, self.rate / 2)
+
+    def recover(self) -> None:
+        if self.enabled and self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 50)
+
+    def stats(self) -> Dict[str, Any]:
+        if self.enabled:
+            self._refill()
+        return {
+            "ratePerSecond": round(self.rate, 3),
+            "baseRatePerSecond": self.base_rate,
+            "tokens": round(self.tokens, 3),
+            "waited": self.waited,
+            "waitSeconds": round(self.wait_seconds, 3),
+            "rejected": self.rejected,
+        }
+
+
+class HostGuard:
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(host, settings.UPSTREAM_BREAKER_FAILURES, settings.UPSTREAM_BREAKER_RESET_SECONDS)
+        self.budget = RetryBudget(settings.UPSTREAM_RETRY_BUDGET_RATIO)
+        # το rate policy αφορά όλο το host: κάθε worker παίρνει το μερίδιό του
+        shares = max(1, settings.UPSTREAM_RATE_SHARES)
+        self.bucket = TokenBucket(
+            settings.UPSTREAM_RATE_PER_SECOND / shares,
+            settings.UPSTREAM_RATE_BURST / shares,
+            settings.UPSTREAM_RATE_MAX_WAIT_SECONDS,
+        )
+        self.requests = 0
+        self.retries = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "retryBudgetExhausted": self.budget.exhausted,
+            "circuit": self.breaker.stats(),
+            "rateLimit": self.bucket.stats(),
+        }
+
+
+# host -> guard (κοινό για όλους τους clients του ίδιου host)
+_GUARDS: Dict[str, HostGuard] = {}
+
+
+def get_guard(host: str) -> HostGuard:
+    guard = _GUARDS.get(host)
+    if guard is None:
+        guard = _GUARDS[host] = HostGuard(host)
+    return guard
+
+
+def resilience_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: guard.stats() for host, guard in _GUARDS.items()}
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter: τυχαίο στο [0, min(max, base * 2^attempt)]
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Breaker + rate limit + retries γύρω από το transport ενός host."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, host: str):
+        self.transport = transport
+        self.guard = get_guard(host)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = self.guard
+        guard.requests += 1
+        guard.budget.deposit()
+        retryable = request.method in RETRY_METHODS
+        attempt = 0
+        while True:
+            if not guard.breaker.allow():
+                raise UpstreamUnavailable(f"circuit open for {guard.host}", request=request)
+            if not await guard.bucket.acquire():
+                raise UpstreamUnavailable(f"rate limit queue full for {guard.host}", request=request)
+
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                guard.breaker.failure()
+                if not (retryable and isinstance(e, RETRY_ERRORS) and self._may_retry(attempt)):
+                    raise
+                delay = _backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    guard.breaker.success()
+                    guard.bucket.recover()
+                    return response
+
+                guard.breaker.failure()
+                retry_after = retry_after_seconds(response)
+                if response.status_code == 429:
+                    guard.bucket.throttle()
+                if retry_after is not None and retry_after > settings.UPSTREAM_RETRY_AFTER_MAX_SECONDS:
+                    # ο host ζήτησε περισσότερο απ' όσο περιμένουμε: κανένα request ως τότε
+                    guard.breaker.trip(retry_after)
+                    log.warning("upstream_retry_after", host=guard.host, seconds=retry_after)
+                    return response
+                if not (retryable and self._may_retry(attempt)):
+                    return response
+                await response.aclose()
+                delay = retry_after if retry_after is not None else _backoff(attempt)
+
+            attempt += 1
+            guard.retries += 1
+            await asyncio.sleep(delay)
+
+    def _may_retry(self, attempt: int) -> bool:
+        # αν αυτή η αποτυχία άνοιξε τον breaker (ή ήταν το half-open probe), δεν ξαναδοκιμάζουμε
+        if self.guard.breaker.state != CLOSED:
+            return False
+        return attempt < settings.UPSTREAM_MAX_RETRIES and self.guard.budget.withdraw()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
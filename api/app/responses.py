@@ -0,0 +1,83 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .metrics import span
+
+try:
+    import orjson
+except ImportError:  # orjson είναι προαιρετικό
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response για έτοιμα dicts/lists από primitives: serialize με orjson
+    (αν υπάρχει) χωρίς να περάσει από pydantic validation.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag από οτιδήποτε serializable (π.χ. ids + projection versions)."""
+    digest = hashlib.blake2b(dumps(parts), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: αγνοούμε το W/ prefix
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def conditional_json(
+        request: Request,
+        content: Any,
+        etag: str,
+        cache_control: str,
+        status_code: int = 200,
+) -> Response:
+    """200 με ETag/Cache-Control, ή 304 χωρίς body αν ταιριάζει το If-None-Match."""
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    with span("serialize"):
+        return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def conditional_bytes(
+        request: Request,
+        body: bytes,
+        etag: str,
+        cache_control: str,
+        media_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Όπως το conditional_json, για έτοιμο (π.χ. precomputed/συμπιεσμένο) body."""
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
@@ -0,0 +1,132 @@
+import bisect
+import re
+import unicodedata
+from threading import Lock
+from typing import Dict, List, Set, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# βάρος ανά πεδίο στο scoring
+FIELD_WEIGHTS = {"title": 4.0, "description": 2.0, "summary": 1.0, "facts": 1.0}
+# exact token match μετράει περισσότερο από prefix match
+EXACT_BONUS = 1.5
+# όριο στα tokens που αντιστοιχούν σε ένα prefix (π.χ. "κ")
+MAX_PREFIX_EXPANSIONS = 500
+
+
+def fold(text: str) -> str:
+    """
+    Case- και accent-folding (και για ελληνικά): "Κάστρο" == "καστρο",
+    "Ιωαννίνων" == "ιωαννινων", τελικό ς -> σ.
+    """
+    decomposed = unicodedata.normalize("NFD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.replace("ς", "σ")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """
+    In-memory inverted index: token -> {doc: weight}, με ταξινομημένο
+    λεξιλόγιο για prefix (type-ahead) queries μέσω bisect. Τα documents
+    ενημερώνονται incrementally ανά πεδίο (update_fields).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocab: List[str] = []
+        self._docs: Dict[str, Dict[str, str]] = {}
+        self._doc_tokens: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc: str) -> bool:
+        return doc in self._docs
+
+    def _remove_doc(self, doc: str) -> None:
+        for token in self._doc_tokens.pop(doc, {}):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(doc, None)
+            if not posting:
+                del self._postings[token]
+                i = bisect.bisect_left(self._vocab, token)
+                if i < len(self._vocab) and self._vocab[i] == token:
+                    del self._vocab[i]
+
+    def update_fields(self, doc: str, **fields: str) -> None:
+        """Αντικαθιστά τα δοσμένα πεδία του doc (title/description/summary/facts) και το ξανακάνει index."""
+        with self._lock:
+            current = self._docs.setdefault(doc, {})
+            changed = False
+            for name, text in fields.items():
+                text = text or ""
+                if current.get(name, "") != text:
+                    current[name] = text
+                    changed = True
+            if not changed and doc in self._doc_tokens:
+                return
+
+            weights: Dict[str, float] = {}
+            for name, text in current.items():
+                w = FIELD_WEIGHTS.get(name, 1.0)
+                for token in tokenize(text):
+                    weights[token] = max(weights.get(token, 0.0), w)
+
+            self._remove_doc(doc)
+            self._doc_tokens[doc] = weights
+            for token, w in weights.items():
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = {}
+                    bisect.insort(self._vocab, token)
+                posting[doc] = w
+
+    def remove(self, doc: str) -> None:
+        with self._lock:
+            self._remove_doc(doc)
+            self._docs.pop(doc, None)
+
+    def _expand(self, token: str) -> List[str]:
+        i = bisect.bisect_left(self._vocab, token)
+        out: List[str] = []
+        while i < len(self._vocab) and self._vocab[i].startswith(token) and len(out) < MAX_PREFIX_EXPANSIONS:
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        AND πάνω στα tokens του query· κάθε token ταιριάζει ως prefix
+        (type-ahead), με bonus για exact match. [(doc, score)] κατά score.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            scores: Dict[str, float] = {}
+            matched: Set[str] = set()
+            for n, token in enumerate(dict.fromkeys(tokens)):
+                token_scores: Dict[str, float] = {}
+                for term in self._expand(token):
+                    bonus = EXACT_BONUS if term == token else 1.0
+                    for doc, w in self._postings[term].items():
+                        s = w * bonus
+                        if s > token_scores.get(doc, 0.0):
+                            token_scores[doc] = s
+                if n == 0:
+                    matched = set(token_scores)
+                else:
+                    matched &= token_scores.keys()
+                if not matched:
+                    return []
+                for doc in matched:
+                    scores[doc] = scores.get(doc, 0.0) + token_scores[doc]
+        ranked = sorted(((scores[d], d) for d in matched), key=lambda x: (-x[0], x[1]))
+        return [(d, round(s, 3)) for s, d in ranked[:limit]]
@@ -0,0 +1,197 @@
+"""
+Production entrypoint με prefork workers:
+
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4
+
+Ο master φορτώνει το app, τον κατάλογο και ό,τι υπάρχει στο L2 (projections,
+summaries, geo/search indexes) *πριν* το fork, οπότε κάθε worker ξεκινά ζεστός
+και μοιράζεται αυτή τη μνήμη copy-on-write. Οι workers ακούνε στο ίδιο socket
+(ο kernel μοιράζει τα connections), μοιράζονται το SQLite L2 και μόνο ένας
+τρέχει τον warmer (βλ. warmer._try_lead). Σε SIGTERM/SIGINT κάθε worker
+σταματά να δέχεται connections, τελειώνει τα τρέχοντα requests και τρέχει το
+lifespan shutdown· όσοι δεν τελειώσουν σε GRACEFUL_TIMEOUT_SECONDS παίρνουν
+SIGKILL. Workers που πεθαίνουν απρόσμενα ξαναξεκινάνε.
+"""
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import List, Optional, Set
+
+import uvicorn
+
+from .auth import user_store
+from .catalogue import catalogue
+from .config import settings
+from .cpus import available_cpus
+from .logs import get_logger
+from .main import app
+from .wikidata import close_cache, preload_from_disk
+
+log = get_logger("serve")
+
+# αν ένας worker πεθαίνει αμέσως (π.χ. λάθος config), μην τον ξαναξεκινάς σε loop
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def preload() -> None:
+    """Ό,τι γίνεται μία φορά στον master και κληρονομείται από τους workers."""
+    started = time.perf_counter()
+    loaded = preload_from_disk(catalogue.qids)
+    # migration του παλιού users.json εδώ, όχι ταυτόχρονα σε κάθε worker
+    user_store.get_password_hash("")
+    # οι SQLite συνδέσεις δεν περνάνε σε fork: κάθε worker ανοίγει τις δικές του
+    close_cache()
+    user_store.close()
+    # τα προφορτωμένα objects δεν αγγίζονται από τον GC, ώστε οι σελίδες να μένουν κοινές
+    gc.collect()
+    gc.freeze()
+    log.info(
+        "preloaded",
+        pois=len(catalogue.qids),
+        fromCache=loaded,
+        seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    # με ρητό IPPROTO_TCP το asyncio βάζει TCP_NODELAY στα accepted sockets (αλλιώς Nagle: +40ms)
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _config(**kwargs) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        access_log=False,  # το access log γράφεται από το middleware (JSON)
+        log_level=settings.LOG_LEVEL.lower(),
+        timeout_graceful_shutdown=int(settings.GRACEFUL_TIMEOUT_SECONDS),
+        **kwargs,
+    )
+
+
+def _worker(sock: socket.socket) -> None:
+    # δικό του process group: το Ctrl-C του terminal πάει μόνο στον master, που
+    # στέλνει ένα SIGTERM (ένα δεύτερο signal θα έκανε τον uvicorn να μην περιμένει)
+    os.setpgid(0, 0)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    # αλλιώς όλοι οι workers θα είχαν την ίδια ακολουθία jitter με τον master
+    random.seed()
+    uvicorn.Server(_config()).run(sockets=[sock])
+
+
+def _spawn(sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _worker(sock)
+        except BaseException as e:
+            log.error("worker_crashed", error=repr(e))
+            code = 1
+        finally:
+            os._exit(code)
+    log.info("worker_started", worker=pid)
+    return pid
+
+
+def _stop(workers: Set[int], timeout: float) -> None:
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + timeout
+    while workers and time.monotonic() < deadline:
+        _reap(workers)
+        time.sleep(0.1)
+    for pid in list(workers):
+        log.warning("worker_killed", worker=pid)
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    while workers:
+        _reap(workers, block=True)
+
+
+def _reap(workers: Set[int], block: bool = False) -> List[int]:
+    """Μαζεύει όσους workers τελείωσαν· επιστρέφει τα pids τους."""
+    exited = []
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            workers.clear()
+            break
+        if pid == 0:
+            break
+        if pid in workers:
+            workers.discard(pid)
+            exited.append(pid)
+            log.info("worker_exited", worker=pid, status=os.waitstatus_to_exitcode(status))
+        if block:
+            break
+    return exited
+
+
+def run(host: str, port: int, workers: int) -> None:
+    if workers <= 1 or not hasattr(os, "fork"):
+        # ένα process: όπως το "uvicorn app.main:app", με το ίδιο graceful shutdown
+        try:
+            uvicorn.Server(_config(host=host, port=port)).run()
+        except KeyboardInterrupt:  # ο uvicorn ξανασηκώνει το SIGINT αφού κλείσει
+            pass
+        return
+
+    # τα token buckets και τα bcrypt pools είναι ανά process: ο καθένας παίρνει
+    # 1/workers του upstream rate και των πυρήνων
+    settings.UPSTREAM_RATE_SHARES = workers
+    settings.HASH_WORKER_SHARES = workers
+    sock = _bind(host, port)
+    preload()
+    log.info("master_started", host=host, port=port, workers=workers)
+
+    stopping: List[int] = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+
+    children: Set[int] = {_spawn(sock) for _ in range(workers)}
+
+    while not stopping:
+        time.sleep(0.2)
+        for pid in _reap(children):
+            if stopping:
+                break
+            log.warning("worker_died", worker=pid)
+            time.sleep(RESPAWN_BACKOFF_SECONDS)
+            children.add(_spawn(sock))
+
+    log.info("master_stopping", signal=stopping[0], workers=len(children))
+    _stop(children, settings.GRACEFUL_TIMEOUT_SECONDS + 5)
+    sock.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ioannina API server (prefork workers)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS, help="0 = ένας ανά διαθέσιμο πυρήνα")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or available_cpus()
+    run(args.host, args.port, workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
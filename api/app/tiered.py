@@ -0,0 +1,166 @@
+"""
+Κοινά εργαλεία των upstream caches (Wikidata, Wikipedia, Commons): L1
+(ένα MemoryCache ανά είδος δεδομένων) πάνω από το κοινό L2 (SQLite, DISK),
+stale-while-revalidate και single-flight ανά key, μέσα στο process
+(single_flight) και ανάμεσα σε workers (shared_fetch, με leases στο L2).
+Κάθε L2 I/O από coroutine περνά από το disk_io (εκτός event loop).
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from .cache_store import DiskCache, MemoryCache, settle_lookup
+from .config import settings
+from .logs import get_logger
+
+T = TypeVar("T")
+
+log = get_logger("tiered")
+
+# L2 cache: κοινό SQLite αρχείο, επιβιώνει restarts/deploys
+DISK: Optional[DiskCache] = DiskCache(settings.CACHE_DB_PATH) if settings.CACHE_DB_PATH else None
+
+# L2 I/O (SQLite με busy timeout, JSON, zlib) σε δικό του thread: η σύνδεση
+# σειριοποιείται ούτως ή άλλως (DiskCache._lock), οπότε ένα thread αρκεί και
+# ένα αργό write (π.χ. WAL lock από άλλο worker) δεν σταματά το event loop
+_disk_executor: Optional[ThreadPoolExecutor] = None
+
+# stale-while-revalidate: μέχρι πόσο μετά τη λήξη σερβίρουμε stale χωρίς αναμονή.
+# Πιο παλιά entries περιμένουν το refresh (και σερβίρονται μόνο αν αυτό αποτύχει).
+SWR_MAX_STALE_SECONDS = 60 * 60 * 24
+
+# ίδιο fetch σε άλλο worker (κοινό L2): περιμένουμε το αποτέλεσμά του αντί για δεύτερο request
+LEASE_SECONDS = 15.0
+LEASE_POLL_SECONDS = 0.05
+
+# single-flight: key -> in-flight task, κοινό για όλους τους waiters
+_INFLIGHT: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+def _get_disk_executor() -> ThreadPoolExecutor:
+    # lazily: το preload πριν το fork (app.serve) δεν ξεκινά threads
+    global _disk_executor
+    if _disk_executor is None:
+        _disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="l2-cache")
+    return _disk_executor
+
+
+async def disk_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Τρέχει μια blocking μέθοδο του DISK στο L2 thread, π.χ. await disk_io(DISK.get, key)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_disk_executor(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def close_disk() -> None:
+    """Graceful shutdown: τελειώνουν τα pending L2 writes και κλείνει η σύνδεση."""
+    global _disk_executor
+    if _disk_executor is not None:
+        _disk_executor.shutdown(wait=True)
+        _disk_executor = None
+    if DISK is not None:
+        DISK.close()
+
+
+async def lookup(
+        memory: MemoryCache,
+        key: str,
+        ttl: float,
+        load: Callable[[Any], Any] = lambda data: data,
+) -> Tuple[Optional[Any], bool, float]:
+    """
+    (value, fresh, timestamp) από το memory ή το κοινό L2 (βλ. cache_store.tiered_lookup).
+    Ένα fresh L1 hit δεν αγγίζει το L2· το load() τρέχει στο loop (listeners/indexes).
+    """
+    entry = memory.peek(key)
+    if entry is not None and entry[2]:
+        return entry[1], True, entry[0]
+    stored = None
+    if DISK is not None:
+        stored = await disk_io(DISK.get, key, newer_than=entry[0] if entry is not None else None)
+    return settle_lookup(memory, key, ttl, load, entry, stored)
+
+
+async def store(memory: MemoryCache, key: str, value: Any) -> None:
+    """Ίδιο value σε L1 και L2 (για δεδομένα χωρίς ξεχωριστό raw/projection)."""
+    await store_many(memory, {key: value})
+
+
+async def store_many(memory: MemoryCache, items: Dict[str, Any]) -> None:
+    """Όπως το store, για πολλά keys με ένα L2 transaction (π.χ. ένα batch response)."""
+    now = time.time()
+    for key, value in items.items():
+        memory.set(key, value, ts=now)
+    if DISK is not None and items:
+        await disk_io(DISK.set_many, items, ts=now)
+
+
+def can_serve_stale(ts: float, ttl: float) -> bool:
+    return time.time() - ts - ttl <= SWR_MAX_STALE_SECONDS
+
+
+def single_flight(key: str, factory: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+    """Ένα upstream fetch ανά key· όσοι έρθουν όσο τρέχει παίρνουν το ίδιο task."""
+    task = _INFLIGHT.get(key)
+    if task is None or task.done():
+        task = asyncio.ensure_future(factory())
+        _INFLIGHT[key] = task
+
+        def _done(t: "asyncio.Future[Any]", key: str = key) -> None:
+            if _INFLIGHT.get(key) is t:
+                del _INFLIGHT[key]
+            if not t.cancelled() and t.exception() is not None:
+                log.warning("upstream_fetch_failed", key=key, error=str(t.exception()))
+
+        task.add_done_callback(_done)
+    return task
+
+
+def split_inflight(ids: Sequence[str], prefix: str) -> Tuple[Dict[str, "asyncio.Future[Any]"], List[str]]:
+    """
+    Για batched fetches: ({id: task} για όσα έχουν ήδη fetch σε πτήση με
+    key "<prefix>:<id>", [όσα πρέπει να φέρουμε εμείς]).
+    """
+    flights: Dict[str, "asyncio.Future[Any]"] = {}
+    todo: List[str] = []
+    for i in ids:
+        task = _INFLIGHT.get(f"{prefix}:{i}")
+        if task is not None and not task.done():
+            flights[i] = task
+        else:
+            todo.append(i)
+    return flights, todo
+
+
+async def shared_fetch(
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        reload: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Single-flight ανάμεσα σε processes: όποιος πάρει το lease του key στο L2
+    κάνει το fetch, οι υπόλοιποι workers περιμένουν να εμφανιστεί fresh στο L2
+    (await reload() != None). Αν ο κάτοχος τελειώσει χωρίς αποτέλεσμα, fetch κανονικά.
+    """
+    if DISK is None or await disk_io(DISK.lease, key, LEASE_SECONDS):
+        try:
+            return await fetch()
+        finally:
+            if DISK is not None:
+                await disk_io(DISK.release, key)
+
+    deadline = time.monotonic() + LEASE_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+        value = await reload()
+        if value is not None:
+            return value
+        if not await disk_io(DISK.leased, key):
+            break
+    return await fetch()
+
+
+def inflight_fetches() -> int:
+    return sum(1 for t in _INFLIGHT.values() if not t.done())
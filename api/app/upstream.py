@@ -0,0 +1,98 @@
+import time
+
+import httpx
+from typing import Dict
+
+from .config import settings
+from .logs import get_logger
+from .metrics import UPSTREAM_REQUEST_SECONDS
+from .resilience import ResilientTransport
+
+log = get_logger("upstream")
+
+UPSTREAM_HEADERS = {
+    "User-Agent": "IoanninaExplorer/1.0 (University project; contact: filip.chatziergatis@gmail.com)",
+    "Accept": "application/json",
+}
+
+# hosts που ζεσταίνουμε στο startup (οι υπόλοιποι δημιουργούνται lazily)
+KNOWN_HOSTS = ("www.wikidata.org", "el.wikipedia.org", "en.wikipedia.org")
+
+# host -> long-lived client (keep-alive connections ανά host)
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_enabled() -> bool:
+    if not settings.HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        log.warning("http2_unavailable", detail="HTTP2=true αλλά λείπει το πακέτο h2, συνεχίζω με HTTP/1.1")
+        return False
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Μετράει κάθε upstream request (μέχρι τα headers) ανά host και status ("error" για exceptions)."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, host: str):
+        self.transport = transport
+        self.host = host
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self.transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, self.host, status)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _new_client(host: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_enabled())
+    headers = UPSTREAM_HEADERS
+    if settings.UPSTREAM_BASE_URL:
+        headers = {**UPSTREAM_HEADERS, "X-Upstream-Host": host}
+    return httpx.AsyncClient(
+        base_url=settings.UPSTREAM_BASE_URL or f"https://{host}",
+        headers=headers,
+        # κάθε attempt μετριέται ξεχωριστά· retries/breaker/rate limit από πάνω
+        transport=ResilientTransport(InstrumentedTransport(transport, host), host),
+        timeout=httpx.Timeout(settings.UPSTREAM_TIMEOUT_SECONDS, connect=settings.UPSTREAM_CONNECT_TIMEOUT_SECONDS),
+        follow_redirects=True,
+    )
+
+
+def get_client(host: str) -> httpx.AsyncClient:
+    """
+    Ο κοινός client για ένα upstream host. Αν δεν έχει γίνει startup
+    (π.χ. script εκτός FastAPI) δημιουργείται εδώ.
+    """
+    client = _CLIENTS.get(host)
+    if client is None or client.is_closed:
+        client = _new_client(host)
+        _CLIENTS[host] = client
+    return client
+
+
+async def start_clients() -> None:
+    for host in KNOWN_HOSTS:
+        get_client(host)
+
+
+async def close_clients() -> None:
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
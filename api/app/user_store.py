@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional
+
+from .logs import get_logger
+
+log = get_logger("user_store")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+# revoked refresh tokens (jti -> exp)· τα ληγμένα σβήνονται περιοδικά
+_REVOKED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    exp REAL NOT NULL
+) WITHOUT ROWID
+"""
+PURGE_EVERY_SECONDS = 60 * 60
+
+
+class UserStore(ABC):
+    """Interface για τους χρήστες· τα emails έρχονται ήδη normalized (lower/strip)."""
+
+    @abstractmethod
+    def get_password_hash(self, email: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def create_user(self, email: str, password_hash: str) -> None:
+        """Atomic insert· ValueError αν υπάρχει ήδη."""
+
+    @abstractmethod
+    def update_password_hash(self, email: str, password_hash: str) -> None:
+        ...
+
+    @abstractmethod
+    def revoke_token(self, jti: str, exp: float) -> bool:
+        """Atomic· False αν το jti ήταν ήδη revoked."""
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteUserStore(UserStore):
+    """
+    SQLite (WAL) με primary key το email: O(log n) lookups και ασφαλή
+    inserts από πολλούς uvicorn workers. Στο πρώτο άνοιγμα κάνει migrate
+    το παλιό users.json (αν υπάρχει) και το μετονομάζει σε *.migrated.
+    """
+
+    def __init__(self, path: str, legacy_json: Optional[str] = None):
+        self.path = path
+        self.legacy_json = legacy_json
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = Lock()
+        self._last_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute(_REVOKED_SCHEMA)
+            self._conn = conn
+            self._migrate_json(conn)
+        return self._conn
+
+    def _migrate_json(self, conn: sqlite3.Connection) -> None:
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("users_migration_read_failed", path=self.legacy_json, error=str(e))
+            return
+        if not isinstance(data, dict):
+            return
+
+        rows = [
+            (email.lower().strip(), user["password_hash"], time.time())
+            for email, user in data.items()
+            if isinstance(user, dict) and user.get("password_hash")
+        ]
+        # BEGIN IMMEDIATE: ένας worker τη φορά· INSERT OR IGNORE -> idempotent
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (email, password_hash, created_at) VALUES (?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        try:
+            os.replace(self.legacy_json, self.legacy_json + ".migrated")
+        except OSError:
+            pass  # άλλος worker το μετονόμασε ήδη
+        log.info("users_migrated", count=len(rows), path=self.legacy_json)
+
+    def get_password_hash(self, email: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT password_hash FROM users WHERE email = ?", (email,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def create_user(self, email: str, password_hash: str) -> None:
+        try:
+            with self._lock:
+                self._connect().execute(
+                    "INSERT INTO users (email, password_hash, created_at) VALUES (?, ?, ?)",
+                    (email, password_hash, time.time()),
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError("User already exists")
+
+    def update_password_hash(self, email: str, password_hash: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "UPDATE users SET password_hash = ? WHERE email = ?", (password_hash, email)
+            )
+
+    def revoke_token(self, jti: str, exp: float) -> bool:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if now - self._last_purge > PURGE_EVERY_SECONDS:
+                conn.execute("DELETE FROM revoked_tokens WHERE exp < ?", (now,))
+                self._last_purge = now
+            try:
+                conn.execute("INSERT INTO revoked_tokens (jti, exp) VALUES (?, ?)", (jti, exp))
+            except sqlite3.IntegrityError:
+                return False
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
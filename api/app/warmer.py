@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Optional, Dict, Any, List
+
+try:
+    import fcntl
+except ImportError:  # π.χ. Windows: χωρίς election, κάθε process είναι leader
+    fcntl = None
+
+from .config import settings
+from .catalogue import catalogue
+from .images import resolve_poi_images
+from .logs import get_logger
+from .wikidata import (
+    SUMMARY_TTL_SECONDS, TTL_SECONDS, fetch_pois, known_missing, prefetch_wikipedia_summaries,
+    refresh_pois, refresh_wikipedia_summaries,
+)
+
+log = get_logger("warmer")
+
+# refresh λίγο πριν λήξουν τα entries (75% του TTL, ±10%)
+REFRESH_FRACTION = 0.75
+REFRESH_JITTER = 0.1
+# μετά από ελλιπή γύρο: όσα δεν ήρθαν ξαναδοκιμάζονται νωρίτερα (χωρίς force,
+# δηλαδή μόνο ό,τι λείπει από το cache), μέχρι τον επόμενο προγραμματισμένο refresh
+RETRY_SECONDS = 60.0
+# Commons imageinfo για όλο τον κατάλογο (batches των 50)
+IMAGES_DEADLINE_SECONDS = 120.0
+# followers: κάθε πότε διαβάζουν το status του leader / δοκιμάζουν να γίνουν leader
+FOLLOW_SECONDS = 5.0
+
+_task: Optional["asyncio.Task[None]"] = None
+_status: Dict[str, Any] = {
+    "ready": False,
+    "total": 0,
+    "warmed": 0,
+    "missing": 0,
+    "summaries": 0,
+    "runs": 0,
+    "lastRunAt": None,
+    "lastRunSeconds": None,
+    "nextRunAt": None,
+    "lastError": None,
+    "leader": False,
+}
+# πεδία που μοιράζεται ο leader με τους υπόλοιπους workers (warmer.json)
+SHARED_FIELDS = (
+    "total", "warmed", "missing", "summaries", "runs", "lastRunAt", "lastRunSeconds", "nextRunAt", "lastError",
+)
+
+# fd του warmer.lock όσο είμαστε leader (-1: χωρίς election)
+_lock_fd: Optional[int] = None
+
+
+def _catalogue_qids() -> List[str]:
+    return catalogue.qids
+
+
+async def warm_catalogue(force: bool = False) -> bool:
+    """
+    Ένας γύρος: όλα τα qids του καταλόγου + τα Wikipedia summaries και τα Commons images τους.
+    Με force=False σέβεται το cache (π.χ. στο startup με γεμάτο L2),
+    με force=True τα ξαναφέρνει πριν λήξουν. Επιστρέφει True αν κάθε qid
+    ήρθε ή είναι γνωστό ότι δεν υπάρχει (missing).
+    """
+    qids = _catalogue_qids()
+    concurrency = settings.WARMER_CONCURRENCY
+    started = time.time()
+
+    if force:
+        pois = await refresh_pois(qids, concurrency=concurrency)
+    else:
+        pois = await fetch_pois(qids, concurrency=concurrency)
+
+    # force: ανανέωση των κύριων summaries, μετά fallbacks για ό,τι δεν έχει extract
+    live = [p for p in pois.values() if p]
+    if force:
+        # τα summaries έχουν δικό τους (μεγαλύτερο) TTL: μόνο όσα θα έληγαν πριν τον επόμενο γύρο
+        await refresh_wikipedia_summaries(
+            [p.wikipediaUrl for p in live if p.wikipediaUrl],
+            concurrency=concurrency,
+            older_than=SUMMARY_TTL_SECONDS - _max_delay(),
+        )
+    summaries = await prefetch_wikipedia_summaries(live, concurrency=concurrency)
+    await resolve_poi_images(live, deadline=IMAGES_DEADLINE_SECONDS)
+
+    warmed = len(live)
+    missing = sum(1 for q, p in pois.items() if p is None and known_missing(q))
+    resolved = warmed + missing
+    _status.update({
+        "total": len(qids),
+        "warmed": warmed,
+        "missing": missing,
+        "summaries": summaries,
+        "runs": _status["runs"] + 1,
+        "lastRunAt": int(started),
+        "lastRunSeconds": round(time.time() - started, 3),
+    })
+    # ready μετά από έναν γύρο που δοκίμασε όλα τα qids, αν η κάλυψη αρκεί:
+    # ένα qid που αποτυγχάνει μόνιμα δεν κρατά το /ready στο 503
+    if not qids or resolved / len(qids) >= settings.WARMER_READY_COVERAGE:
+        _status["ready"] = True
+    return resolved == len(qids)
+
+
+def _state_dir() -> Optional[str]:
+    # δίπλα στο κοινό L2· χωρίς L2 δεν υπάρχει κοινό cache, άρα ούτε election
+    if not settings.CACHE_DB_PATH:
+        return None
+    return os.path.dirname(os.path.abspath(settings.CACHE_DB_PATH))
+
+
+def _try_lead() -> bool:
+    """
+    Ένας warmer ανά host, όσοι workers κι αν τρέχουν: leader είναι όποιος
+    κρατάει flock στο warmer.lock. Ο kernel το αφήνει όταν πεθάνει το
+    process, οπότε ένας follower αναλαμβάνει στον επόμενο έλεγχο.
+    """
+    global _lock_fd
+    if _lock_fd is not None:
+        return True
+    state_dir = _state_dir()
+    if state_dir is None or fcntl is None:
+        _lock_fd = -1
+        return True
+    os.makedirs(state_dir, exist_ok=True)
+    fd = os.open(os.path.join(state_dir, "warmer.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    os.ftruncate(fd, 0)
+    os.write(fd, str(os.getpid()).encode("ascii"))
+    _lock_fd = fd
+    log.info("warmer_leader_elected", pid=os.getpid())
+    return True
+
+
+def _release_lead() -> None:
+    global _lock_fd
+    if _lock_fd is not None and _lock_fd >= 0:
+        os.close(_lock_fd)
+    _lock_fd = None
+
+
+def _publish_status() -> None:
+    state_dir = _state_dir()
+    if state_dir is None:
+        return
+    path = os.path.join(state_dir, "warmer.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({**{k: _status[k] for k in SHARED_FIELDS}, "ready": _status["ready"]}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.warning("warmer_status_write_failed", error=str(e))
+
+
+def _read_shared_status() -> Optional[Dict[str, Any]]:
+    state_dir = _state_dir()
+    if state_dir is None:
+        return None
+    try:
+        with open(os.path.join(state_dir, "warmer.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def _follow() -> None:
+    """
+    Όσο άλλος worker είναι leader: παίρνουμε το status του και, μόλις ο
+    κατάλογος είναι ζεστός, φορτώνουμε το L1/indexes από το κοινό L2
+    (fresh χάρη στον leader, άρα χωρίς upstream requests).
+    """
+    loaded = False
+    while not _try_lead():
+        shared = _read_shared_status()
+        if shared:
+            _status.update({k: shared.get(k) for k in SHARED_FIELDS})
+            if shared.get("ready") and not loaded:
+                await fetch_pois(_catalogue_qids(), concurrency=settings.WARMER_CONCURRENCY)
+                loaded = True
+        _status["ready"] = loaded
+        await asyncio.sleep(FOLLOW_SECONDS)
+
+
+def _max_delay() -> float:
+    return TTL_SECONDS * REFRESH_FRACTION * (1 + REFRESH_JITTER)
+
+
+def _jittered(base: float) -> float:
+    return base * (1 + random.uniform(-REFRESH_JITTER, REFRESH_JITTER))
+
+
+async def _run() -> None:
+    await _follow()
+    _status["leader"] = True
+    refresh_at: Optional[float] = None
+    while True:
+        # μετά τον πρώτο γύρο, πλήρη ή όχι, κάθε γύρος στην ώρα του είναι refresh
+        # πριν τη λήξη· οι ενδιάμεσοι retries φέρνουν μόνο ό,τι λείπει
+        force = refresh_at is not None and time.time() >= refresh_at
+        try:
+            complete = await warm_catalogue(force=force)
+            _status["lastError"] = None if complete else "Some POIs could not be fetched"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            complete = False
+            _status["lastError"] = str(e)
+            log.error("warmer_run_failed", error=str(e))
+
+        now = time.time()
+        if refresh_at is None or force:
+            refresh_at = now + _jittered(TTL_SECONDS * REFRESH_FRACTION)
+        delay = refresh_at - now
+        if not complete:
+            delay = min(delay, _jittered(RETRY_SECONDS))
+        _status["nextRunAt"] = int(time.time() + delay)
+        _publish_status()
+        await asyncio.sleep(delay)
+
+
+def start_warmer() -> None:
+    global _task
+    if not settings.WARMER_ENABLED or (_task is not None and not _task.done()):
+        return
+    _task = asyncio.create_task(_run())
+
+
+async def stop_warmer() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+    _release_lead()
+    _status["leader"] = False
+
+
+def warmer_status() -> Dict[str, Any]:
+    return {**_status, "enabled": settings.WARMER_ENABLED}
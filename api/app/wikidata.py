@@ -1,54 +1,445 @@
+import asyncio
+import hashlib
+import json
 import time
-import httpx
-from typing import Optional, Dict, Any, Tuple, List
-from urllib.parse import quote, unquote
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple, List, Callable, Sequence, Set
+from urllib.parse import quote, unquote, urlparse
 import re
 
-# cache: qid -> (timestamp, data)
-_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
-TTL_SECONDS = 60 * 30  # 30 minutes
+from .cache_store import MemoryCache, tiered_lookup
+from .config import settings
+from .logs import get_logger
+from .metrics import timed
+from .tiered import (
+    DISK, LEASE_SECONDS, can_serve_stale, close_disk, disk_io, lookup, shared_fetch, single_flight,
+    split_inflight, store_many,
+)
+from .upstream import UPSTREAM_HEADERS, get_client
+
+log = get_logger("wikidata")
 
-WIKIDATA_HEADERS = {
-    "User-Agent": "IoanninaExplorer/1.0 (University project; contact: filip.chatziergatis@gmail.com)",
-    "Accept": "application/json",
-}
-async def fetch_wikipedia_short_description(wikipedia_url: str) -> Optional[str]:
-    if not wikipedia_url:
+TTL_SECONDS = 60 * 30  # 30 minutes
+TTL_JITTER = 0.1  # ±10%, για να μη λήγουν όλα τα entries μαζί
+
+# L1 cache: bounded LRU με PoiProjection ανά qid (το raw entity μένει στο L2)
+_CACHE = MemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES, TTL_SECONDS, TTL_JITTER)
+
+# negative cache: qids που το Wikidata δηλώνει missing (σβησμένα entities),
+# "nx:<qid>" σε L1/L2, ώστε να μη ζητιούνται ξανά σε κάθε request/γύρο του warmer
+MISSING_TTL_SECONDS = 60 * 60 * 6
+_MISSING_CACHE = MemoryCache(settings.CACHE_MAX_ENTRIES, 1024 * 1024, MISSING_TTL_SECONDS, TTL_JITTER)
+
+# Wikipedia summaries: ξεχωριστό LRU με δικό του TTL, persisted στο ίδιο L2 ("wp:<url>")
+SUMMARY_TTL_SECONDS = settings.SUMMARY_TTL_SECONDS
+_SUMMARY_CACHE = MemoryCache(
+    settings.SUMMARY_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_MAX_BYTES, SUMMARY_TTL_SECONDS, TTL_JITTER
+)
+SUMMARY_MAX_SENTENCES = 3
+# τέλος πρότασης: . ! ? και το ελληνικό ερωτηματικό (; ή U+037E)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;\u037e])\s+")
+
+# fan-out: πόσα entities ταυτόχρονα και πόσο περιμένουμε το καθένα
+FANOUT_CONCURRENCY = 8
+ENTITY_DEADLINE_SECONDS = 8.0
+
+WIKIDATA_HEADERS = UPSTREAM_HEADERS
+WIKIDATA_HOST = "www.wikidata.org"
+
+# wbgetentities: μόνο ό,τι χρησιμοποιεί το parse_poi_from_wikidata. Αυτά τα
+# entries σημειώνονται "trimmed" στο L2 και το include=raw φέρνει lazily το
+# πλήρες entity από το Special:EntityData (βλ. fetch_wikidata_entity)
+WBGETENTITIES_MAX_IDS = 50
+WBGETENTITIES_PROPS = "labels|descriptions|claims|sitelinks"
+WBGETENTITIES_LANGUAGES = "el|en"
+WBGETENTITIES_SITES = "elwiki|enwiki"
+
+@dataclass(slots=True)
+class PoiProjection:
+    """
+    Compact, έτοιμη μορφή ενός POI: υπολογίζεται μία φορά όταν έρθει το
+    entity και μένει στο in-memory cache αντί για το πλήρες Wikidata JSON.
+    """
+    qid: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    image: Optional[str] = None
+    wikipediaUrl: Optional[str] = None
+    facts: List[Dict[str, str]] = field(default_factory=list)
+    # sitelinks σε άλλες γλώσσες, για summary fallback (εκτός as_dict/version)
+    wikipediaFallbackUrls: Tuple[str, ...] = ()
+    # Commons filename (P18) και category (P373), για το app/images.py
+    imageFile: Optional[str] = None
+    commonsCategory: Optional[str] = None
+    # hash του περιεχομένου: ίδιο σε όλους τους workers/restarts (για ETags)
+    version: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.version:
+            payload = json.dumps(self.as_dict(), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+            self.version = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+    @classmethod
+    def from_entity(cls, qid: str, data: Dict[str, Any]) -> "PoiProjection":
+        parsed = parse_poi_from_wikidata(qid, data)
+        return cls(
+            qid=qid,
+            title=parsed["title"],
+            description=parsed["description"],
+            lat=parsed["lat"],
+            lon=parsed["lon"],
+            image=parsed["image"],
+            wikipediaUrl=parsed["wikipediaUrl"],
+            facts=parsed["facts"],
+            wikipediaFallbackUrls=tuple(parsed["wikipediaUrls"][1:]),
+            imageFile=parsed["imageFile"],
+            commonsCategory=parsed["commonsCategory"],
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "description": self.description,
+            "lat": self.lat,
+            "lon": self.lon,
+            "image": self.image,
+            "wikipediaUrl": self.wikipediaUrl,
+            "facts": self.facts,
+        }
+
+
+def _wikipedia_page(wikipedia_url: str) -> Optional[Tuple[str, str]]:
+    """(host, title) από ένα Wikipedia URL οποιασδήποτε γλώσσας (και mobile), αλλιώς None."""
+    parsed = urlparse(wikipedia_url)
+    host = (parsed.hostname or "").lower().replace(".m.wikipedia.org", ".wikipedia.org")
+    if not host.endswith(".wikipedia.org") or not parsed.path.startswith("/wiki/"):
         return None
+    title = unquote(parsed.path[len("/wiki/"):])
+    return (host, title) if title else None
 
-    lang = "el" if "el.wikipedia.org" in wikipedia_url else "en"
-    title = wikipedia_url.split("/wiki/")[-1]
-    title = unquote(title)
 
-    url = f"https://{lang}.wikipedia.org/api/rest_v1/page/summary/{title}"
+def _first_sentences(extract: Optional[str]) -> str:
+    # 👉 Κράτα μόνο τις πρώτες 2–3 προτάσεις
+    if not extract:
+        return ""
+    return " ".join(_SENTENCE_END_RE.split(extract, maxsplit=SUMMARY_MAX_SENTENCES)[:SUMMARY_MAX_SENTENCES])
 
-    async with httpx.AsyncClient(headers=WIKIDATA_HEADERS, timeout=10.0) as client:
-        r = await client.get(url)
-        if r.status_code != 200:
-            return None
 
-        data = r.json()
-        extract = data.get("extract")
-        if not extract:
-            return None
+def _summary_loaded(wikipedia_url: str, summary: str) -> None:
+    for listener in _SUMMARY_LISTENERS:
+        try:
+            listener(wikipedia_url, summary)
+        except Exception as e:
+            log.warning("summary_listener_failed", url=wikipedia_url, error=str(e))
 
-        # 👉 Κράτα μόνο τις πρώτες 2–3 προτάσεις
-        sentences = re.split(r'(?<=[.!;])\s+', extract)
-        return " ".join(sentences[:3])
 
-def _cache_get(key: str) -> Optional[Dict[str, Any]]:
-    item = _CACHE.get(key)
-    if not item:
-        return None
-    ts, data = item
-    if time.time() - ts > TTL_SECONDS:
-        _CACHE.pop(key, None)
+def _summary_from_l2(key: str, data: Dict[str, Any]) -> str:
+    summary = data.get("summary") or ""
+    _summary_loaded(key.split(":", 1)[1], summary)
+    return summary
+
+
+async def _summary_lookup(key: str) -> Tuple[Optional[str], bool, float]:
+    """(summary, fresh, timestamp) από L1 ή L2, όπως το _cache_lookup."""
+    return await lookup(_SUMMARY_CACHE, key, SUMMARY_TTL_SECONDS, lambda data: _summary_from_l2(key, data))
+
+
+async def _fetch_summary_upstream(wikipedia_url: str) -> Optional[str]:
+    """Summary, "" αν η σελίδα δεν έχει extract, None αν απέτυχε το request."""
+    page = _wikipedia_page(wikipedia_url)
+    if page is None:
+        return ""
+    host, title = page
+    cache_key = f"wp:{wikipedia_url}"
+
+    stored = await disk_io(DISK.get, cache_key) if DISK is not None else None
+    headers = {"If-None-Match": stored[2]} if stored and stored[2] else {}
+
+    try:
+        client = get_client(host)
+        r = await client.get(f"/api/rest_v1/page/summary/{quote(title, safe='')}", headers=headers)
+        etag = None
+        if r.status_code == 304 and stored:
+            summary = stored[1].get("summary") or ""
+        elif r.status_code == 404:
+            summary = ""
+        elif r.status_code != 200:
+            log.warning("wikipedia_bad_status", host=host, title=title, status=r.status_code)
+            return None
+        else:
+            summary = _first_sentences(r.json().get("extract"))
+            etag = r.headers.get("ETag")
+    except Exception as e:
+        log.warning("wikipedia_request_failed", host=host, title=title, error=str(e))
         return None
-    return data
 
+    now = time.time()
+    _SUMMARY_CACHE.set(cache_key, summary, ts=now)
+    if DISK is not None:
+        if r.status_code == 304:
+            await disk_io(DISK.touch, cache_key, ts=now)
+        else:
+            await disk_io(DISK.set, cache_key, {"summary": summary}, etag=etag, ts=now)
+    _summary_loaded(wikipedia_url, summary)
+    return summary
+
+
+async def _summary_get(key: str) -> Optional[str]:
+    summary, fresh, _ = await _summary_lookup(key)
+    return summary if fresh else None
+
+
+async def _fetch_summary_shared(wikipedia_url: str) -> Optional[str]:
+    key = f"wp:{wikipedia_url}"
+    return await shared_fetch(key, lambda: _fetch_summary_upstream(wikipedia_url), lambda: _summary_get(key))
+
+
+async def _fetch_summary(wikipedia_url: str) -> Optional[str]:
+    """Ένα URL: cache (L1/L2) με stale-while-revalidate, αλλιώς single-flight upstream fetch."""
+    cache_key = f"wp:{wikipedia_url}"
+    cached, fresh, ts = await _summary_lookup(cache_key)
+    stale: Optional[str] = None
+    if cached is not None:
+        if fresh:
+            return cached  # "" = γνωστό ότι δεν υπάρχει summary
+        if can_serve_stale(ts, SUMMARY_TTL_SECONDS):
+            single_flight(cache_key, lambda: _fetch_summary_shared(wikipedia_url))
+            return cached
+        stale = cached
+
+    summary = await asyncio.shield(single_flight(cache_key, lambda: _fetch_summary_shared(wikipedia_url)))
+    if summary is None:
+        summary = stale  # serve-stale-on-error
+    return summary
+
+
+@timed("fetch_wikipedia_short_description")
+async def fetch_wikipedia_short_description(
+        wikipedia_url: str,
+        fallback_urls: Sequence[str] = (),
+) -> Optional[str]:
+    """
+    Summary του wikipedia_url· αν η σελίδα δεν έχει extract ή το request
+    αποτύχει, δοκιμάζει με τη σειρά τις άλλες γλώσσες (fallback_urls).
+    """
+    for url in dict.fromkeys(u for u in (wikipedia_url, *fallback_urls) if u):
+        summary = await _fetch_summary(url)
+        if summary:
+            return summary
+    return None
+
+
+async def fetch_poi_summary(poi: PoiProjection) -> Optional[str]:
+    return await fetch_wikipedia_short_description(poi.wikipediaUrl or "", poi.wikipediaFallbackUrls)
+
+
+def peek_wikipedia_summary(wikipedia_url: str) -> Optional[str]:
+    """Summary από το L1 (και stale) χωρίς request· None αν δεν το έχουμε."""
+    entry = _SUMMARY_CACHE.peek(f"wp:{wikipedia_url}")
+    return entry[1] if entry is not None else None
+
+
+# callbacks για κάθε νέα projection (π.χ. geo/search indexes)
+_PROJECTION_LISTENERS: List[Callable[[PoiProjection], None]] = []
+
+
+def on_projection(listener: Callable[[PoiProjection], None]) -> None:
+    """Καλείται για κάθε projection που μπαίνει στο cache (fetch, L2 hit, refresh)."""
+    _PROJECTION_LISTENERS.append(listener)
+
+
+# callbacks για κάθε νέο Wikipedia summary (url, summary)
+_SUMMARY_LISTENERS: List[Callable[[str, str], None]] = []
+
+
+def on_summary(listener: Callable[[str, str], None]) -> None:
+    """Καλείται για κάθε summary που φέρνουμε από το Wikipedia ("" = χωρίς extract)."""
+    _SUMMARY_LISTENERS.append(listener)
+
+
+def _project(key: str, data: Dict[str, Any]) -> PoiProjection:
+    projection = PoiProjection.from_entity(key.split(":", 1)[1], data)
+    for listener in _PROJECTION_LISTENERS:
+        try:
+            listener(projection)
+        except Exception as e:
+            log.warning("projection_listener_failed", qid=projection.qid, error=str(e))
+    return projection
+
+
+async def refresh_wikipedia_summaries(
+        wikipedia_urls: List[str],
+        concurrency: int = FANOUT_CONCURRENCY,
+        older_than: float = 0.0,
+) -> int:
+    """
+    Ξαναφέρνει summaries ανεξάρτητα από το TTL (cache warmer), μόνο όσα
+    φέρθηκαν πριν από τουλάχιστον older_than δευτερόλεπτα (ή λείπουν).
+    Επιστρέφει πόσα πέτυχαν.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    cutoff = time.time() - older_than
+
+    async def _one(url: str) -> bool:
+        async with sem:
+            summary = await asyncio.shield(single_flight(f"wp:{url}", lambda: _fetch_summary_upstream(url)))
+            return summary is not None
+
+    urls = [u for u in dict.fromkeys(wikipedia_urls) if u and (await _summary_lookup(f"wp:{u}"))[2] <= cutoff]
+    results = await asyncio.gather(*(_one(u) for u in urls))
+    return sum(results)
+
+
+async def prefetch_wikipedia_summaries(
+        pois: List[PoiProjection],
+        concurrency: int = FANOUT_CONCURRENCY,
+) -> int:
+    """Φέρνει (με fallbacks) ό,τι summary λείπει ή έχει λήξει. Επιστρέφει πόσα POIs έχουν summary."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(poi: PoiProjection) -> bool:
+        async with sem:
+            return await fetch_poi_summary(poi) is not None
+
+    results = await asyncio.gather(*(_one(p) for p in pois if p and p.wikipediaUrl))
+    return sum(results)
+
+
+# background prefetches: κρατάμε reference μέχρι να τελειώσουν
+_PREFETCH_TASKS: Set["asyncio.Future[Any]"] = set()
+
+
+def schedule_summary_prefetch(pois: List[PoiProjection]) -> None:
+    """Fire-and-forget prefetch (π.χ. για μια σελίδα κατηγορίας)· δεν αγγίζει τα fresh entries."""
+    todo = []
+    for p in pois:
+        if not p or not p.wikipediaUrl:
+            continue
+        entry = _SUMMARY_CACHE.peek(f"wp:{p.wikipediaUrl}")
+        if entry is None or not entry[2]:
+            todo.append(p)
+    if not todo:
+        return
+    task = asyncio.ensure_future(prefetch_wikipedia_summaries(todo))
+    _PREFETCH_TASKS.add(task)
+    task.add_done_callback(_PREFETCH_TASKS.discard)
+
+
+async def _cache_lookup(key: str) -> Tuple[Optional[PoiProjection], bool, float]:
+    """
+    (projection, fresh, timestamp) από L1 ή L2 (βλ. tiered.lookup).
+    Ένα L2 hit γίνεται parse μία φορά και μπαίνει στο L1· fresh αν άλλος
+    worker το έχει ήδη ανανεώσει.
+    """
+    return await lookup(_CACHE, key, TTL_SECONDS, lambda data: _project(key, data))
+
+
+async def _cache_get(key: str) -> Optional[PoiProjection]:
+    projection, fresh, _ = await _cache_lookup(key)
+    return projection if fresh else None
+
+
+def _cache_project(key: str, data: Dict[str, Any], ts: float) -> PoiProjection:
+    projection = _project(key, data)
+    _CACHE.set(key, projection, ts=ts)
+    return projection
+
+
+async def _cache_set(
+        key: str,
+        data: Dict[str, Any],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+) -> PoiProjection:
+    """Raw entity -> L2, projection -> L1."""
+    now = time.time()
+    projection = _cache_project(key, data, now)
+    if DISK is not None:
+        await disk_io(DISK.set, key, data, etag=etag, last_modified=last_modified, ts=now)
+    return projection
+
+
+async def _cache_revalidated(key: str, data: Dict[str, Any]) -> PoiProjection:
+    """304 Not Modified: το ίδιο data ισχύει για άλλο ένα TTL."""
+    now = time.time()
+    projection = _cache_project(key, data, now)
+    if DISK is not None:
+        await disk_io(DISK.touch, key, ts=now)
+    return projection
 
-def _cache_set(key: str, data: Dict[str, Any]) -> None:
-    _CACHE[key] = (time.time(), data)
+
+async def _cache_validators(key: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+    """Ληγμένο entry + conditional headers (If-None-Match / If-Modified-Since)."""
+    if DISK is None:
+        return None, {}
+    stored = await disk_io(DISK.get, key)
+    if not stored:
+        return None, {}
+    _, data, etag, last_modified = stored
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return data, headers
+
+
+async def _mark_missing(qids: List[str]) -> None:
+    if qids:
+        log.info("wikidata_entities_missing", qids=qids)
+        await store_many(_MISSING_CACHE, {f"nx:{qid}": True for qid in qids})
+
+
+async def _known_missing_lookup(qid: str) -> bool:
+    value, fresh, _ = await lookup(_MISSING_CACHE, f"nx:{qid}", MISSING_TTL_SECONDS)
+    return bool(value) and fresh
+
+
+def known_missing(qid: str) -> bool:
+    """Το Wikidata δήλωσε πρόσφατα ότι το qid δεν υπάρχει (μόνο L1, χωρίς I/O)."""
+    entry = _MISSING_CACHE.peek(f"nx:{qid}")
+    return entry is not None and entry[2] and bool(entry[1])
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {"entities": _CACHE.stats(), "summaries": _SUMMARY_CACHE.stats(), "missing": _MISSING_CACHE.stats()}
+
+
+def close_cache() -> None:
+    close_disk()
+
+
+def preload_from_disk(qids: Sequence[str]) -> int:
+    """
+    Sync φόρτωμα projections + summaries από το L2 στο L1 (και στα indexes
+    μέσω των listeners), χωρίς upstream. Για το preload πριν το fork (app.serve),
+    όπου δεν υπάρχει ακόμη event loop να μπλοκάρει.
+    """
+    loaded = 0
+    for qid in qids:
+        key = f"wd:{qid}"
+        projection, _, _ = tiered_lookup(_CACHE, DISK, key, TTL_SECONDS, lambda data: _project(key, data))
+        if projection is None:
+            continue
+        loaded += 1
+        for url in (projection.wikipediaUrl, *projection.wikipediaFallbackUrls):
+            if url:
+                summary_key = f"wp:{url}"
+                tiered_lookup(
+                    _SUMMARY_CACHE, DISK, summary_key, SUMMARY_TTL_SECONDS,
+                    lambda data: _summary_from_l2(summary_key, data),
+                )
+    return loaded
+
+
+async def stop_prefetches() -> None:
+    """Graceful shutdown: ακυρώνει τα background summary prefetches πριν κλείσουν οι clients."""
+    tasks = list(_PREFETCH_TASKS)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 def commons_file_url(filename: str, width: int = 1100) -> str:
@@ -56,39 +447,315 @@ def commons_file_url(filename: str, width: int = 1100) -> str:
     return f"https://commons.wikimedia.org/wiki/Special:FilePath/{quote(filename)}?width={width}"
 
 
-async def fetch_wikidata_entity(qid: str) -> Optional[Dict[str, Any]]:
+@timed("fetch_wikidata_entity")
+async def _fetch_entity_upstream(qid: str) -> Optional[Tuple[Dict[str, Any], PoiProjection]]:
     """
-    Reliable endpoint (χωρίς wbgetentities): Special:EntityData
+    Reliable endpoint (χωρίς wbgetentities): Special:EntityData.
+    Επιστρέφει (raw document, projection) και ενημερώνει L1 + L2.
     """
     cache_key = f"wd:{qid}"
-    cached = _cache_get(cache_key)
-    if cached:
-        return cached
-
-    url = f"https://www.wikidata.org/wiki/Special:EntityData/{qid}.json"
+    stale, conditional = await _cache_validators(cache_key)
     try:
-        async with httpx.AsyncClient(
-                headers=WIKIDATA_HEADERS,
-                timeout=20.0,
-                follow_redirects=True
-        ) as client:
-            r = await client.get(url)
-            if r.status_code != 200:
-                print(f"⚠️ Wikidata returned {r.status_code} for {qid}")
-                return None
-
-            data = r.json()
-            _cache_set(cache_key, data)
-            return data
+        client = get_client(WIKIDATA_HOST)
+        r = await client.get(f"/wiki/Special:EntityData/{qid}.json", headers=conditional)
+        if r.status_code == 304 and stale:
+            return stale, await _cache_revalidated(cache_key, stale)
+        if r.status_code == 404:
+            await _mark_missing([qid])
+            return None
+        if r.status_code != 200:
+            log.warning("wikidata_bad_status", qid=qid, status=r.status_code)
+            return None
+
+        data = r.json()
+        etag, last_modified = r.headers.get("etag"), r.headers.get("last-modified")
+        return data, await _cache_set(cache_key, data, etag=etag, last_modified=last_modified)
     except Exception as e:
-        print(f"⚠️ Wikidata request failed for {qid}: {e}")
+        log.warning("wikidata_request_failed", qid=qid, error=str(e))
         return None
 
 
+async def _fetch_projection_upstream(qid: str) -> Optional[PoiProjection]:
+    fetched = await _fetch_entity_upstream(qid)
+    return fetched[1] if fetched else None
+
+
+async def _fetch_projection_shared(qid: str) -> Optional[PoiProjection]:
+    key = f"wd:{qid}"
+    return await shared_fetch(key, lambda: _fetch_projection_upstream(qid), lambda: _cache_get(key))
+
+
+async def fetch_wikidata_entity(qid: str) -> Optional[Dict[str, Any]]:
+    """
+    Raw Wikidata document ({"entities": {qid: ...}}), lazily: από το L2
+    (ακόμη κι αν έχει λήξει) αλλιώς από Special:EntityData. Ένα trimmed
+    entry (από wbgetentities) ξαναφέρνεται ολόκληρο· αν αυτό αποτύχει,
+    επιστρέφεται το trimmed. Για title/coords/facts κτλ. χρησιμοποίησε το fetch_poi.
+    """
+    stored = await disk_io(DISK.get, f"wd:{qid}") if DISK is not None else None
+    if stored and not stored[1].get("trimmed"):
+        return stored[1]
+    fetched = await _fetch_entity_upstream(qid)
+    if fetched:
+        return fetched[0]
+    if stored:
+        log.info("wikidata_serving_trimmed", qid=qid)
+        return stored[1]
+    return None
+
+
+@timed("fetch_poi")
+async def fetch_poi(qid: str) -> Optional[PoiProjection]:
+    """
+    Cache (L1/L2) -> αλλιώς Special:EntityData, με single-flight ανά qid.
+    Ένα qid που το Wikidata δήλωσε missing επιστρέφει None χωρίς request.
+    Ληγμένο entry σερβίρεται αμέσως και ανανεώνεται στο background·
+    αν το Wikidata δεν απαντά, σερβίρεται ό,τι stale υπάρχει.
+    """
+    cache_key = f"wd:{qid}"
+    projection, fresh, ts = await _cache_lookup(cache_key)
+    if projection is not None and fresh:
+        return projection
+    if projection is None and await _known_missing_lookup(qid):
+        return None
+    if projection is not None and can_serve_stale(ts, TTL_SECONDS):
+        single_flight(cache_key, lambda: _fetch_projection_shared(qid))
+        return projection
+
+    fetched = await asyncio.shield(single_flight(cache_key, lambda: _fetch_projection_shared(qid)))
+    if fetched is None and projection is not None:
+        log.info("wikidata_serving_stale", qid=qid)
+        return projection
+    return fetched
+
+
+async def fetch_poi_with_summary(qid: str) -> Tuple[Optional[PoiProjection], Optional[str]]:
+    """
+    Projection + Wikipedia summary. Αν έχουμε ήδη (έστω stale) projection,
+    το summary ξεκινά παράλληλα με το entity fetch αντί να το περιμένει.
+    """
+    known, _, _ = await _cache_lookup(f"wd:{qid}")
+    early = asyncio.ensure_future(fetch_poi_summary(known)) if known and known.wikipediaUrl else None
+
+    poi = await fetch_poi(qid)
+    if early is not None:
+        if poi is not None and (poi.wikipediaUrl, poi.wikipediaFallbackUrls) == (
+                known.wikipediaUrl, known.wikipediaFallbackUrls):
+            return poi, await early
+        early.cancel()  # άλλαξαν τα sitelinks· τα upstream fetches είναι shielded
+    if poi is None or not poi.wikipediaUrl:
+        return poi, None
+    return poi, await fetch_poi_summary(poi)
+
+
+@timed("fetch_wikidata_entities_batch")
+async def fetch_wikidata_entities_batch(
+        qids: List[str],
+        concurrency: int = FANOUT_CONCURRENCY,
+        deadline: float = ENTITY_DEADLINE_SECONDS,
+) -> Dict[str, Optional[PoiProjection]]:
+    """
+    wbgetentities: έως 50 qids ανά request, μόνο τα props/languages που
+    διαβάζει το parse_poi_from_wikidata. Κάθε entity αποθηκεύεται στο L2
+    στο ίδιο σχήμα με το Special:EntityData ({"entities": {qid: ...}}),
+    με "trimmed": True, και η projection του στο L1.
+
+    Επιστρέφει μόνο τα qids που απάντησε το Wikidata (None = δεν υπάρχει,
+    και μπαίνει στο negative cache). Όσα λείπουν από το αποτέλεσμα ανήκουν
+    σε batch που απέτυχε. Ένα qid που έγινε merge (redirect) αποθηκεύεται
+    με το entity του νέου qid.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    unique = list(dict.fromkeys(qids))
+    chunks = [unique[i:i + WBGETENTITIES_MAX_IDS] for i in range(0, len(unique), WBGETENTITIES_MAX_IDS)]
+
+    async def _chunk(ids: List[str]) -> Dict[str, Optional[PoiProjection]]:
+        params = {
+            "action": "wbgetentities",
+            "format": "json",
+            "ids": "|".join(ids),
+            "props": WBGETENTITIES_PROPS,
+            "languages": WBGETENTITIES_LANGUAGES,
+            "sitefilter": WBGETENTITIES_SITES,
+        }
+        async with sem:
+            try:
+                client = get_client(WIKIDATA_HOST)
+                r = await asyncio.wait_for(client.get("/w/api.php", params=params), deadline)
+                if r.status_code != 200:
+                    log.warning("wbgetentities_bad_status", ids=len(ids), status=r.status_code)
+                    return {}
+                payload = r.json()
+                if "error" in payload:
+                    # 200 με error body (π.χ. άκυρο id, maxlag): όλο το batch αποτυγχάνει,
+                    # ώστε τα qids να πάνε στο Special:EntityData αντί να γραφτούν ως missing
+                    error = payload["error"]
+                    code = error.get("code") if isinstance(error, dict) else str(error)
+                    log.warning("wbgetentities_error", ids=len(ids), code=code)
+                    return {}
+                entities = payload.get("entities") or {}
+            except asyncio.TimeoutError:
+                log.warning("wbgetentities_deadline_exceeded", ids=len(ids), deadline=deadline)
+                return {}
+            except Exception as e:
+                log.warning("wbgetentities_request_failed", ids=len(ids), error=str(e))
+                return {}
+
+        # projections στο L1 εδώ, όλο το batch στο L2 με ένα transaction (εκτός loop)
+        now = time.time()
+        out: Dict[str, Optional[PoiProjection]] = {}
+        rows: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        redirected = {
+            e["redirects"].get("from"): e for e in entities.values()
+            if isinstance(e, dict) and isinstance(e.get("redirects"), dict)
+        }
+        for qid in ids:
+            entity = entities.get(qid) or redirected.get(qid)
+            if not entity or "missing" in entity:
+                out[qid] = None
+                missing.append(qid)
+                continue
+            rows[f"wd:{qid}"] = {"entities": {qid: entity}, "trimmed": True}
+            out[qid] = _cache_project(f"wd:{qid}", rows[f"wd:{qid}"], now)
+        if DISK is not None and rows:
+            await disk_io(DISK.set_many, rows, ts=now)
+        await _mark_missing(missing)
+        return out
+
+    results: Dict[str, Optional[PoiProjection]] = {}
+    for part in await asyncio.gather(*(_chunk(c) for c in chunks)):
+        results.update(part)
+    return results
+
+
+async def _leased_batch(
+        qids: List[str],
+        concurrency: int,
+        deadline: float,
+) -> Tuple[Dict[str, Optional[PoiProjection]], Set[str]]:
+    """
+    wbgetentities για όσα qids πάρουμε lease στο L2. Επιστρέφει (αποτελέσματα,
+    qids που φέρνει ήδη άλλος worker)· αυτά τα περιμένουμε από το L2.
+    """
+    if DISK is None:
+        return await fetch_wikidata_entities_batch(qids, concurrency, deadline), set()
+    leased = await disk_io(DISK.lease_many, [f"wd:{qid}" for qid in qids], LEASE_SECONDS)
+    mine = [qid for qid in qids if f"wd:{qid}" in leased]
+    try:
+        results = await fetch_wikidata_entities_batch(mine, concurrency, deadline) if mine else {}
+    finally:
+        await disk_io(DISK.release_many, [f"wd:{qid}" for qid in mine])
+    return results, set(qids) - set(mine)
+
+
+def _batch_flights(
+        qids: List[str],
+        concurrency: int,
+        deadline: float,
+) -> Dict[str, "asyncio.Future[Any]"]:
+    """
+    Ένα single-flight task ανά qid. Όσα δεν είναι ήδη in-flight μοιράζονται
+    ένα wbgetentities batch· αν το batch τους αποτύχει, πέφτουν σε
+    Special:EntityData ένα-ένα (bounded με semaphore). Τα tasks μπαίνουν
+    στο single-flight πριν από κάθε await (lease στο L2), ώστε ένα δεύτερο
+    request για τα ίδια qids να τα βρει in-flight.
+    """
+    flights, todo = split_inflight(qids, "wd")
+    if not todo:
+        return flights
+
+    batch = asyncio.ensure_future(_leased_batch(todo, concurrency, deadline))
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _from_batch(qid: str) -> Optional[PoiProjection]:
+        results, elsewhere = await asyncio.shield(batch)
+        if qid in results:
+            return results[qid]
+        if qid in elsewhere:
+            return await _fetch_projection_shared(qid)
+        async with sem:
+            return await _fetch_projection_upstream(qid)
+
+    for qid in todo:
+        flights[qid] = single_flight(f"wd:{qid}", lambda qid=qid: _from_batch(qid))
+    return flights
+
+
+@timed("fetch_pois")
+async def fetch_pois(
+        qids: List[str],
+        concurrency: int = FANOUT_CONCURRENCY,
+        deadline: float = ENTITY_DEADLINE_SECONDS,
+) -> Dict[str, Optional[PoiProjection]]:
+    """
+    Φέρνει πολλά POIs (projections): πρώτα από το cache, τα υπόλοιπα με ένα
+    wbgetentities round trip (single-flight ανά qid). Ληγμένα entries
+    σερβίρονται αμέσως και ανανεώνονται στο ίδιο background batch.
+    Κάθε qid έχει δικό του deadline, οπότε ένα αργό entity δεν
+    καθυστερεί τα υπόλοιπα. Αποτυχίες/timeouts επιστρέφουν ό,τι stale
+    υπάρχει, αλλιώς None.
+    """
+    unique = list(dict.fromkeys(qids))
+    results: Dict[str, Optional[PoiProjection]] = {}
+    stale: Dict[str, PoiProjection] = {}
+    waiting: List[str] = []
+    refresh: List[str] = []
+    for qid in unique:
+        data, fresh, ts = await _cache_lookup(f"wd:{qid}")
+        if data is not None and fresh:
+            results[qid] = data
+        elif data is None and await _known_missing_lookup(qid):
+            results[qid] = None
+        elif data is not None and can_serve_stale(ts, TTL_SECONDS):
+            results[qid] = data
+            refresh.append(qid)
+        else:
+            waiting.append(qid)
+            if data is not None:
+                stale[qid] = data
+
+    flights = _batch_flights(waiting + refresh, concurrency, deadline)
+
+    async def _wait(qid: str) -> Tuple[str, Optional[PoiProjection]]:
+        try:
+            return qid, await asyncio.wait_for(asyncio.shield(flights[qid]), deadline)
+        except asyncio.TimeoutError:
+            log.warning("wikidata_deadline_exceeded", qid=qid, deadline=deadline)
+        except Exception as e:
+            log.warning("wikidata_request_failed", qid=qid, error=str(e))
+        return qid, None
+
+    for qid, data in await asyncio.gather(*(_wait(q) for q in waiting)):
+        results[qid] = data if data is not None else stale.get(qid)
+
+    return {q: results.get(q) for q in unique}
+
+
+async def refresh_pois(
+        qids: List[str],
+        concurrency: int = FANOUT_CONCURRENCY,
+        deadline: float = ENTITY_DEADLINE_SECONDS,
+) -> Dict[str, Optional[PoiProjection]]:
+    """
+    Ξαναφέρνει τα qids από το Wikidata ανεξάρτητα από το TTL (cache warmer),
+    με τα ίδια batches/single-flight με τα requests. Σε αποτυχία το cache
+    μένει ως έχει και το qid επιστρέφει None.
+    """
+    unique = list(dict.fromkeys(qids))
+    flights = _batch_flights(unique, concurrency, deadline)
+    results = await asyncio.gather(*(asyncio.shield(flights[q]) for q in unique), return_exceptions=True)
+    return {q: r if isinstance(r, PoiProjection) else None for q, r in zip(unique, results)}
+
+
 # ------------------ Wikidata parsing helpers ------------------
 
 def _get_entity(data: Dict[str, Any], qid: str) -> Dict[str, Any]:
-    return (data.get("entities") or {}).get(qid) or {}
+    entities = data.get("entities") or {}
+    if qid not in entities and len(entities) == 1:
+        # Special:EntityData ακολουθεί redirects (merged items): το entity έρχεται με το νέο qid
+        return next(iter(entities.values())) or {}
+    return entities.get(qid) or {}
 
 
 def _get_claims(entity: Dict[str, Any], prop: str) -> List[Dict[str, Any]]:
@@ -155,16 +822,23 @@ def _get_coordinates(entity: Dict[str, Any]) -> Tuple[Optional[float], Optional[
     return v.get("latitude"), v.get("longitude")
 
 
-def _get_wikipedia_link(sitelinks: Dict[str, Any], lang_pref=("elwiki", "enwiki")) -> Optional[str]:
+def _get_wikipedia_links(sitelinks: Dict[str, Any], lang_pref=("elwiki", "enwiki")) -> List[str]:
+    links: List[str] = []
     for key in lang_pref:
         sl = sitelinks.get(key)
         if sl and "title" in sl:
             title = sl["title"].replace(" ", "_")
-            lang = "el" if key == "elwiki" else "en"
-            return f"https://{lang}.wikipedia.org/wiki/{title}"
-    return None
+            lang = key[:-len("wiki")]
+            links.append(f"https://{lang}.wikipedia.org/wiki/{title}")
+    return links
+
+
+def _get_wikipedia_link(sitelinks: Dict[str, Any], lang_pref=("elwiki", "enwiki")) -> Optional[str]:
+    links = _get_wikipedia_links(sitelinks, lang_pref)
+    return links[0] if links else None
 
 
+@timed("parse_poi_from_wikidata")
 def parse_poi_from_wikidata(qid: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Επιστρέφει:
@@ -186,7 +860,8 @@ def parse_poi_from_wikidata(qid: str, data: Dict[str, Any]) -> Dict[str, Any]:
     photoname = _get_claim_str(entity, "P18")  # image filename
     image_url = commons_file_url(photoname, 1200) if photoname else None
 
-    wikipedia_url = _get_wikipedia_link(sitelinks)
+    wikipedia_urls = _get_wikipedia_links(sitelinks)
+    wikipedia_url = wikipedia_urls[0] if wikipedia_urls else None
 
     # ===== EXTRA FACTS (ό,τι υπάρχει) =====
     facts: List[Dict[str, str]] = []
@@ -232,7 +907,10 @@ def parse_poi_from_wikidata(qid: str, data: Dict[str, Any]) -> Dict[str, Any]:
         "lat": lat,
         "lon": lon,
         "image": image_url,
+        "imageFile": photoname,
+        "commonsCategory": commons_category,
         "wikipediaUrl": wikipedia_url,
+        "wikipediaUrls": wikipedia_urls,  # όλες οι γλώσσες, με σειρά προτίμησης
         "facts": facts,
         "raw": entity,  # ✅ ΟΛΟ το entity
     }
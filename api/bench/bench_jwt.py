@@ -0,0 +1,33 @@
+"""
+Σύγκριση decode για τα access tokens του API:
+python-jose vs λιτό HS256 verify vs decode_token με cache.
+
+    cd api && python -m bench.bench_jwt
+"""
+import timeit
+
+from app import auth
+
+
+def main(number: int = 20_000) -> None:
+    token = auth.create_access_token("demo@demo.com")
+    assert auth._decode_jose(token) == auth._decode_hs256(token)
+
+    def cold_cache() -> None:
+        auth._token_cache.clear()
+        auth.decode_token(token)
+
+    cases = {
+        "python-jose": lambda: auth._decode_jose(token),
+        "fast HS256": lambda: auth._decode_hs256(token),
+        "decode_token (cold cache)": cold_cache,
+        "decode_token (cached)": lambda: auth.decode_token(token),
+    }
+    print(f"{'case':<28}{'µs/op':>10}")
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=number, repeat=3))
+        print(f"{name:<28}{seconds / number * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
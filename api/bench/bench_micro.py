@@ -0,0 +1,100 @@
+"""
+Microbenchmarks για τα hot paths: parse_poi_from_wikidata (μικρό/μεγάλο
+entity), decode_token (cold/cached) και bcrypt (hash/verify).
+
+    cd api
+    python -m bench.bench_micro
+    python -m bench.bench_micro --save bench-baseline.json
+    python -m bench.bench_micro --baseline bench-baseline.json --tolerance 0.25   # exit 1 σε regression
+"""
+import argparse
+import json
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from app import auth
+from app.hashing import pwd_context
+from app.wikidata import PoiProjection, parse_poi_from_wikidata
+
+from .fixtures import make_entity
+
+
+def _cases() -> Dict[str, Callable[[], object]]:
+    small = {"entities": {"Q1001": make_entity("Q1001")}}
+    large = {"entities": {"Q1002": make_entity("Q1002", padding_claims=500)}}
+    token = auth.create_access_token("demo@demo.com")
+    password_hash = pwd_context.hash("demo1234")
+
+    def decode_cold() -> None:
+        auth._token_cache.clear()
+        auth.decode_token(token)
+
+    return {
+        "parse_poi (small)": lambda: parse_poi_from_wikidata("Q1001", small),
+        "parse_poi (500 claims)": lambda: parse_poi_from_wikidata("Q1002", large),
+        "projection (small)": lambda: PoiProjection.from_entity("Q1001", small),
+        "decode_token (cold)": decode_cold,
+        "decode_token (cached)": lambda: auth.decode_token(token),
+        "bcrypt hash": lambda: pwd_context.hash("demo1234"),
+        "bcrypt verify": lambda: pwd_context.verify("demo1234", password_hash),
+    }
+
+
+def _number(fn: Callable[[], object], budget: float = 0.2) -> int:
+    """Όσες επαναλήψεις χωράνε περίπου στο budget (bcrypt: λίγες, decode: χιλιάδες)."""
+    number = 1
+    while True:
+        if timeit.timeit(fn, number=number) >= budget or number >= 1_000_000:
+            return number
+        number *= 10
+
+
+def run(repeat: int = 5) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for name, fn in _cases().items():
+        number = _number(fn)
+        seconds = min(timeit.repeat(fn, number=number, repeat=repeat))
+        results[name] = seconds / number * 1e6
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    return [
+        name for name, us in results.items()
+        if name in baseline and us > baseline[name] * (1 + tolerance)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path microbenchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="αποθήκευση αποτελεσμάτων (µs/op) σε JSON")
+    parser.add_argument("--baseline", help="σύγκριση με προηγούμενο --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="επιτρεπτή επιβράδυνση (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    baseline: Dict[str, float] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'case':<26}{'µs/op':>12}{'baseline':>12}")
+    for name, us in results.items():
+        base = f"{baseline[name]:.2f}" if name in baseline else "-"
+        print(f"{name:<26}{us:>12.2f}{base:>12}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nRegressions (> {args.tolerance:.0%} slower): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Ντετερμινιστικά Wikidata entities για benchmarks: ίδιο qid + seed -> ίδιο JSON.
+Το padding (extra claims) ελέγχει το μέγεθος, ώστε να μετράμε και μεγάλα entities.
+"""
+import random
+from typing import Any, Dict
+
+# Ιωάννινα και γύρω
+CENTER = (39.665, 20.853)
+
+
+def _claim(value: Any, datatype: str = "string") -> Dict[str, Any]:
+    return {
+        "mainsnak": {"snaktype": "value", "datatype": datatype, "datavalue": {"value": value}},
+        "type": "statement",
+        "rank": "normal",
+    }
+
+
+def _item(qid: str) -> Dict[str, Any]:
+    return _claim({"entity-type": "item", "id": qid, "numeric-id": int(qid[1:])}, "wikibase-item")
+
+
+def make_entity(qid: str, padding_claims: int = 0, seed: int = 0) -> Dict[str, Any]:
+    rnd = random.Random(f"{seed}:{qid}")
+    n = int(qid[1:])
+    lat = CENTER[0] + rnd.uniform(-0.4, 0.4)
+    lon = CENTER[1] + rnd.uniform(-0.5, 0.5)
+    claims: Dict[str, Any] = {
+        "P625": [_claim({"latitude": lat, "longitude": lon, "precision": 0.0001, "globe": "http://www.wikidata.org/entity/Q2"}, "globe-coordinate")],
+        "P18": [_claim(f"Ioannina landmark {n}.jpg", "commonsMedia")],
+        "P373": [_claim(f"Ioannina landmark {n}")],
+        "P571": [_claim({"time": f"+{rnd.randint(1100, 1950)}-00-00T00:00:00Z", "precision": 9}, "time")],
+        "P131": [_item("Q173215")],
+        "P31": [_item(rnd.choice(("Q33506", "Q23413", "Q16970", "Q23397")))],
+        "P17": [_item("Q41")],
+        "P2044": [_claim({"amount": f"+{rnd.randint(200, 2500)}", "unit": "http://www.wikidata.org/entity/Q11573"}, "quantity")],
+    }
+    if rnd.random() < 0.5:
+        claims["P856"] = [_claim(f"https://example.org/poi/{n}", "url")]
+    for i in range(padding_claims):
+        claims[f"P{9000 + i}"] = [_claim(f"padding value {i} " + "x" * rnd.randint(10, 60))]
+
+    return {
+        "type": "item",
+        "id": qid,
+        "lastrevid": rnd.randint(1_000_000, 2_000_000_000),
+        "labels": {
+            "el": {"language": "el", "value": f"Μνημείο {n} Ιωαννίνων"},
+            "en": {"language": "en", "value": f"Landmark {n} of Ioannina"},
+            "fr": {"language": "fr", "value": f"Monument {n} de Ioannina"},
+        },
+        "descriptions": {
+            "el": {"language": "el", "value": "ιστορικό μνημείο στα Ιωάννινα"},
+            "en": {"language": "en", "value": "historic site in Ioannina, Greece"},
+        },
+        "aliases": {
+            "en": [{"language": "en", "value": f"Ioannina site {n}"}],
+        },
+        "sitelinks": {
+            "elwiki": {"site": "elwiki", "title": f"Μνημείο {n}"},
+            "enwiki": {"site": "enwiki", "title": f"Landmark {n}"},
+            "frwiki": {"site": "frwiki", "title": f"Monument {n}"},
+        },
+        "claims": claims,
+    }
+
+
+def select_entity(entity: Dict[str, Any], props: str = "", languages: str = "", sites: str = "") -> Dict[str, Any]:
+    """Όπως το wbgetentities με props/languages/sitefilter (κενό = χωρίς φίλτρο)."""
+    out = dict(entity)
+    if props:
+        keep = set(props.split("|")) | {"type", "id"}
+        out = {k: v for k, v in out.items() if k in keep}
+    if languages:
+        langs = set(languages.split("|"))
+        for key in ("labels", "descriptions", "aliases"):
+            if key in out:
+                out[key] = {lang: v for lang, v in out[key].items() if lang in langs}
+    if sites and "sitelinks" in out:
+        keep_sites = set(sites.split("|"))
+        out["sitelinks"] = {site: v for site, v in out["sitelinks"].items() if site in keep_sites}
+    return out
+
+
+def make_summary(title: str, seed: int = 0) -> Dict[str, Any]:
+    rnd = random.Random(f"{seed}:{title}")
+    sentences = [f"Πρόταση {i} για το {title}." for i in range(rnd.randint(2, 6))]
+    return {"title": title, "extract": " ".join(sentences)}
@@ -0,0 +1,274 @@
+"""
+Load test της ροής του app: login -> categories -> category list -> details,
+σε αυξανόμενο concurrency. Σηκώνει το bench.mock_upstream και το API
+(uvicorn) σε ξεχωριστά processes και τυπώνει p50/p95/p99 ανά βήμα,
+throughput και RSS του API.
+
+    cd api
+    python -m bench.loadtest --concurrency 1,8,32,64 --duration 15
+    python -m bench.loadtest --latency-ms 150 --error-rate 0.02 --padding-claims 200
+    python -m bench.loadtest --workers 4 --concurrency 64                 # scaling με workers
+    python -m bench.loadtest --url http://127.0.0.1:8000 --pid 1234   # υπάρχον API
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ("login", "categories", "list", "details")
+DEMO_USER = {"email": "demo@demo.com", "password": "demo1234"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _rss_mb(pid: Optional[int]) -> Optional[float]:
+    """VmRSS από το /proc (Linux), μαζί με τους workers του app.serve· None αλλού."""
+    if not pid:
+        return None
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r", encoding="ascii") as f:
+            children = [int(c) for c in f.read().split()]
+        return round(sum(_rss_kb(p) for p in (pid, *children)) / 1024, 1)
+    except (OSError, ValueError):
+        return None
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile σε ταξινομημένη λίστα."""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), math.ceil(p / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+async def _wait_ready(client: httpx.AsyncClient, warm: bool, timeout: float = 120.0) -> None:
+    """Περιμένει να απαντάει το API· με warm, και να έχει τελειώσει ο warmer (/ready 200)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = (await client.get("/ready")).status_code
+            if status == 200 or (not warm and status == 503):
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start in time")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {s: [] for s in STEPS}
+        self.errors: Dict[str, int] = {s: 0 for s in STEPS}
+        self.flows = 0
+
+    async def timed(self, step: str, request) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.samples[step].append(time.perf_counter() - started)
+        if response is None or response.status_code >= 400:
+            self.errors[step] += 1
+            return None
+        return response
+
+
+async def _user(
+        client: httpx.AsyncClient,
+        recorder: Recorder,
+        rnd: random.Random,
+        stop_at: float,
+        relogin: bool,
+        page_size: int,
+) -> None:
+    headers: Dict[str, str] = {}
+    while time.monotonic() < stop_at:
+        if relogin or not headers:
+            r = await recorder.timed("login", client.post("/api/auth/login", json=DEMO_USER))
+            if r is None:
+                continue
+            headers = {"Authorization": f"Bearer {r.json()['accessToken']}"}
+
+        r = await recorder.timed("categories", client.get("/pois/categories", headers=headers))
+        if r is None:
+            continue
+        category = rnd.choice(r.json())["id"]
+
+        r = await recorder.timed("list", client.get(
+            f"/pois/categories/{category}", params={"limit": page_size}, headers=headers,
+        ))
+        if r is None or not r.json():
+            continue
+        poi = rnd.choice(r.json())["id"]
+
+        if await recorder.timed("details", client.get(f"/pois/{poi}", headers=headers)) is not None:
+            recorder.flows += 1
+
+
+async def run_level(
+        base_url: str,
+        concurrency: int,
+        duration: float,
+        seed: int,
+        relogin: bool,
+        page_size: int,
+) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        started = time.monotonic()
+        stop_at = started + duration
+        await asyncio.gather(*(
+            _user(client, recorder, random.Random(seed * 100_003 + i), stop_at, relogin, page_size)
+            for i in range(concurrency)
+        ))
+        return recorder, time.monotonic() - started
+
+
+def _summarize(concurrency: int, recorder: Recorder, elapsed: float, rss: Optional[float]) -> Dict[str, Any]:
+    steps: Dict[str, Any] = {}
+    total = 0
+    for step in STEPS:
+        values = sorted(recorder.samples[step])
+        total += len(values)
+        steps[step] = {
+            "requests": len(values),
+            "errors": recorder.errors[step],
+            "p50Ms": round(percentile(values, 50) * 1000, 2) if values else None,
+            "p95Ms": round(percentile(values, 95) * 1000, 2) if values else None,
+            "p99Ms": round(percentile(values, 99) * 1000, 2) if values else None,
+        }
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "requestsPerSecond": round(total / elapsed, 1) if elapsed else None,
+        "flowsPerSecond": round(recorder.flows / elapsed, 1) if elapsed else None,
+        "rssMb": rss,
+        "steps": steps,
+    }
+
+
+def _print_level(result: Dict[str, Any]) -> None:
+    print(
+        f"\nconcurrency={result['concurrency']}  {result['requestsPerSecond']} req/s  "
+        f"{result['flowsPerSecond']} flows/s  RSS={result['rssMb']} MB"
+    )
+    print(f"  {'step':<12}{'n':>8}{'err':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, s in result["steps"].items():
+        print(f"  {step:<12}{s['requests']:>8}{s['errors']:>6}{str(s['p50Ms']):>10}{str(s['p95Ms']):>10}{str(s['p99Ms']):>10}")
+
+
+def _start_processes(args: argparse.Namespace, workdir: str) -> Tuple[str, List[subprocess.Popen], int]:
+    mock_port, api_port = _free_port(), _free_port()
+    mock = subprocess.Popen(
+        [
+            sys.executable, "-m", "bench.mock_upstream", "--port", str(mock_port),
+            "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+            "--error-rate", str(args.error_rate), "--padding-claims", str(args.padding_claims),
+            "--seed", str(args.seed),
+        ],
+        cwd=API_DIR,
+    )
+    env = {
+        **os.environ,
+        "UPSTREAM_BASE_URL": f"http://127.0.0.1:{mock_port}",
+        "CACHE_DB_PATH": os.path.join(workdir, "cache.sqlite3"),
+        "USERS_DB_PATH": os.path.join(workdir, "users.sqlite3"),
+        "WARMER_ENABLED": "true" if args.warm else "false",
+        "ACCESS_LOG": "false",
+        "LOG_LEVEL": "ERROR",
+    }
+    api = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(api_port),
+            "--workers", str(args.workers),
+        ],
+        cwd=API_DIR,
+        env=env,
+    )
+    return f"http://127.0.0.1:{api_port}", [api, mock], api.pid
+
+
+async def main_async(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    processes: List[subprocess.Popen] = []
+    workdir = tempfile.mkdtemp(prefix="ioannina-bench-")
+    try:
+        if args.url:
+            base_url, pid = args.url, args.pid
+        else:
+            base_url, processes, pid = _start_processes(args, workdir)
+        async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+            await _wait_ready(client, args.warm)
+
+        results: List[Dict[str, Any]] = []
+        print(f"target={base_url} duration={args.duration}s relogin={args.relogin} seed={args.seed}")
+        for concurrency in levels:
+            recorder, elapsed = await run_level(
+                base_url, concurrency, args.duration, args.seed, args.relogin, args.page_size,
+            )
+            result = _summarize(concurrency, recorder, elapsed, _rss_mb(pid))
+            _print_level(result)
+            results.append(result)
+        return results
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test: login -> categories -> list -> details")
+    parser.add_argument("--concurrency", default="1,8,32,64", help="comma-separated επίπεδα")
+    parser.add_argument("--duration", type=float, default=10.0, help="δευτερόλεπτα ανά επίπεδο")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--relogin", action="store_true", help="login σε κάθε επανάληψη (bcrypt-bound)")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--warm", action="store_true", help="με cache warmer (default: κρύο cache)")
+    parser.add_argument("--workers", type=int, default=1, help="workers του app.serve (0 = ένας ανά πυρήνα)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--padding-claims", type=int, default=0)
+    parser.add_argument("--url", help="υπάρχον API αντί να σηκωθεί τοπικά")
+    parser.add_argument("--pid", type=int, help="pid του υπάρχοντος API (για RSS)")
+    parser.add_argument("--json", dest="json_path", help="αποθήκευση αποτελεσμάτων σε JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(main_async(args))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
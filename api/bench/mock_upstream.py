@@ -0,0 +1,151 @@
+"""
+Τοπικό stand-in για Wikidata (Special:EntityData, wbgetentities), Wikipedia
+(rest_v1/page/summary) και Commons (imageinfo, categorymembers), με
+ρυθμιζόμενο latency, error rate και μέγεθος entities.
+
+    cd api
+    python -m bench.mock_upstream --port 9100 --latency-ms 80 --error-rate 0.01
+    UPSTREAM_BASE_URL=http://127.0.0.1:9100 uvicorn app.main:app
+
+Το API στέλνει τον πραγματικό host στο X-Upstream-Host (βλ. UPSTREAM_BASE_URL).
+"""
+import argparse
+import asyncio
+import os
+import random
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from .fixtures import make_entity, make_summary, select_entity
+
+LATENCY_MS = float(os.environ.get("MOCK_LATENCY_MS", "50"))
+JITTER_MS = float(os.environ.get("MOCK_JITTER_MS", "10"))
+ERROR_RATE = float(os.environ.get("MOCK_ERROR_RATE", "0"))
+PADDING_CLAIMS = int(os.environ.get("MOCK_PADDING_CLAIMS", "0"))
+SEED = int(os.environ.get("MOCK_SEED", "0"))
+# qids που "δεν υπάρχουν" (σβησμένα entities) και qids που αποτυγχάνουν πάντα
+MISSING_IDS = {q for q in os.environ.get("MOCK_MISSING_IDS", "").split(",") if q}
+FAILING_IDS = {q for q in os.environ.get("MOCK_FAILING_IDS", "").split(",") if q}
+COMMONS_CATEGORY_FILES = 6
+
+_rnd = random.Random(SEED)
+_calls: Counter = Counter()
+
+app = FastAPI(title="Mock upstream (Wikidata/Wikipedia/Commons)")
+
+
+async def _delay_or_error(kind: str) -> Optional[Response]:
+    _calls[kind] += 1
+    await asyncio.sleep(max(0.0, _rnd.gauss(LATENCY_MS, JITTER_MS)) / 1000)
+    if ERROR_RATE and _rnd.random() < ERROR_RATE:
+        _calls[f"{kind}:error"] += 1
+        return JSONResponse({"error": "mock upstream error"}, status_code=503)
+    return None
+
+
+def _image_page(title: str, index: int = 0) -> Dict[str, Any]:
+    name = title.split(":", 1)[-1]
+    slug = name.replace(" ", "_")
+    base = "https://upload.wikimedia.org/wikipedia/commons"
+    return {
+        "title": f"File:{name}",
+        "index": index,
+        "imageinfo": [{
+            "url": f"{base}/a/ab/{slug}",
+            "width": 4000,
+            "height": 3000,
+            "mime": "image/jpeg",
+            "thumburl": f"{base}/thumb/a/ab/{slug}/1280px-{slug}",
+        }],
+    }
+
+
+@app.get("/wiki/Special:EntityData/{name}")
+async def entity_data(name: str):
+    error = await _delay_or_error("entitydata")
+    if error is not None:
+        return error
+    qid = name.rsplit(".", 1)[0]
+    if qid in FAILING_IDS:
+        _calls["entitydata:error"] += 1
+        return JSONResponse({"error": "mock upstream error"}, status_code=500)
+    if qid in MISSING_IDS:
+        return JSONResponse({"error": f"No entity with ID {qid}"}, status_code=404)
+    return {"entities": {qid: make_entity(qid, PADDING_CLAIMS, SEED)}}
+
+
+@app.get("/w/api.php")
+async def api_php(request: Request):
+    params = request.query_params
+    action = params.get("action")
+    error = await _delay_or_error(action or "api")
+    if error is not None:
+        return error
+    if action == "wbgetentities":
+        ids = [q for q in params.get("ids", "").split("|") if q]
+        if FAILING_IDS.intersection(ids):
+            _calls["wbgetentities:error"] += 1
+            return {"error": {"code": "internal_api_error_DBQueryError", "info": "mock upstream error"}}
+        entities = {
+            q: {"id": q, "missing": ""} if q in MISSING_IDS else select_entity(
+                make_entity(q, PADDING_CLAIMS, SEED),
+                params.get("props", ""), params.get("languages", ""), params.get("sitefilter", ""),
+            )
+            for q in ids
+        }
+        return {"entities": entities, "success": 1}
+    if action == "query" and params.get("generator") == "categorymembers":
+        category = params.get("gcmtitle", "").split(":", 1)[-1]
+        pages = [_image_page(f"File:{category} {i}.jpg", i) for i in range(COMMONS_CATEGORY_FILES)]
+        return {"query": {"pages": pages}}
+    if action == "query" and params.get("titles"):
+        pages: List[Dict[str, Any]] = [_image_page(t) for t in params["titles"].split("|")]
+        return {"query": {"pages": pages}}
+    return {"query": {}}
+
+
+@app.get("/api/rest_v1/page/summary/{title:path}")
+async def page_summary(title: str):
+    error = await _delay_or_error("summary")
+    if error is not None:
+        return error
+    return make_summary(title, SEED)
+
+
+@app.get("/_stats")
+def stats():
+    return dict(_calls)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mock Wikidata/Wikipedia/Commons upstream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    parser.add_argument("--padding-claims", type=int, default=PADDING_CLAIMS, help="extra claims ανά entity (μέγεθος)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--missing-ids", default=",".join(sorted(MISSING_IDS)), help="qids χωρίς entity (comma-separated)")
+    parser.add_argument("--failing-ids", default=",".join(sorted(FAILING_IDS)), help="qids που αποτυγχάνουν πάντα")
+    args = parser.parse_args(argv)
+
+    # το uvicorn ξαναφορτώνει το module: οι ρυθμίσεις περνάνε μέσω env
+    os.environ.update({
+        "MOCK_LATENCY_MS": str(args.latency_ms),
+        "MOCK_JITTER_MS": str(args.jitter_ms),
+        "MOCK_ERROR_RATE": str(args.error_rate),
+        "MOCK_PADDING_CLAIMS": str(args.padding_claims),
+        "MOCK_SEED": str(args.seed),
+        "MOCK_MISSING_IDS": args.missing_ids,
+        "MOCK_FAILING_IDS": args.failing_ids,
+    })
+    import uvicorn
+    uvicorn.run("bench.mock_upstream:app", host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
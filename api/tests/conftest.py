@@ -0,0 +1,114 @@
+"""
+Tests: unit tests για τα hot paths και API tests (TestClient) πάνω στο
+bench.mock_upstream, που τρέχει σε thread του ίδιου process.
+
+    cd api
+    pip install -r requirements-dev.txt
+    python -m pytest
+
+Τα settings διαβάζονται στο import του app, οπότε τα defaults εδώ μπαίνουν
+πριν από οποιοδήποτε import: προσωρινά SQLite αρχεία, χωρίς warmer, φθηνό bcrypt,
+upstream = το mock (χωρίς latency, retries και rate limit).
+"""
+import atexit
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+_TMP = tempfile.mkdtemp(prefix="ioannina-tests-")
+atexit.register(shutil.rmtree, _TMP, True)
+MOCK_PORT = _free_port()
+os.environ.setdefault("USERS_DB_PATH", os.path.join(_TMP, "users.sqlite3"))
+os.environ.setdefault("CACHE_DB_PATH", os.path.join(_TMP, "cache.sqlite3"))
+os.environ.setdefault("WARMER_ENABLED", "false")
+os.environ.setdefault("ACCESS_LOG", "false")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("UPSTREAM_BASE_URL", f"http://127.0.0.1:{MOCK_PORT}")
+os.environ.setdefault("UPSTREAM_MAX_RETRIES", "0")
+os.environ.setdefault("UPSTREAM_BREAKER_FAILURES", "1000")
+os.environ.setdefault("UPSTREAM_RATE_PER_SECOND", "0")
+os.environ.setdefault("MOCK_LATENCY_MS", "0")
+os.environ.setdefault("MOCK_JITTER_MS", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def upstream():
+    """Το bench.mock_upstream (module): _calls, ERROR_RATE, LATENCY_MS αλλάζουν ανά test."""
+    import uvicorn
+
+    from bench import mock_upstream
+
+    server = uvicorn.Server(uvicorn.Config(
+        mock_upstream.app, host="127.0.0.1", port=MOCK_PORT, log_level="warning", access_log=False,
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("mock upstream did not start")
+        time.sleep(0.01)
+    yield mock_upstream
+    server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture(scope="session")
+def app_client(upstream):
+    # ένας TestClient (ένα event loop) για όλη τη session: τα asyncio objects
+    # του app (semaphores, single-flight tasks) δεμένα σε ένα loop
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def reset_caches() -> None:
+    """Άδεια L1/L2 caches, ώστε κάθε test να ξεκινά κρύο."""
+    from app import images, wikidata
+    from app.tiered import DISK
+
+    wikidata._CACHE.clear()
+    wikidata._SUMMARY_CACHE.clear()
+    wikidata._MISSING_CACHE.clear()
+    images._IMAGE_CACHE.clear()
+    if DISK is not None:
+        with DISK._lock:
+            conn = DISK._connect()
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM leases")
+
+
+@pytest.fixture
+def api(app_client, upstream, monkeypatch):
+    """TestClient με access token, κρύα caches και μηδενισμένους counters του mock."""
+    from app.auth import create_access_token
+
+    reset_caches()
+    upstream._calls.clear()
+    monkeypatch.setattr(upstream, "ERROR_RATE", 0.0)
+    monkeypatch.setattr(upstream, "LATENCY_MS", 0.0)
+    monkeypatch.setattr(upstream, "JITTER_MS", 0.0)
+    app_client.headers["Authorization"] = f"Bearer {create_access_token('tests@example.com')}"
+    yield app_client
+    app_client.headers.pop("Authorization", None)
+    # background refreshes/prefetches του test τελειώνουν πριν από το επόμενο
+    from app.tiered import inflight_fetches
+
+    deadline = time.monotonic() + 5
+    while inflight_fetches() and time.monotonic() < deadline:
+        time.sleep(0.01)
@@ -0,0 +1,94 @@
+import base64
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+
+from jose import jwt
+
+from app import auth
+from app.config import settings
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_decode_hs256_matches_jose():
+    token = auth.create_access_token("demo@demo.com")
+    payload = auth._decode_hs256(token)
+    assert payload is not None
+    assert payload == auth._decode_jose(token)
+    assert payload["sub"] == "demo@demo.com"
+    assert payload["type"] == "access"
+
+
+def test_decode_hs256_rejects_bad_signature():
+    token = auth.create_access_token("demo@demo.com")
+    header, payload, _ = token.split(".")
+    forged = jwt.encode({"sub": "admin@demo.com", "type": "access"}, "other-secret", algorithm="HS256")
+    assert auth._decode_hs256(f"{header}.{payload}.{forged.split('.')[2]}") is None
+    # ίδια υπογραφή, αλλαγμένο payload
+    tampered = _b64({**json.loads(auth._b64url_decode(payload)), "sub": "admin@demo.com"})
+    assert auth._decode_hs256(f"{header}.{tampered}.{token.split('.')[2]}") is None
+
+
+def test_decode_hs256_rejects_expired_token():
+    token = auth.create_token("demo@demo.com", "access", timedelta(seconds=-1))
+    assert auth._decode_hs256(token) is None
+    assert auth._decode_jose(token) is None
+
+
+def test_decode_hs256_rejects_other_algorithms():
+    unsigned = f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64({'sub': 'demo@demo.com'})}."
+    assert auth._decode_hs256(unsigned) is None
+    hs512 = jwt.encode({"sub": "demo@demo.com"}, settings.JWT_SECRET, algorithm="HS512")
+    assert auth._decode_hs256(hs512) is None
+
+
+def test_decode_hs256_rejects_malformed_tokens():
+    for token in ("", "abc", "a.b", "a.b.c", "a.b.c.d", "€.€.€"):
+        assert auth._decode_hs256(token) is None
+
+
+def test_decode_hs256_rejects_non_numeric_claims():
+    header = _b64({"alg": "HS256", "typ": "JWT"})
+    for claims in ({"exp": "never"}, {"nbf": "now"}, {"iat": "today"}):
+        body = _b64({"sub": "demo@demo.com", **claims})
+        signature = hmac.new(
+            settings.JWT_SECRET.encode("utf-8"), f"{header}.{body}".encode("ascii"), hashlib.sha256
+        ).digest()
+        token = f"{header}.{body}.{base64.urlsafe_b64encode(signature).decode('ascii').rstrip('=')}"
+        assert auth._decode_hs256(token) is None
+
+
+def test_protected_routes_require_an_access_token(api):
+    assert api.get("/pois/categories", headers={"Authorization": ""}).status_code == 401
+    refresh = auth.create_refresh_token("tests@example.com")
+    r = api.get("/pois/categories", headers={"Authorization": f"Bearer {refresh}"})
+    assert r.status_code == 401 and r.json()["detail"] == "Invalid access token"
+    assert api.get("/pois/categories").status_code == 200
+
+
+def _refresh(client, token):
+    return client.post("/api/auth/refresh", json={"refreshToken": token})
+
+
+def test_refresh_token_replay_is_rejected(api):
+    token = auth.create_refresh_token("tests@example.com")
+    first = _refresh(api, token)
+    assert first.status_code == 200
+    replay = _refresh(api, token)
+    assert replay.status_code == 401 and replay.json()["detail"] == "Refresh token already used"
+    # το νέο refresh token της rotation δουλεύει
+    assert _refresh(api, first.json()["refreshToken"]).status_code == 200
+
+
+def test_legacy_refresh_token_is_accepted_once(api):
+    legacy = auth.create_token("tests@example.com", "refresh", timedelta(days=1))
+    assert "jti" not in auth.decode_token(legacy)
+
+    r = _refresh(api, legacy)
+    assert r.status_code == 200
+    assert auth.decode_token(r.json()["refreshToken"])["jti"]
+    assert _refresh(api, legacy).status_code == 401
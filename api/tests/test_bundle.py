@@ -0,0 +1,61 @@
+import pytest
+
+from app import main, wikidata
+from app.config import settings
+
+CASTLE = "Q17496804"
+
+
+@pytest.fixture
+def bundle(api, upstream, monkeypatch):
+    """Ζεστά monuments (χωρίς summary prefetch) και rebuild σε κάθε request."""
+    monkeypatch.setattr(settings, "SUMMARY_PREFETCH", False)
+    monkeypatch.setattr(main.bundle_cache, "_rebuild_seconds", 0.0)
+    for state in (main._bundle_pois, main._bundle_summaries, main._bundle_qids_by_url):
+        state.clear()
+    api.get("/pois/categories/monuments")
+    main.bundle_cache.invalidate()
+    return api
+
+
+def _retitle(upstream, monkeypatch, title):
+    make_entity = upstream.make_entity
+
+    def _renamed(qid, *args):
+        entity = make_entity(qid, *args)
+        if qid == CASTLE:
+            entity["labels"]["el"]["value"] = title
+        return entity
+
+    monkeypatch.setattr(upstream, "make_entity", _renamed)
+
+
+def test_full_bundle(bundle):
+    r = bundle.get("/pois/bundle", headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and r.headers["content-encoding"] == "gzip"
+    body = r.json()
+    assert body["full"] is True and body["version"] == r.headers["x-bundle-version"]
+    assert {c["id"] for c in body["categories"]} == {"monuments", "museums", "nature"}
+    castle = next(p for p in body["pois"] if p["id"] == "ioannina-castle")
+    assert castle["title"] == "Μνημείο 17496804 Ιωαννίνων" and "facts" in castle
+
+    again = bundle.get("/pois/bundle", headers={"If-None-Match": r.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_delta_bundle_has_only_changed_pois(bundle, upstream, monkeypatch):
+    v1 = bundle.get("/pois/bundle").json()["version"]
+    unchanged = bundle.get("/pois/bundle", params={"since": v1}).json()
+    assert (unchanged["full"], unchanged["pois"], unchanged["removed"]) == (False, [], [])
+
+    _retitle(upstream, monkeypatch, "Κάστρο Ιωαννίνων")
+    bundle.portal.call(wikidata.refresh_pois, [CASTLE])
+
+    delta = bundle.get("/pois/bundle", params={"since": v1}).json()
+    assert delta["full"] is False and delta["since"] == v1 and delta["version"] != v1
+    assert [(p["id"], p["title"]) for p in delta["pois"]] == [("ioannina-castle", "Κάστρο Ιωαννίνων")]
+
+
+def test_unknown_since_falls_back_to_full(bundle):
+    body = bundle.get("/pois/bundle", params={"since": "nope"}).json()
+    assert body["full"] is True and "since" not in body
@@ -0,0 +1,88 @@
+import time
+
+from app.cache_store import DiskCache, MemoryCache, tiered_lookup
+
+
+def test_memory_cache_evicts_least_recently_used_entry():
+    cache = MemoryCache(max_entries=2, max_bytes=10_000, ttl=60, jitter=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # το "a" γίνεται πιο πρόσφατο από το "b"
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_evicts_by_bytes():
+    cache = MemoryCache(max_entries=100, max_bytes=10, ttl=60, jitter=0)
+    cache.set("a", "x", size=4)
+    cache.set("b", "y", size=4)
+    cache.set("c", "z", size=4)
+
+    assert "a" not in cache
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == 8
+
+
+def test_memory_cache_skips_values_larger_than_max_bytes():
+    cache = MemoryCache(max_entries=100, max_bytes=10, ttl=60, jitter=0)
+    cache.set("big", "x", size=11)
+    assert "big" not in cache
+    assert cache.stats()["bytes"] == 0
+
+
+def test_memory_cache_keeps_expired_entries_for_stale_reads():
+    cache = MemoryCache(max_entries=10, max_bytes=10_000, ttl=10, jitter=0)
+    old = time.time() - 60
+    cache.set("k", "v", ts=old)
+
+    assert cache.get("k") is None
+    assert cache.peek("k") == (old, "v", False)
+    assert cache.stats()["expirations"] == 2
+
+
+def test_memory_cache_jitter_stays_within_bounds():
+    cache = MemoryCache(max_entries=10, max_bytes=10_000, ttl=100, jitter=0.1)
+    for _ in range(100):
+        assert 90 <= cache._expires_at(0.0) <= 110
+
+
+def test_tiered_lookup_reads_l2_body_only_when_newer(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    memory = MemoryCache(max_entries=10, max_bytes=10_000, ttl=2, jitter=0)
+    now = time.time()
+    disk.set("k", {"v": "disk"}, ts=now - 5)
+    loads = []
+
+    def load(data):
+        loads.append(data)
+        return data["v"]
+
+    # κενό L1 -> L2 hit, μπαίνει στο L1
+    assert tiered_lookup(memory, disk, "k", 60, load) == ("disk", True, now - 5)
+    # ληγμένο L1 με νεότερο ts από το L2 -> δεν διαβάζεται το body
+    memory.set("k", "memory", ts=now - 3)
+    assert tiered_lookup(memory, disk, "k", 2, load) == ("memory", False, now - 3)
+    assert len(loads) == 1
+    # νεότερη εγγραφή στο L2 (άλλος worker) -> αντικαθιστά το ληγμένο L1
+    disk.set("k", {"v": "worker"}, ts=now)
+    assert tiered_lookup(memory, disk, "k", 2, load) == ("worker", True, now)
+    assert memory.get("k") == "worker"
+    disk.close()
+
+
+def test_disk_cache_lease_many(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    conn = disk._connect()
+    conn.execute("INSERT INTO leases (key, owner, expires) VALUES ('other', 1, ?)", (time.time() + 60,))
+    conn.execute("INSERT INTO leases (key, owner, expires) VALUES ('expired', 1, ?)", (time.time() - 1,))
+
+    assert disk.lease_many(["a", "other", "expired"], 15) == {"a", "expired"}
+    assert disk.lease("a", 15)  # ίδιος owner: ανανεώνεται
+    disk.release_many(["a", "expired", "other"])
+    assert not disk.leased("a")
+    assert disk.leased("other")
+    disk.close()
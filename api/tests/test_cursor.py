@@ -0,0 +1,32 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+
+from app.main import _decode_cursor, _encode_cursor
+
+
+@pytest.mark.parametrize("offset", [0, 1, 49, 50, 12345])
+def test_cursor_roundtrip(offset):
+    cursor = _encode_cursor(offset)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == offset
+
+
+def test_missing_cursor_is_first_page():
+    assert _decode_cursor(None) == 0
+    assert _decode_cursor("") == 0
+
+
+@pytest.mark.parametrize("raw", [b"o:-1", b"x:10", b"o:abc", b"10", "o:\u03b1".encode("utf-8")])
+def test_invalid_cursor_is_400(raw):
+    cursor = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_garbage_cursor_is_400():
+    with pytest.raises(HTTPException) as e:
+        _decode_cursor("!!not-base64!!")
+    assert e.value.status_code == 400
@@ -0,0 +1,66 @@
+import pytest
+
+from app.geo import GeoIndex, _haversine_many, haversine_m
+
+# Ιωάννινα: κάστρο, πλατεία, νησί και ένα σημείο στη Θεσσαλονίκη
+CASTLE = (39.6676, 20.8570)
+SQUARE = (39.6650, 20.8537)
+ISLAND = (39.6734, 20.8890)
+THESSALONIKI = (40.6401, 22.9444)
+
+
+@pytest.fixture
+def index():
+    idx = GeoIndex()
+    idx.upsert("castle", *CASTLE)
+    idx.upsert("square", *SQUARE)
+    idx.upsert("island", *ISLAND)
+    idx.upsert("thessaloniki", *THESSALONIKI)
+    return idx
+
+
+def test_haversine_known_distance():
+    # Ιωάννινα - Θεσσαλονίκη σε ευθεία ~ 207 km
+    assert haversine_m(*CASTLE, *THESSALONIKI) == pytest.approx(207_000, rel=0.02)
+    assert haversine_m(*CASTLE, *CASTLE) == 0
+
+
+def test_nearby_sorted_by_distance_within_radius(index):
+    hits = index.nearby(*SQUARE, radius_m=5_000, limit=10)
+    assert [k for k, _ in hits] == ["square", "castle", "island"]
+    distances = [d for _, d in hits]
+    assert distances == sorted(distances)
+    assert all(d <= 5_000 for d in distances)
+
+
+def test_nearby_respects_radius_and_limit(index):
+    assert [k for k, _ in index.nearby(*SQUARE, radius_m=1_000, limit=10)] == ["square", "castle"]
+    assert [k for k, _ in index.nearby(*SQUARE, radius_m=500_000, limit=2)] == ["square", "castle"]
+
+
+def test_bbox_only_points_inside_sorted_from_center(index):
+    keys = index.bbox(39.60, 20.80, 39.70, 20.90, limit=10)
+    assert set(keys) == {"castle", "square", "island"}
+    assert keys[-1] == "island"  # πιο μακριά από το κέντρο του bbox
+    assert index.bbox(40.0, 21.0, 40.1, 21.1, limit=10) == []
+
+
+def test_bbox_large_area_scans_points(index):
+    # πολλά κελιά -> σάρωση των σημείων αντί του grid
+    assert set(index.bbox(-90, -180, 90, 180, limit=10)) == {"castle", "square", "island", "thessaloniki"}
+
+
+def test_upsert_moves_point_and_keeps_unlocated_keys_known(index):
+    index.upsert("castle", *THESSALONIKI)
+    assert "castle" not in [k for k, _ in index.nearby(*SQUARE, radius_m=5_000, limit=10)]
+    assert "castle" in [k for k, _ in index.nearby(*THESSALONIKI, radius_m=1_000, limit=10)]
+
+    index.upsert("castle", None, None)
+    assert "castle" in index.known
+    assert len(index) == 3
+
+
+def test_vectorized_haversine_matches_scalar():
+    lats, lons = [CASTLE[0], THESSALONIKI[0]], [CASTLE[1], THESSALONIKI[1]]
+    expected = [haversine_m(*CASTLE, la, lo) for la, lo in zip(lats, lons)]
+    assert _haversine_many(*CASTLE, lats, lons) == pytest.approx(expected)
@@ -0,0 +1,27 @@
+import asyncio
+
+from app import hashing
+from app.metrics import STAGE_SECONDS
+
+
+def _queue_waits() -> float:
+    entry = STAGE_SECONDS._values.get(("hash_queue",))
+    return entry[1][1] if entry else 0
+
+
+def test_queue_wait_is_a_stage_histogram():
+    before = _queue_waits()
+    password_hash = asyncio.run(hashing.hash_password("secret"))
+    assert asyncio.run(hashing.verify_password("secret", password_hash))[0]
+    assert _queue_waits() == before + 2
+
+
+def test_pool_gets_a_share_of_the_cpus(monkeypatch):
+    monkeypatch.setattr(hashing, "available_cpus", lambda: 8)
+    monkeypatch.setattr(hashing.settings, "HASH_WORKERS", 0)
+    monkeypatch.setattr(hashing.settings, "HASH_WORKER_SHARES", 4)
+    assert hashing._workers() == 2
+    monkeypatch.setattr(hashing.settings, "HASH_WORKER_SHARES", 16)
+    assert hashing._workers() == 1
+    monkeypatch.setattr(hashing.settings, "HASH_WORKERS", 3)
+    assert hashing._workers() == 3
@@ -0,0 +1,35 @@
+from app.images import IMAGE_WIDTHS
+
+UPLOAD = "https://upload.wikimedia.org/wikipedia/commons/thumb/"
+
+
+def test_category_images_resolve_with_one_imageinfo_batch(api, upstream):
+    rows = api.get("/pois/categories/monuments").json()
+    assert rows and all(r["image"].startswith(UPLOAD) and "/640px-" in r["image"] for r in rows)
+    assert upstream._calls["query"] == 1
+
+    api.get("/pois/categories/monuments")
+    assert upstream._calls["query"] == 1  # από το cache
+
+
+def test_details_gallery_has_srcsets(api):
+    body = api.get("/pois/ioannina-castle", params={"fields": "image,images,gallery"}).json()
+    assert "/1280px-Ioannina_landmark_17496804.jpg" in body["image"]
+
+    gallery = body["gallery"]
+    assert len(gallery) == 3
+    assert gallery[0]["file"] == "Ioannina landmark 17496804.jpg"
+    # χωρίς διπλότυπα: κύρια εικόνα + αρχεία του Commons category
+    assert len({g["file"] for g in gallery}) == 3
+    assert body["images"] == [g["url"] for g in gallery]
+    assert [v["width"] for v in gallery[0]["srcset"]] == list(IMAGE_WIDTHS)
+    assert gallery[0]["srcset"][0]["height"] == 240
+
+
+def test_unresolved_image_falls_back_to_filepath(api, upstream, monkeypatch):
+    api.get("/pois/ioannina-castle", params={"fields": "title"})
+    monkeypatch.setattr(upstream, "ERROR_RATE", 1.0)
+
+    r = api.get("/pois/ioannina-castle", params={"fields": "image"})
+    assert r.status_code == 200
+    assert r.json()["image"].startswith("https://commons.wikimedia.org/wiki/Special:FilePath/")
@@ -0,0 +1,24 @@
+from app import auth
+
+
+def _samples(text: str, name: str) -> dict:
+    return {
+        line.split("{", 1)[1].split("}", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in text.splitlines() if line.startswith(name + "{")
+    }
+
+
+def test_cache_evictions_and_bytes_are_exported(api, monkeypatch):
+    monkeypatch.setattr(auth, "TOKEN_CACHE_MAX_ENTRIES", 1)
+    for email in ("a@example.com", "b@example.com"):
+        auth.decode_token(auth.create_access_token(email))
+    api.get("/pois/ioannina-castle", params={"fields": "title"})
+
+    text = api.get("/metrics").text
+    evictions = _samples(text, "cache_evictions_total")
+    assert set(evictions) == {f'cache="{c}"' for c in ("entities", "summaries", "missing", "images", "tokens")}
+    assert evictions['cache="tokens"'] >= 1
+
+    sizes = _samples(text, "cache_bytes")
+    assert 'cache="tokens"' not in sizes
+    assert sizes['cache="entities"'] > 0
@@ -0,0 +1,35 @@
+import httpx
+
+from tests.conftest import MOCK_PORT
+
+BASE = f"http://127.0.0.1:{MOCK_PORT}"
+
+
+def test_entities_are_deterministic(upstream):
+    first = httpx.get(f"{BASE}/wiki/Special:EntityData/Q42.json").json()
+    second = httpx.get(f"{BASE}/w/api.php", params={"action": "wbgetentities", "ids": "Q42|Q7"}).json()
+    assert first["entities"]["Q42"] == second["entities"]["Q42"]
+    assert set(second["entities"]) == {"Q42", "Q7"}
+    assert upstream._calls["entitydata"] >= 1
+
+
+def test_error_rate_injects_503(upstream, monkeypatch):
+    monkeypatch.setattr(upstream, "ERROR_RATE", 1.0)
+    before = upstream._calls["summary:error"]
+    r = httpx.get(f"{BASE}/api/rest_v1/page/summary/Test")
+    assert r.status_code == 503
+    assert upstream._calls["summary:error"] == before + 1
+
+
+def test_padding_grows_entities(upstream, monkeypatch):
+    small = len(httpx.get(f"{BASE}/wiki/Special:EntityData/Q1.json").content)
+    monkeypatch.setattr(upstream, "PADDING_CLAIMS", 50)
+    large = len(httpx.get(f"{BASE}/wiki/Special:EntityData/Q1.json").content)
+    assert large > small * 2
+
+
+def test_api_talks_to_mock_upstream(api, upstream):
+    r = api.get("/pois/ioannina-castle", params={"fields": "title"})
+    assert r.status_code == 200
+    assert r.json() == {"id": "ioannina-castle", "title": "Μνημείο 17496804 Ιωαννίνων"}
+    assert upstream._calls["entitydata"] == 1
@@ -0,0 +1,93 @@
+import json
+
+from app import main
+from app.main import DETAIL_FIELDS
+from bench.fixtures import make_entity
+from tests.conftest import reset_caches
+
+CASTLE = "/pois/ioannina-castle"
+
+
+def test_details_default_omits_raw(api):
+    body = api.get(CASTLE).json()
+    assert set(body) == DETAIL_FIELDS - {"raw"}
+    assert body["title"] == "Μνημείο 17496804 Ιωαννίνων"
+
+
+def test_fields_select_the_payload(api, upstream):
+    r = api.get(CASTLE, params={"fields": "title,lat,lon"})
+    assert r.status_code == 200
+    assert set(r.json()) == {"id", "title", "lat", "lon"}
+    # χωρίς shortDescription/images: ούτε summary ούτε Commons request
+    assert upstream._calls["summary"] == 0
+    assert upstream._calls["query"] == 0
+
+
+def test_unknown_field_is_400(api):
+    r = api.get(CASTLE, params={"fields": "title,nope"})
+    assert r.status_code == 400
+    assert "nope" in r.json()["detail"]
+
+
+def test_include_raw_adds_the_entity(api):
+    body = api.get(CASTLE, params={"fields": "title", "include": "raw"}).json()
+    assert set(body) == {"id", "title", "raw"}
+    assert body["raw"] == make_entity("Q17496804")
+
+
+def _revalidate(client, url, **params):
+    first = client.get(url, params=params)
+    etag = first.headers["etag"]
+    second = client.get(url, params=params, headers={"If-None-Match": f'"other", {etag}'})
+    return first, second
+
+
+def test_details_revalidate_with_304(api):
+    first, second = _revalidate(api, CASTLE, fields="title")
+    assert first.status_code == 200 and first.headers["etag"].startswith('W/"')
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["cache-control"] == first.headers["cache-control"]
+
+    # άλλα πεδία, άλλο representation
+    assert api.get(CASTLE, params={"fields": "title,lat"}).headers["etag"] != first.headers["etag"]
+
+
+def test_categories_revalidate_with_304(api):
+    first, second = _revalidate(api, "/pois/categories")
+    assert first.status_code == 200 and second.status_code == 304
+    assert first.headers["cache-control"] == "private, max-age=86400"
+
+    first, second = _revalidate(api, "/pois/categories/monuments")
+    assert first.status_code == 200 and second.status_code == 304
+    assert second.content == b""
+
+
+def test_category_pages_follow_the_cursor(api):
+    full = [p["id"] for p in api.get("/pois/categories/monuments").json()]
+    seen, etags, params = [], set(), {"limit": 2}
+    while True:
+        r = api.get("/pois/categories/monuments", params=params)
+        assert r.status_code == 200 and len(r.json()) <= 2
+        seen += [p["id"] for p in r.json()]
+        etags.add(r.headers["etag"])
+        if "x-next-cursor" not in r.headers:
+            break
+        params = {"limit": 2, "cursor": r.headers["x-next-cursor"]}
+    assert seen == full
+    assert len(etags) == 3
+
+
+def test_category_streams_ndjson_in_batches(api, upstream, monkeypatch):
+    expected = api.get("/pois/categories/monuments").json()
+    reset_caches()
+    upstream._calls.clear()
+    monkeypatch.setattr(main, "STREAM_CHUNK", 2)
+
+    r = api.get("/pois/categories/monuments", params={"format": "ndjson"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in r.text.splitlines()] == expected
+    assert upstream._calls["wbgetentities"] == 3  # ένα batch ανά 2 POIs
+
+    r = api.get("/pois/categories/monuments", headers={"Accept": "application/x-ndjson"}, params={"limit": 4})
+    assert len(r.text.splitlines()) == 4 and "x-next-cursor" in r.headers
@@ -0,0 +1,94 @@
+import httpx
+import pytest
+
+from app import resilience
+from app.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("example.org", failures=3, reset_seconds=10)
+    breaker.failure()
+    breaker.failure()
+    breaker.success()  # μηδενίζει τον μετρητή
+    breaker.failure()
+    breaker.failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker("example.org", failures=1, reset_seconds=10)
+    breaker.failure()
+    clock.now += 10
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # δεύτερο request όσο τρέχει το probe
+
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("example.org", failures=5, reset_seconds=10)
+    breaker.trip(10)
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.failure()  # μία αποτυχία στο half-open αρκεί
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+
+
+def test_breaker_lost_probe_retried_after_reset(clock):
+    breaker = CircuitBreaker("example.org", failures=1, reset_seconds=10)
+    breaker.failure()
+    clock.now += 10
+    assert breaker.allow()  # το probe ακυρώνεται χωρίς success/failure
+    clock.now += 5
+    assert not breaker.allow()
+    clock.now += 5
+    assert breaker.allow()
+
+
+def test_trip_keeps_longest_open_window(clock):
+    breaker = CircuitBreaker("example.org", failures=5, reset_seconds=10)
+    breaker.trip(60)
+    breaker.trip(5)
+    clock.now += 30
+    assert not breaker.allow()
+    assert breaker.stats()["openForSeconds"] == 30
+    assert breaker.stats()["opened"] == 1
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("5", 5.0), ("0", 0.0), ("-3", None), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0), ("soon", None), (None, None)],
+)
+def test_retry_after_seconds(value, expected):
+    headers = {"Retry-After": value} if value is not None else {}
+    assert retry_after_seconds(httpx.Response(429, headers=headers)) == expected
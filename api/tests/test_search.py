@@ -0,0 +1,57 @@
+import pytest
+
+from app.search import SearchIndex, fold, tokenize
+
+
+def test_fold_greek_accents_case_and_final_sigma():
+    assert fold("Κάστρο") == fold("καστρο") == "καστρο"
+    assert fold("Ιωαννίνων") == "ιωαννινων"
+    assert fold("Λίμνης") == "λιμνησ"
+    assert fold("ΐ") == "ι"
+
+
+def test_tokenize_splits_words_and_folds():
+    assert tokenize("Το Κάστρο, των Ιωαννίνων!") == ["το", "καστρο", "των", "ιωαννινων"]
+    assert tokenize("") == []
+
+
+@pytest.fixture
+def index():
+    idx = SearchIndex()
+    idx.update_fields("castle", title="Κάστρο Ιωαννίνων", description="Βυζαντινό φρούριο")
+    idx.update_fields("lake", title="Λίμνη Παμβώτιδα", description="Λίμνη δίπλα στο κάστρο")
+    idx.update_fields("museum", title="Βυζαντινό Μουσείο", summary="Μέσα στο Ιτς Καλέ")
+    return idx
+
+
+def test_search_prefix_without_accents(index):
+    assert [d for d, _ in index.search("καστ")] == ["castle", "lake"]
+    assert [d for d, _ in index.search("ΒΥΖΑΝ")] == ["museum", "castle"]
+
+
+def test_search_title_weight_and_exact_bonus(index):
+    hits = dict(index.search("κάστρο"))
+    assert hits["castle"] > hits["lake"]  # title (4.0) > description (2.0)
+    assert index.search("κάστρο")[0][1] > index.search("κάστ")[0][1]  # exact > prefix
+
+
+def test_search_requires_all_tokens(index):
+    assert [d for d, _ in index.search("κάστρο ιωαν")] == ["castle"]
+    assert index.search("κάστρο μουσείο") == []
+    assert index.search("   ") == []
+
+
+def test_update_fields_replaces_tokens(index):
+    index.update_fields("museum", title="Αρχαιολογικό Μουσείο")
+    assert "museum" not in [d for d, _ in index.search("βυζαντινό")]
+    assert [d for d, _ in index.search("αρχαιολ")] == ["museum"]
+    # τα υπόλοιπα πεδία μένουν
+    assert [d for d, _ in index.search("ιτς")] == ["museum"]
+
+
+def test_remove_and_contains(index):
+    assert "lake" in index
+    index.remove("lake")
+    assert "lake" not in index
+    assert len(index) == 2
+    assert [d for d, _ in index.search("λίμνη")] == []
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from app import tiered
+from app.cache_store import MemoryCache
+from app.tiered import DISK
+
+
+def test_l2_io_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    for name in ("get", "set_many"):
+        method = getattr(DISK, name)
+
+        def _recorded(*args, method=method, **kwargs):
+            threads.append(threading.current_thread().name)
+            return method(*args, **kwargs)
+
+        monkeypatch.setattr(DISK, name, _recorded)
+
+    async def _main():
+        memory = MemoryCache(max_entries=10, max_bytes=10_000, ttl=60, jitter=0)
+        await tiered.store(memory, "test:k", {"v": 1})
+        memory.clear()
+        return await tiered.lookup(memory, "test:k", 60), threading.current_thread().name
+
+    (value, fresh, _), loop_thread = asyncio.run(_main())
+    assert (value, fresh) == ({"v": 1}, True)
+    assert len(threads) == 2
+    assert all(t.startswith("l2-cache") and t != loop_thread for t in threads)
+
+
+def test_slow_l2_does_not_block_the_loop():
+    async def _main():
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(_ticker())
+        # άλλος "worker" κρατάει τη σύνδεση: το lookup περιμένει, το loop όχι
+        with DISK._lock:
+            lookup = asyncio.ensure_future(
+                tiered.lookup(MemoryCache(10, 10_000, 60, 0), "test:missing", 60)
+            )
+            await asyncio.sleep(0.2)
+            assert not lookup.done()
+        assert await lookup == (None, False, 0.0)
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(_main()) >= 10
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from app import auth
+from app.hashing import pwd_context
+from app.user_store import SqliteUserStore, UserStore
+
+
+def _legacy(tmp_path, users):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps(users), encoding="utf-8")
+    return str(path)
+
+
+def test_user_store_is_abstract():
+    with pytest.raises(TypeError):
+        UserStore()
+
+
+def test_users_json_is_migrated_once(tmp_path):
+    legacy = _legacy(tmp_path, {
+        " Old@Example.com ": {"password_hash": "h1"},
+        "broken@example.com": {},
+    })
+    store = SqliteUserStore(str(tmp_path / "users.sqlite3"), legacy_json=legacy)
+    assert store.get_password_hash("old@example.com") == "h1"
+    assert store.get_password_hash("broken@example.com") is None
+    assert (tmp_path / "users.json.migrated").exists() and not (tmp_path / "users.json").exists()
+    store.close()
+
+    # ξανά users.json (π.χ. restore): INSERT OR IGNORE, δεν πατάει τα υπάρχοντα
+    legacy = _legacy(tmp_path, {"old@example.com": {"password_hash": "h2"}})
+    store = SqliteUserStore(str(tmp_path / "users.sqlite3"), legacy_json=legacy)
+    assert store.get_password_hash("old@example.com") == "h1"
+    store.close()
+
+
+def test_migrated_user_can_log_in(api, tmp_path, monkeypatch):
+    legacy = _legacy(tmp_path, {"legacy@example.com": {"password_hash": pwd_context.hash("legacy1234")}})
+    store = SqliteUserStore(str(tmp_path / "users.sqlite3"), legacy_json=legacy)
+    monkeypatch.setattr(auth, "user_store", store)
+
+    r = api.post("/api/auth/login", json={"email": "Legacy@example.com", "password": "legacy1234"})
+    assert r.status_code == 200
+    assert r.json()["accessToken"]
+    assert api.post("/api/auth/login", json={"email": "legacy@example.com", "password": "wrong"}).status_code == 401
+    store.close()
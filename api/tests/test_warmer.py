@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app import warmer
+from app.catalogue import catalogue
+from app.config import settings
+
+CASTLE = "Q17496804"
+
+
+@pytest.fixture
+def status(monkeypatch):
+    """Καθαρό _status του warmer για κάθε test."""
+    monkeypatch.setattr(warmer, "_status", {**warmer._status, "ready": False, "runs": 0})
+    monkeypatch.setattr(warmer, "_publish_status", lambda: None)
+    return warmer._status
+
+
+def _warm(client, force: bool = False) -> bool:
+    # στο event loop του TestClient, όπως ο warmer στο lifespan
+    return client.portal.call(warmer.warm_catalogue, force)
+
+
+def test_missing_entity_counts_as_resolved(api, upstream, status, monkeypatch):
+    monkeypatch.setattr(upstream, "MISSING_IDS", {CASTLE})
+
+    assert _warm(api) is True
+    assert (status["warmed"], status["missing"], status["ready"]) == (len(catalogue.qids) - 1, 1, True)
+
+    # negative cache: ούτε ο επόμενος γύρος ούτε τα requests ξαναρωτούν το Wikidata
+    calls = (upstream._calls["wbgetentities"], upstream._calls["entitydata"])
+    assert _warm(api) is True
+    assert api.get("/pois/ioannina-castle").status_code == 404
+    assert (upstream._calls["wbgetentities"], upstream._calls["entitydata"]) == calls
+
+
+def test_failing_entity_does_not_block_readiness(api, upstream, status, monkeypatch):
+    monkeypatch.setattr(upstream, "FAILING_IDS", {CASTLE})
+    monkeypatch.setattr(settings, "WARMER_ENABLED", True)
+
+    assert _warm(api) is False
+    assert (status["warmed"], status["missing"]) == (len(catalogue.qids) - 1, 0)
+    r = api.get("/ready")
+    assert r.status_code == 200 and r.json()["ready"] is True
+
+
+def test_ready_waits_for_coverage(api, upstream, status, monkeypatch):
+    monkeypatch.setattr(upstream, "FAILING_IDS", {CASTLE})
+    monkeypatch.setattr(settings, "WARMER_ENABLED", True)
+    monkeypatch.setattr(settings, "WARMER_READY_COVERAGE", 1.0)
+
+    assert _warm(api) is False
+    assert api.get("/ready").status_code == 503
+
+
+def test_refresh_starts_after_an_incomplete_first_pass(status, monkeypatch):
+    passes = []
+
+    async def _incomplete(force: bool = False) -> bool:
+        passes.append(force)
+        return False
+
+    monkeypatch.setattr(warmer, "warm_catalogue", _incomplete)
+    monkeypatch.setattr(warmer, "TTL_SECONDS", 0.2)
+    monkeypatch.setattr(warmer, "RETRY_SECONDS", 0.02)
+
+    async def _main():
+        task = asyncio.ensure_future(warmer._run())
+        while True not in passes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    try:
+        asyncio.run(asyncio.wait_for(_main(), 5))
+    finally:
+        warmer._release_lead()
+    # retries χωρίς force μέχρι την ώρα του refresh, μετά force
+    assert passes[:2] == [False, False]
+    assert passes[-1] is True
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import wikidata
+from app.catalogue import catalogue
+from app.tiered import DISK, SWR_MAX_STALE_SECONDS
+from app.wikidata import (
+    WBGETENTITIES_LANGUAGES, WBGETENTITIES_PROPS, WBGETENTITIES_SITES, parse_poi_from_wikidata,
+)
+from bench.fixtures import make_entity, select_entity
+
+
+def _stored(qid: str) -> dict:
+    return DISK.get(f"wd:{qid}")[1]
+
+
+def test_trimmed_entity_parses_like_the_full_one():
+    full = make_entity("Q17496804")
+    trimmed = select_entity(full, WBGETENTITIES_PROPS, WBGETENTITIES_LANGUAGES, WBGETENTITIES_SITES)
+    assert "aliases" not in trimmed and "fr" not in trimmed["labels"]
+
+    from_full = parse_poi_from_wikidata("Q17496804", {"entities": {"Q17496804": full}})
+    from_batch = parse_poi_from_wikidata("Q17496804", {"entities": {"Q17496804": trimmed}})
+    assert {k: v for k, v in from_batch.items() if k != "raw"} == {k: v for k, v in from_full.items() if k != "raw"}
+
+
+def test_category_is_fetched_with_one_trimmed_batch(api, upstream):
+    r = api.get("/pois/categories/monuments")
+    assert r.status_code == 200
+    assert len(r.json()) == len(catalogue.by_category["monuments"])
+    assert upstream._calls["wbgetentities"] == 1
+    assert upstream._calls["entitydata"] == 0
+
+    stored = _stored("Q17496804")
+    assert stored["trimmed"] is True
+    entity = stored["entities"]["Q17496804"]
+    assert "aliases" not in entity and set(entity["sitelinks"]) == {"elwiki", "enwiki"}
+
+
+def test_include_raw_fetches_the_full_entity_once(api, upstream):
+    api.get("/pois/categories/monuments")
+
+    raw = api.get("/pois/ioannina-castle", params={"include": "raw"}).json()["raw"]
+    assert raw == make_entity("Q17496804")
+    assert upstream._calls["entitydata"] == 1
+    assert "trimmed" not in _stored("Q17496804")
+
+    api.get("/pois/ioannina-castle", params={"include": "raw"})
+    assert upstream._calls["entitydata"] == 1
+
+
+def test_include_raw_falls_back_to_trimmed_entity(api, upstream, monkeypatch):
+    api.get("/pois/categories/monuments")
+    monkeypatch.setattr(upstream, "ERROR_RATE", 1.0)
+
+    r = api.get("/pois/ioannina-castle", params={"include": "raw"})
+    assert r.status_code == 200
+    assert set(r.json()["raw"]["sitelinks"]) == {"elwiki", "enwiki"}
+
+
+def _age(qid: str, seconds: float) -> None:
+    """Το entry του qid γίνεται seconds παλιό (L2), και φεύγει από το L1."""
+    DISK.touch(f"wd:{qid}", ts=time.time() - seconds)
+    wikidata._CACHE.clear()
+
+
+def test_expired_entry_is_served_while_it_revalidates(api, upstream):
+    api.get("/pois/ioannina-castle", params={"fields": "title"})
+    _age("Q17496804", wikidata.TTL_SECONDS + 60)
+
+    r = api.get("/pois/ioannina-castle", params={"fields": "title"})
+    assert r.status_code == 200
+    deadline = time.monotonic() + 5
+    while upstream._calls["entitydata"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert upstream._calls["entitydata"] == 2  # ένα background refresh
+
+
+def test_stale_entry_is_served_when_wikidata_fails(api, upstream, monkeypatch):
+    api.get("/pois/ioannina-castle", params={"fields": "title"})
+    # πέρα από το stale-while-revalidate παράθυρο: περιμένει το refresh, που αποτυγχάνει
+    _age("Q17496804", wikidata.TTL_SECONDS + SWR_MAX_STALE_SECONDS + 60)
+    monkeypatch.setattr(upstream, "ERROR_RATE", 1.0)
+
+    r = api.get("/pois/ioannina-castle", params={"fields": "title"})
+    assert r.status_code == 200
+    assert r.json()["title"] == "Μνημείο 17496804 Ιωαννίνων"
+    assert upstream._calls["entitydata:error"] == 1
+
+
+def test_wikidata_failure_without_cache_is_502(api, upstream, monkeypatch):
+    monkeypatch.setattr(upstream, "ERROR_RATE", 1.0)
+    assert api.get("/pois/ioannina-castle", params={"fields": "title"}).status_code == 502
+
+
+def test_concurrent_misses_share_one_upstream_fetch(api, upstream, monkeypatch):
+    monkeypatch.setattr(upstream, "LATENCY_MS", 200.0)
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(
+            lambda _: api.get("/pois/ioannina-castle", params={"fields": "title"}), range(8)
+        ))
+    assert [r.status_code for r in responses] == [200] * 8
+    assert upstream._calls["entitydata"] == 1